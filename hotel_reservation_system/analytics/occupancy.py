@@ -0,0 +1,224 @@
+"""
+Vectorized occupancy analytics over reservations.
+
+Reservations are converted once into flat NumPy arrays (hotel codes,
+room numbers, check-in and check-out day ordinals); every report is then
+computed with array operations instead of Python loops. A night d is
+occupied by a reservation when check_in <= d < check_out.
+
+The occupancy calendar is built from a difference array: each stay adds
+one at its first night and subtracts one after its last, and a cumulative
+sum along the days yields the rooms occupied per hotel and night. Its
+cost is O(reservations + hotels * days) whatever the length of the stays.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from models.hotel import Hotel
+from models.reservation import DateLike, Reservation, to_date
+
+
+@dataclass(frozen=True, eq=False)
+class ReservationArrays:
+    """
+    Reservations as parallel arrays, one element per reservation.
+    """
+
+    hotel_ids: Tuple[str, ...]
+    hotel_codes: np.ndarray
+    room_numbers: np.ndarray
+    check_in: np.ndarray
+    check_out: np.ndarray
+
+    @classmethod
+    def from_reservations(
+            cls, reservations: Iterable[Reservation]
+            ) -> "ReservationArrays":
+        """
+        Converts reservations into arrays in a single pass. hotel_codes
+        index into hotel_ids.
+        """
+        codes: Dict[str, int] = {}
+        hotel_codes: List[int] = []
+        room_numbers: List[int] = []
+        check_in: List[int] = []
+        check_out: List[int] = []
+        for reservation in reservations:
+            hotel_codes.append(
+                codes.setdefault(reservation.hotel_id, len(codes))
+            )
+            room_numbers.append(reservation.room_number)
+            check_in.append(reservation.check_in.toordinal())
+            check_out.append(reservation.check_out.toordinal())
+        return cls(
+            tuple(codes),
+            np.array(hotel_codes, dtype=np.int32),
+            np.array(room_numbers, dtype=np.int32),
+            np.array(check_in, dtype=np.int32),
+            np.array(check_out, dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        """
+        Returns the number of reservations.
+        """
+        return len(self.hotel_codes)
+
+    def nights(self) -> np.ndarray:
+        """
+        Returns the length of each stay in nights.
+        """
+        return self.check_out - self.check_in
+
+
+@dataclass(frozen=True, eq=False)
+class OccupancyCalendar:
+    """
+    Rooms occupied per hotel (rows) and night (columns).
+    """
+
+    hotel_ids: Tuple[str, ...]
+    start: date
+    occupied: np.ndarray
+    total_rooms: np.ndarray
+
+    @property
+    def days(self) -> int:
+        """
+        Returns the number of nights covered.
+        """
+        return self.occupied.shape[1]
+
+    def dates(self) -> List[date]:
+        """
+        Returns the night of each column.
+        """
+        return [self.start + timedelta(days) for days in range(self.days)]
+
+    def rates(self) -> np.ndarray:
+        """
+        Returns the occupancy rate per hotel and night, between 0 and 1.
+        Hotels without rooms have a rate of 0.
+        """
+        rooms = self.total_rooms[:, np.newaxis].astype(np.float64)
+        return np.divide(
+            self.occupied, rooms, out=np.zeros(self.occupied.shape),
+            where=rooms > 0
+        )
+
+    def hotel_rates(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the occupancy rates of each hotel, by hotel ID.
+        """
+        return dict(zip(self.hotel_ids, self.rates()))
+
+    def chain_rates(self) -> np.ndarray:
+        """
+        Returns the occupancy rate of all hotels together per night.
+        """
+        rooms = self.total_rooms.sum()
+        if rooms == 0:
+            return np.zeros(self.days)
+        return self.occupied.sum(axis=0) / rooms
+
+    def peak_nights(
+            self, top: int = 10, hotel_id: Optional[str] = None
+            ) -> List[Tuple[date, float]]:
+        """
+        Returns the nights with the highest occupancy rate, highest
+        first, for one hotel or for the whole chain.
+
+        :param top: Number of nights to return
+        :param hotel_id: Hotel to rank, defaults to the whole chain
+        """
+        if hotel_id is None:
+            rates = self.chain_rates()
+        else:
+            rates = self.rates()[self.hotel_ids.index(hotel_id)]
+        top = min(top, len(rates))
+        if top <= 0:
+            return []
+        best = np.argpartition(-rates, top - 1)[:top]
+        # Stable sort so ties keep calendar order.
+        best = best[np.argsort(-rates[best], kind="stable")]
+        return [
+            (self.start + timedelta(int(day)), float(rates[day]))
+            for day in best
+        ]
+
+
+def occupancy_calendar(
+        reservations: ReservationArrays, hotels: Iterable[Hotel],
+        start: DateLike, end: DateLike
+        ) -> OccupancyCalendar:
+    """
+    Counts the rooms occupied per hotel on each night in [start, end).
+    Reservations of hotels not in hotels are ignored.
+    """
+    hotels = list(hotels)
+    hotel_ids = tuple(hotel.hotel_id for hotel in hotels)
+    first = to_date(start).toordinal()
+    days = max(to_date(end).toordinal() - first, 0)
+    rows, begin, finish = _clip_stays(reservations, hotel_ids, first, days)
+
+    # One spare column per row takes the -1 of stays running to the end.
+    width = days + 1
+    size = len(hotels) * width
+    changes = (
+        np.bincount(rows * width + begin, minlength=size)
+        - np.bincount(rows * width + finish, minlength=size)
+    )
+    return OccupancyCalendar(
+        hotel_ids, to_date(start),
+        changes.reshape(len(hotels), width)[:, :days].cumsum(axis=1),
+        np.array([int(hotel.total_rooms) for hotel in hotels],
+                 dtype=np.int64)
+    )
+
+
+def _clip_stays(
+        reservations: ReservationArrays, hotel_ids: Tuple[str, ...],
+        first: int, days: int
+        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the calendar row, first column and end column of each stay
+    of the given hotels that overlaps the days nights from first.
+    """
+    rows = {hotel_id: row for row, hotel_id in enumerate(hotel_ids)}
+    row_of_code = np.array(
+        [rows.get(hotel_id, -1) for hotel_id in reservations.hotel_ids],
+        dtype=np.int64
+    )
+    hotel_rows = row_of_code[reservations.hotel_codes]
+    begin = np.clip(reservations.check_in - first, 0, days)
+    finish = np.clip(reservations.check_out - first, 0, days)
+    keep = (hotel_rows >= 0) & (begin < finish)
+    return hotel_rows[keep], begin[keep], finish[keep]
+
+
+def length_of_stay_histogram(
+        reservations: ReservationArrays, max_nights: int = 30
+        ) -> np.ndarray:
+    """
+    Returns the number of stays of each length: element n counts the
+    stays of n nights, and the last element counts every stay of
+    max_nights nights or more.
+    """
+    nights = np.clip(reservations.nights(), 0, max_nights)
+    return np.bincount(nights, minlength=max_nights + 1)
+
+
+def room_nights(reservations: ReservationArrays) -> Dict[str, int]:
+    """
+    Returns the number of room nights sold per hotel ID.
+    """
+    sold = np.bincount(
+        reservations.hotel_codes, weights=reservations.nights(),
+        minlength=len(reservations.hotel_ids)
+    )
+    return {
+        hotel_id: int(nights)
+        for hotel_id, nights in zip(reservations.hotel_ids, sold)
+    }
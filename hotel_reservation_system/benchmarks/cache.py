@@ -0,0 +1,164 @@
+"""
+Measures hotel lookups over a simulated remote backend with and without
+the read-through cache.
+
+Every read or write of the backend sleeps for --latency milliseconds,
+like a round trip to a database. Lookups follow a Zipf distribution over
+--hotels hotels, so a few hot hotels take most of the traffic, and the
+managers never load the whole collection.
+
+Run from the hotel_reservation_system directory:
+
+    python -m benchmarks.cache --hotels 10000 --lookups 2000
+"""
+
+import argparse
+import itertools
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from benchmarks.common import percentiles
+from managers.hotel_manager import HotelManager
+from storage.base import PUT, Change, ProgressCallback, Storage
+from storage.cached import CachedStorage
+
+
+class SimulatedRemoteStorage(Storage):
+    """
+    Keeps records in memory but waits latency seconds on every call.
+    """
+
+    point_reads = True
+
+    def __init__(self, key: str, latency: float):
+        """
+        :param key: Name of the primary key field of each record
+        :param latency: Seconds each call waits
+        """
+        self.key = key
+        self.latency = latency
+        self.reads = 0
+        self._lock = threading.Lock()
+        self._records: Dict[str, dict] = {}
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields every record after one round trip.
+        """
+        time.sleep(self.latency)
+        with self._lock:
+            records = list(self._records.values())
+        yield from (dict(record) for record in records)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns one record after one round trip.
+        """
+        time.sleep(self.latency)
+        with self._lock:
+            self.reads += 1
+            record = self._records.get(key)
+        return None if record is None else dict(record)
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces every record after one round trip.
+        """
+        time.sleep(self.latency)
+        with self._lock:
+            self._records = {record[self.key]: dict(record)
+                             for record in records}
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Applies the changes after one round trip.
+        """
+        time.sleep(self.latency)
+        with self._lock:
+            for op, key, record in changes:
+                if op == PUT:
+                    self._records[key] = dict(record)
+                else:
+                    self._records.pop(key, None)
+
+
+def zipf_keys(
+        count: int, lookups: int, exponent: float, rng: random.Random
+        ) -> List[str]:
+    """
+    Returns lookups hotel IDs drawn with probability proportional to
+    1 / rank ** exponent.
+    """
+    weights = itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    )
+    return [f"H{number}" for number in rng.choices(
+        range(count), cum_weights=list(weights), k=lookups
+    )]
+
+
+def run(
+        hotels: int, lookups: int, latency: float,
+        max_entries: int, exponent: float = 1.1
+        ) -> Dict[str, Dict[str, Any]]:
+    """
+    Times the same lookups through an uncached and a cached manager and
+    returns their latencies, backend reads and cache statistics.
+    """
+    keys = zipf_keys(hotels, lookups, exponent, random.Random(0))
+    results = {}
+    for name in ("uncached", "cached"):
+        backend = SimulatedRemoteStorage("hotel_id", latency)
+        backend.save(
+            {"hotel_id": f"H{number}", "name": f"Hotel {number}",
+             "location": "City", "total_rooms": 100}
+            for number in range(hotels)
+        )
+        storage: Storage = backend
+        if name == "cached":
+            storage = CachedStorage(backend, max_entries=max_entries)
+        manager = HotelManager(storage)
+        samples = []
+        for key in keys:
+            started = time.perf_counter()
+            manager.get_hotel_by_id(key)
+            samples.append(time.perf_counter() - started)
+        results[name] = {**percentiles(samples),
+                         "total_s": sum(samples),
+                         "backend_reads": backend.reads}
+        if isinstance(storage, CachedStorage):
+            stats = storage.stats()
+            results[name].update(hit_ratio=stats.hit_ratio,
+                                 evictions=stats.evictions)
+    return results
+
+
+def main() -> None:
+    """
+    Parses the command line and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hotels", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="milliseconds per backend call")
+    parser.add_argument("--max-entries", type=int, default=1_000)
+    args = parser.parse_args()
+    results = run(args.hotels, args.lookups, args.latency / 1000,
+                  args.max_entries)
+    for name, values in results.items():
+        print(f"{name:9} " + "  ".join(
+            f"{key} {value:.3f}" if isinstance(value, float)
+            else f"{key} {value}"
+            for key, value in values.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
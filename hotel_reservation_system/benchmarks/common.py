@@ -0,0 +1,75 @@
+"""
+Timing and reporting helpers shared by the benchmarks.
+"""
+
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def best_of(function: Callable[[], object], repeat: int = 3) -> float:
+    """
+    Returns the best of repeat wall-clock timings of function, in
+    seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def throughput(
+        function: Callable[[object], object], items: Iterable[object],
+        budget: Optional[float] = None
+        ) -> Tuple[int, float]:
+    """
+    Calls function on each item, stopping early once budget seconds
+    have elapsed. Returns the number of calls and the seconds they took.
+    """
+    calls = 0
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+        calls += 1
+        if budget is not None and time.perf_counter() - started >= budget:
+            break
+    return calls, time.perf_counter() - started
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Returns the p50, p99 and maximum of samples, in milliseconds.
+    """
+    samples = sorted(samples)
+    return {
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p99_ms": samples[int(len(samples) * 0.99)] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """
+    Describes the machine and revision the benchmarks ran on.
+    """
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        revision = "unknown"
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(
+            timespec="seconds"),
+        "revision": revision,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
@@ -0,0 +1,284 @@
+"""
+Benchmark suite for the managers' load, save, lookup and CRUD paths.
+
+For each scale and manager a data file of that many synthetic records
+is written to a temporary directory, then the suite measures:
+
+- load: constructing the manager and reading every record
+- lookup: random get_*_by_id calls
+- save: writing the whole collection with save_*()
+- create / delete: single create_* and delete_* (or cancel_reservation)
+  calls, each persisted immediately
+
+Create and delete run until --ops calls or --budget seconds, whichever
+comes first, since each call rewrites a JSON file whose size grows with
+the scale. Results are printed as a table and, with --output, written as
+JSON together with the environment they were measured in. --baseline
+compares against an earlier JSON file and exits with status 1 if any
+operation got slower by more than --tolerance.
+
+Run from the hotel_reservation_system directory:
+
+    python -m benchmarks.managers --scale 1k --scale 100k --output out.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from benchmarks.common import environment, throughput
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from storage.base import Storage
+from storage.json_storage import JsonFileStorage
+from storage.sqlite_storage import (
+    customer_storage, hotel_storage, reservation_storage
+)
+
+FIRST_DAY = date(2025, 1, 1)
+SCALES = {"k": 1_000, "m": 1_000_000}
+
+
+@dataclass(frozen=True)
+class Target:  # pylint: disable=too-many-instance-attributes
+    """
+    How to benchmark one manager.
+    """
+
+    name: str
+    key: str
+    manager: Callable[..., Any]
+    sqlite_storage: Callable[[str], Storage]
+    record: Callable[[int], dict]
+    lookup: Callable[[Any, str], Any]
+    create: Callable[[Any, dict], Any]
+    delete: Callable[[Any, str], Any]
+    save: Callable[[Any], None]
+
+
+def _reservation(number: int) -> dict:
+    """
+    Returns a synthetic reservation; each one books its own room.
+    """
+    check_in = FIRST_DAY + timedelta(number % 365)
+    return {
+        "reservation_id": f"R{number}", "customer_id": f"C{number}",
+        "hotel_id": f"H{number // 100}", "room_number": number % 100 + 1,
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(1 + number % 7)).isoformat()
+    }
+
+
+TARGETS = (
+    Target(
+        "hotel", "hotel_id", HotelManager, hotel_storage,
+        lambda number: {
+            "hotel_id": f"H{number}", "name": f"Hotel {number}",
+            "location": f"City {number % 100}", "total_rooms": 100
+        },
+        lambda manager, key: manager.get_hotel_by_id(key),
+        lambda manager, record: manager.create_hotel(**record),
+        lambda manager, key: manager.delete_hotel(key),
+        lambda manager: manager.save_hotels(),
+    ),
+    Target(
+        "customer", "customer_id", CustomerManager, customer_storage,
+        lambda number: {
+            "customer_id": f"C{number}", "name": f"Customer {number}",
+            "phone": f"555-{number:07d}"
+        },
+        lambda manager, key: manager.get_customer_by_id(key),
+        lambda manager, record: manager.create_customer(**record),
+        lambda manager, key: manager.delete_customer(key),
+        lambda manager: manager.save_customers(),
+    ),
+    Target(
+        "reservation", "reservation_id", ReservationManager,
+        reservation_storage, _reservation,
+        lambda manager, key: manager.get_reservation_by_id(key),
+        lambda manager, record: manager.create_reservation(record),
+        lambda manager, key: manager.cancel_reservation(key),
+        lambda manager: manager.save_reservations(),
+    ),
+)
+
+
+def parse_scale(value: str) -> int:
+    """
+    Parses a record count such as 1000, 1k or 1m.
+    """
+    value = value.strip().lower()
+    multiplier = SCALES.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    return int(value) * multiplier
+
+
+def _open_storage(target: Target, backend: str, directory: str) -> Storage:
+    """
+    Returns an empty storage of the given backend for target.
+    """
+    if backend == "sqlite":
+        return target.sqlite_storage(
+            os.path.join(directory, f"{target.name}.db")
+        )
+    return JsonFileStorage(
+        os.path.join(directory, f"{target.name}s.json"), target.key
+    )
+
+
+def bench_target(
+        target: Target, scale: int, backend: str, ops: int,
+        budget: Optional[float]
+        ) -> List[Dict[str, Any]]:
+    """
+    Measures every operation of one manager at one scale and returns a
+    result row per operation.
+    """
+    directory = tempfile.mkdtemp()
+    storage = _open_storage(target, backend, directory)
+    try:
+        storage.save(target.record(number) for number in range(scale))
+        return [
+            {"manager": target.name, "operation": operation,
+             "scale": scale, "backend": backend, "ops": calls,
+             "seconds": seconds,
+             "ops_per_second": calls / max(seconds, 1e-9)}
+            for operation, calls, seconds in _measure(
+                target, storage, scale, ops, budget
+            )
+        ]
+    finally:
+        storage.close()
+        shutil.rmtree(directory)
+
+
+def _measure(
+        target: Target, storage: Storage, scale: int, ops: int,
+        budget: Optional[float]
+        ) -> Iterator[Tuple[str, int, float]]:
+    """
+    Yields (operation, calls, seconds) for each operation of a manager
+    over a storage holding scale records.
+    """
+    rng = random.Random(scale)
+    started = time.perf_counter()
+    manager = target.manager(storage, lazy=False)
+    yield "load", scale, time.perf_counter() - started
+
+    keys = [target.record(rng.randrange(scale))[target.key]
+            for _ in range(min(ops * 100, 100_000))]
+    if target.lookup(manager, keys[0]) is None:
+        raise RuntimeError(f"{target.name} records did not load.")
+    yield ("lookup", *throughput(
+        lambda key: target.lookup(manager, key), keys
+    ))
+
+    started = time.perf_counter()
+    target.save(manager)
+    yield "save", scale, time.perf_counter() - started
+
+    created = [target.record(scale + number) for number in range(ops)]
+    calls, seconds = throughput(
+        lambda record: target.create(manager, record), created, budget
+    )
+    yield "create", calls, seconds
+    yield ("delete", *throughput(
+        lambda record: target.delete(manager, record[target.key]),
+        created[:calls], budget
+    ))
+
+
+def run(
+        scales: List[int], backend: str = "json", ops: int = 100,
+        budget: Optional[float] = 5.0,
+        managers: Optional[List[str]] = None
+        ) -> Dict[str, Any]:
+    """
+    Runs the suite and returns the environment and result rows.
+    """
+    rows = []
+    for scale in scales:
+        for target in TARGETS:
+            if managers and target.name not in managers:
+                continue
+            rows.extend(bench_target(target, scale, backend, ops, budget))
+    return {"environment": environment(), "results": rows}
+
+
+def compare(
+        results: Dict[str, Any], baseline: Dict[str, Any],
+        tolerance: float
+        ) -> List[str]:
+    """
+    Returns a description of every operation whose throughput dropped
+    by more than tolerance (0.2 = 20%) against the baseline.
+    """
+    def key(row):
+        return (row["manager"], row["operation"], row["scale"],
+                row["backend"])
+
+    previous = {key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in results["results"]:
+        before = previous.get(key(row))
+        if before is None:
+            continue
+        ratio = row["ops_per_second"] / before["ops_per_second"]
+        if ratio < 1 - tolerance:
+            manager, operation, scale, backend = key(row)
+            regressions.append(
+                f"{manager} {operation} at {scale} ({backend}): "
+                f"{before['ops_per_second']:.0f} -> "
+                f"{row['ops_per_second']:.0f} ops/s"
+            )
+    return regressions
+
+
+def main() -> None:
+    """
+    Parses the command line, runs the suite and reports the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", action="append", type=parse_scale,
+                        help="records per manager, e.g. 1k, 100k, 1m")
+    parser.add_argument("--backend", choices=("json", "sqlite"),
+                        default="json")
+    parser.add_argument("--manager", action="append",
+                        choices=[target.name for target in TARGETS])
+    parser.add_argument("--ops", type=int, default=100)
+    parser.add_argument("--budget", type=float, default=5.0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(args.scale or [1_000, 100_000], args.backend, args.ops,
+                  args.budget, args.manager)
+    for row in results["results"]:
+        print(f"{row['manager']:12} {row['operation']:7} "
+              f"{row['scale']:>9} {row['backend']:6} "
+              f"{row['ops']:>9} ops {row['seconds']:9.3f} s "
+              f"{row['ops_per_second']:14.0f} ops/s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmarks the vectorized occupancy reports against plain Python loops.
+
+Run from the hotel_reservation_system directory:
+
+    python -m benchmarks.occupancy --hotels 200 --reservations 200000
+"""
+
+import argparse
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+from analytics.occupancy import (
+    ReservationArrays, length_of_stay_histogram, occupancy_calendar
+)
+from benchmarks.common import best_of
+from models.hotel import Hotel
+from models.reservation import Reservation
+
+
+def generate(
+        hotels: int, reservations: int, year: int, seed: int = 0
+        ) -> Tuple[List[Hotel], List[Reservation]]:
+    """
+    Returns random hotels and reservations checking in during year.
+    """
+    rng = random.Random(seed)
+    hotel_list = [
+        Hotel(f"H{number}", f"Hotel {number}", "City", rng.randint(20, 300))
+        for number in range(hotels)
+    ]
+    first = date(year, 1, 1).toordinal()
+    reservation_list = []
+    for number in range(reservations):
+        hotel = rng.choice(hotel_list)
+        check_in = first + rng.randrange(365)
+        reservation_list.append(Reservation(
+            f"R{number}", f"C{rng.randrange(reservations)}", hotel.hotel_id,
+            rng.randint(1, hotel.total_rooms), check_in,
+            check_in + rng.randint(1, 14)
+        ))
+    return hotel_list, reservation_list
+
+
+def naive_occupancy(
+        hotels: List[Hotel], reservations: List[Reservation],
+        start: date, end: date
+        ) -> Dict[str, List[float]]:
+    """
+    Occupancy rate per hotel and night, one reservation night at a time.
+    """
+    days = (end - start).days
+    occupied = {hotel.hotel_id: [0] * days for hotel in hotels}
+    for reservation in reservations:
+        nights = occupied.get(reservation.hotel_id)
+        if nights is None:
+            continue
+        night = max(reservation.check_in, start)
+        while night < min(reservation.check_out, end):
+            nights[(night - start).days] += 1
+            night += timedelta(days=1)
+    return {
+        hotel.hotel_id: [
+            count / hotel.total_rooms for count in occupied[hotel.hotel_id]
+        ]
+        for hotel in hotels
+    }
+
+
+def naive_length_of_stay(reservations: List[Reservation]) -> Counter:
+    """
+    Number of stays of each length in nights.
+    """
+    return Counter(
+        (reservation.check_out - reservation.check_in).days
+        for reservation in reservations
+    )
+
+
+def run(hotels: int, reservations: int, year: int) -> Dict[str, float]:
+    """
+    Times each report both ways and returns the timings by name.
+    """
+    hotel_list, reservation_list = generate(hotels, reservations, year)
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    arrays = ReservationArrays.from_reservations(reservation_list)
+
+    def vectorized_occupancy():
+        calendar = occupancy_calendar(arrays, hotel_list, start, end)
+        calendar.rates()
+        calendar.peak_nights()
+
+    return {
+        "to_arrays": best_of(
+            lambda: ReservationArrays.from_reservations(reservation_list)
+        ),
+        "occupancy_naive": best_of(
+            lambda: naive_occupancy(hotel_list, reservation_list, start, end)
+        ),
+        "occupancy_vectorized": best_of(vectorized_occupancy),
+        "length_of_stay_naive": best_of(
+            lambda: naive_length_of_stay(reservation_list)
+        ),
+        "length_of_stay_vectorized": best_of(
+            lambda: length_of_stay_histogram(arrays)
+        ),
+    }
+
+
+def main() -> None:
+    """
+    Parses the command line and prints the timings.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hotels", type=int, default=200)
+    parser.add_argument("--reservations", type=int, default=200_000)
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+    for name, seconds in run(args.hotels, args.reservations,
+                             args.year).items():
+        print(f"{name:28} {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
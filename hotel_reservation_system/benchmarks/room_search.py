@@ -0,0 +1,121 @@
+"""
+Measures free-room search latency over a synthetic hotel chain.
+
+Run from the hotel_reservation_system directory:
+
+    python -m benchmarks.room_search --hotels 20000 --reservations 200000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict
+from benchmarks.common import percentiles
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from services.room_search import RoomSearch
+from storage.json_storage import JsonFileStorage
+
+FIRST_DAY = date(2025, 1, 1).toordinal()
+
+
+def build(
+        directory: str, hotels: int, locations: int, reservations: int,
+        rng: random.Random
+        ) -> RoomSearch:
+    """
+    Creates random hotels and non-overlapping reservations in directory
+    and returns a search over them.
+    """
+    hotel_manager = HotelManager(JsonFileStorage(
+        os.path.join(directory, "hotels.json"), "hotel_id"))
+    reservation_manager = ReservationManager(JsonFileStorage(
+        os.path.join(directory, "reservations.json"), "reservation_id"))
+    hotel_manager.create_many(
+        {"hotel_id": f"H{number}", "name": f"Hotel {number}",
+         "location": f"City {number % locations}",
+         "total_rooms": rng.randint(10, 200)}
+        for number in range(hotels)
+    )
+    rooms = {hotel.hotel_id: hotel.total_rooms
+             for hotel in hotel_manager.hotels}
+    hotel_ids = list(rooms)
+    # Each room is booked in sequence so no two stays overlap.
+    next_free: Dict[tuple, int] = {}
+    items = []
+    for number in range(reservations):
+        hotel_id = rng.choice(hotel_ids)
+        room = (hotel_id, rng.randint(1, rooms[hotel_id]))
+        check_in = next_free.get(room, FIRST_DAY) + rng.randrange(30)
+        next_free[room] = check_in + rng.randint(1, 7)
+        items.append({
+            "reservation_id": f"R{number}", "customer_id": "C1",
+            "hotel_id": hotel_id, "room_number": room[1],
+            "check_in": check_in, "check_out": next_free[room]
+        })
+    reservation_manager.create_many(items)
+    return RoomSearch(hotel_manager, reservation_manager)
+
+
+def run(
+        hotels: int, locations: int, reservations: int, queries: int,
+        seed: int = 0
+        ) -> Dict[str, Dict[str, float]]:
+    """
+    Builds the chain in a temporary directory and times random searches
+    by location, and over every hotel.
+    """
+    rng = random.Random(seed)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        search = build(tmp_dir, hotels, locations, reservations, rng)
+
+        def timed(location):
+            check_in = date.fromordinal(FIRST_DAY + rng.randrange(358))
+            started = time.perf_counter()
+            search.search(location, check_in,
+                          check_in + timedelta(rng.randint(1, 7)))
+            return time.perf_counter() - started
+
+        # The first query builds the nightly bitmaps.
+        started = time.perf_counter()
+        search.search(None, date(2025, 6, 1), date(2025, 6, 2))
+        build_seconds = time.perf_counter() - started
+        return {
+            "first_query": {"ms": build_seconds * 1000},
+            "by_location": percentiles([
+                timed(f"City {rng.randrange(locations)}")
+                for _ in range(queries)
+            ]),
+            "all_hotels": percentiles([
+                timed(None) for _ in range(max(queries // 10, 1))
+            ]),
+        }
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def main() -> None:
+    """
+    Parses the command line and prints the latencies.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hotels", type=int, default=20_000)
+    parser.add_argument("--locations", type=int, default=100)
+    parser.add_argument("--reservations", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    results = run(args.hotels, args.locations, args.reservations,
+                  args.queries)
+    for name, timings in results.items():
+        print(f"{name:12} " + "  ".join(
+            f"{key} {value:8.2f}" for key, value in timings.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Console application demonstrating the Hotel Reservation System usage.
 """
 
+import logging
 from managers.hotel_manager import HotelManager
 from managers.customer_manager import CustomerManager
 from managers.reservation_manager import ReservationManager
@@ -11,6 +12,7 @@ def main():
     """
     Initializes and demonstrates the usage of the hotel reservation system.
     """
+    logging.basicConfig(level=logging.INFO)
     hotel_manager = HotelManager()
     customer_manager = CustomerManager()
     reservation_manager = ReservationManager()
@@ -0,0 +1,340 @@
+"""
+asyncio front ends for the managers.
+
+Each async manager wraps a regular manager whose storage is replaced by
+a BufferedStorage. Mutations update memory on the event loop as before,
+while disk writes are queued and flushed from a worker thread, so the
+loop never blocks on json.dump. Callers that arrive while a flush is
+pending share it: flush_interval seconds after the first queued change,
+everything queued so far is written at once (group commit).
+
+With durable=True (the default) a mutation only returns once the write
+that contains it has reached the storage, and a failed write is raised
+to every caller of that batch. With durable=False mutations return as
+soon as memory is updated and flush() must be awaited to be sure the
+changes are on disk. Reads are served from memory and never block; use
+the wrapped manager for them.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Iterable, List, Mapping, Optional
+from managers.batch import BatchResult
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from models.customer import Customer
+from models.hotel import Hotel
+from models.reservation import Reservation
+from storage.base import Storage
+from storage.buffered import BufferedStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.005
+
+
+class _AsyncManager:  # pylint: disable=too-many-instance-attributes
+    """
+    Group commit machinery shared by the async managers.
+    """
+
+    def __init__(
+            self, manager: Any, flush_interval: float, durable: bool
+            ):
+        """
+        :param manager: Loaded manager to wrap; its storage is buffered
+        :param flush_interval: Seconds to wait for more changes before
+            flushing the ones queued
+        :param durable: Whether mutations wait for their write
+        """
+        self.manager = manager
+        if not isinstance(manager.storage, BufferedStorage):
+            manager.storage = BufferedStorage(
+                manager.storage, key=manager.record_key
+            )
+        self.storage = manager.storage
+        self.flush_interval = flush_interval
+        self.durable = durable
+        self._waiters: List[asyncio.Future] = []
+        self._dirty = False
+        self._wake = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def _mutate(self, method: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a manager mutation and schedules the flush of its writes.
+        """
+        queued = self.storage.queued
+        result = method(*args, **kwargs)
+        if self.storage.queued == queued:
+            return result
+        loop = asyncio.get_running_loop()
+        waiter = None
+        if self.durable:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+        self._dirty = True
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_later())
+        if waiter is not None:
+            await waiter
+        return result
+
+    async def _flush_later(self) -> None:
+        """
+        Flushes the queued writes in batches until none are left.
+        """
+        try:
+            while self._dirty:
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                self._dirty = False
+                waiters, self._waiters = self._waiters, []
+                try:
+                    await asyncio.to_thread(self.storage.flush)
+                except Exception as error:  # pylint: disable=broad-except
+                    logger.error("Error flushing queued writes: %s", error)
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(error)
+                else:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+        finally:
+            self._flush_task = None
+
+    async def flush(self) -> None:
+        """
+        Writes every queued change now, without waiting for the flush
+        interval.
+        """
+        if self._flush_task is not None:
+            self._wake.set()
+            await asyncio.shield(self._flush_task)
+        await asyncio.to_thread(self.storage.flush)
+
+    async def reload_if_changed(self) -> bool:
+        """
+        Reloads the wrapped manager if another process changed the
+        storage. See the managers' reload_if_changed().
+        """
+        return await asyncio.to_thread(self.manager.reload_if_changed)
+
+    async def close(self) -> None:
+        """
+        Flushes the queued changes and closes the storage.
+        """
+        await self.flush()
+        await asyncio.to_thread(self.storage.close)
+
+
+class AsyncHotelManager(_AsyncManager):
+    """
+    asyncio front end for HotelManager.
+    """
+
+    def __init__(
+            self, storage: Optional[Storage] = None,
+            flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+            durable: bool = True
+            ):
+        """
+        Loads every hotel before returning, blocking the caller; from a
+        coroutine use open(), which loads them in a worker thread.
+
+        :param storage: Storage backend, as for HotelManager
+        """
+        super().__init__(
+            HotelManager(storage, lazy=False), flush_interval, durable
+        )
+
+    @classmethod
+    async def open(cls, *args, **kwargs) -> "AsyncHotelManager":
+        """
+        Creates the manager, loading the hotels in a worker thread.
+        """
+        return await asyncio.to_thread(cls, *args, **kwargs)
+
+    async def create_hotel(
+            self, hotel_id: str, name: str, location: str, total_rooms: int
+            ) -> Hotel:
+        """
+        See HotelManager.create_hotel.
+        """
+        return await self._mutate(
+            self.manager.create_hotel, hotel_id, name, location, total_rooms
+        )
+
+    async def delete_hotel(self, hotel_id: str) -> bool:
+        """
+        See HotelManager.delete_hotel.
+        """
+        return await self._mutate(self.manager.delete_hotel, hotel_id)
+
+    async def modify_hotel_information(self, hotel_id: str, **kwargs) -> bool:
+        """
+        See HotelManager.modify_hotel_information.
+        """
+        return await self._mutate(
+            self.manager.modify_hotel_information, hotel_id, **kwargs
+        )
+
+    async def create_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        See HotelManager.create_many.
+        """
+        return await self._mutate(self.manager.create_many, items)
+
+    async def delete_many(self, hotel_ids: Iterable[str]) -> BatchResult:
+        """
+        See HotelManager.delete_many.
+        """
+        return await self._mutate(self.manager.delete_many, hotel_ids)
+
+    async def modify_many(self, changes: Mapping[str, dict]) -> BatchResult:
+        """
+        See HotelManager.modify_many.
+        """
+        return await self._mutate(self.manager.modify_many, changes)
+
+
+class AsyncCustomerManager(_AsyncManager):
+    """
+    asyncio front end for CustomerManager.
+    """
+
+    def __init__(
+            self, storage: Optional[Storage] = None,
+            flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+            durable: bool = True
+            ):
+        """
+        Loads every customer before returning, blocking the caller; from
+        a coroutine use open(), which loads them in a worker thread.
+
+        :param storage: Storage backend, as for CustomerManager
+        """
+        super().__init__(
+            CustomerManager(storage, lazy=False), flush_interval, durable
+        )
+
+    @classmethod
+    async def open(cls, *args, **kwargs) -> "AsyncCustomerManager":
+        """
+        Creates the manager, loading the customers in a worker thread.
+        """
+        return await asyncio.to_thread(cls, *args, **kwargs)
+
+    async def create_customer(
+            self, customer_id: str, name: str, phone: str
+            ) -> Customer:
+        """
+        See CustomerManager.create_customer.
+        """
+        return await self._mutate(
+            self.manager.create_customer, customer_id, name, phone
+        )
+
+    async def delete_customer(self, customer_id: str) -> bool:
+        """
+        See CustomerManager.delete_customer.
+        """
+        return await self._mutate(self.manager.delete_customer, customer_id)
+
+    async def modify_customer_information(
+            self, customer_id: str, **kwargs
+            ) -> bool:
+        """
+        See CustomerManager.modify_customer_information.
+        """
+        return await self._mutate(
+            self.manager.modify_customer_information, customer_id, **kwargs
+        )
+
+    async def create_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        See CustomerManager.create_many.
+        """
+        return await self._mutate(self.manager.create_many, items)
+
+    async def delete_many(self, customer_ids: Iterable[str]) -> BatchResult:
+        """
+        See CustomerManager.delete_many.
+        """
+        return await self._mutate(self.manager.delete_many, customer_ids)
+
+    async def modify_many(self, changes: Mapping[str, dict]) -> BatchResult:
+        """
+        See CustomerManager.modify_many.
+        """
+        return await self._mutate(self.manager.modify_many, changes)
+
+
+class AsyncReservationManager(_AsyncManager):
+    """
+    asyncio front end for ReservationManager.
+    """
+
+    def __init__(
+            self, storage: Optional[Storage] = None,
+            flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+            durable: bool = True
+            ):
+        """
+        Loads every reservation before returning, blocking the caller;
+        from a coroutine use open(), which loads them in a worker thread.
+
+        :param storage: Storage backend, as for ReservationManager
+        """
+        super().__init__(
+            ReservationManager(storage, lazy=False), flush_interval,
+            durable
+        )
+
+    @classmethod
+    async def open(cls, *args, **kwargs) -> "AsyncReservationManager":
+        """
+        Creates the manager, loading the reservations in a worker thread.
+        """
+        return await asyncio.to_thread(cls, *args, **kwargs)
+
+    async def create_reservation(
+            self, reservation_data: dict
+            ) -> Reservation:
+        """
+        See ReservationManager.create_reservation.
+        """
+        return await self._mutate(
+            self.manager.create_reservation, reservation_data
+        )
+
+    async def cancel_reservation(self, reservation_id: str) -> bool:
+        """
+        See ReservationManager.cancel_reservation.
+        """
+        return await self._mutate(
+            self.manager.cancel_reservation, reservation_id
+        )
+
+    async def create_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        See ReservationManager.create_many.
+        """
+        return await self._mutate(self.manager.create_many, items)
+
+    async def cancel_many(
+            self, reservation_ids: Iterable[str]
+            ) -> BatchResult:
+        """
+        See ReservationManager.cancel_many.
+        """
+        return await self._mutate(
+            self.manager.cancel_many, reservation_ids
+        )
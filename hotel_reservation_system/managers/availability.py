@@ -0,0 +1,255 @@
+"""
+Per-room interval index over reservation stays.
+
+Stays are half-open intervals [check_in, check_out): a guest checking
+out on a given day does not conflict with one checking in that day.
+Because a room never holds overlapping stays, each room keeps its stays
+as parallel lists sorted by check-in, which are then also sorted by
+check-out. Overlap queries are a single bisect per room. Days are
+date ordinals, so every comparison is an integer comparison.
+
+For searches across many hotels the index can also keep, per hotel and
+night, a bitmap of the booked room numbers (bit n set when room n is
+booked). ORing the bitmaps of a stay's nights gives every room booked
+at some point of it, so counting free rooms needs no per-room work.
+The bitmaps are built on first use and maintained from then on. Only
+integer room numbers from 0 to MAX_BITMAP_ROOM have a bit, so a huge
+room number cannot blow up the bitmaps; rooms above it are checked one
+by one when counting, and any other room number is still indexed per
+room but never counted as one of a hotel's rooms.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+RoomKey = Tuple[str, int]
+
+# Highest room number kept in the night bitmaps.
+MAX_BITMAP_ROOM = 4096
+
+
+def _is_int(room_number: int) -> bool:
+    """
+    Returns whether a room number is an int, bools excluded.
+    """
+    return isinstance(room_number, int) and not isinstance(room_number, bool)
+
+
+def _room_bit(room_number: int) -> int:
+    """
+    Returns the bitmap bit of a room, or 0 if its number has none.
+    """
+    if _is_int(room_number) and 0 <= room_number <= MAX_BITMAP_ROOM:
+        return 1 << room_number
+    return 0
+
+
+def _mark(
+        bitmaps: Dict[str, Dict[int, int]], hotel_id: str,
+        room_number: int, check_in: int, check_out: int
+        ) -> None:
+    """
+    Sets the bit of a room on each night of a stay in bitmaps.
+    """
+    bit = _room_bit(room_number)
+    if not bit:
+        return
+    nights = bitmaps.setdefault(hotel_id, {})
+    for night in range(check_in, check_out):
+        nights[night] = nights.get(night, 0) | bit
+
+
+class _RoomStays:  # pylint: disable=too-few-public-methods
+    """
+    Sorted, non-overlapping stays of a single room.
+    """
+
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.ids: List[str] = []
+
+    def find_overlap(self, start: int, end: int) -> Optional[int]:
+        """
+        Returns the position of a stay overlapping [start, end), or None.
+        """
+        # First stay that ends after the requested start; stays are
+        # disjoint, so it is the only candidate for an overlap.
+        position = bisect_right(self.ends, start)
+        if position < len(self.starts) and self.starts[position] < end:
+            return position
+        return None
+
+
+class RoomAvailabilityIndex:
+    """
+    Maps (hotel_id, room_number) to the booked stays of that room.
+    """
+
+    def __init__(self):
+        self._rooms: Dict[RoomKey, _RoomStays] = {}
+        # hotel_id -> night -> bitmap of booked rooms; None until used.
+        self._nights: Optional[Dict[str, Dict[int, int]]] = None
+        # hotel_id -> booked room numbers above MAX_BITMAP_ROOM.
+        self._oversized: Dict[str, Set[int]] = {}
+
+    def clear(self) -> None:
+        """
+        Removes every indexed stay.
+        """
+        self._rooms = {}
+        self._nights = None
+        self._oversized = {}
+
+    def find_conflict(
+            self, hotel_id: str, room_number: int, check_in: int,
+            check_out: int
+            ) -> Optional[str]:
+        """
+        Returns the ID of a reservation overlapping the given stay,
+        or None if the room is free.
+        """
+        stays = self._rooms.get((hotel_id, room_number))
+        if stays is None:
+            return None
+        position = stays.find_overlap(check_in, check_out)
+        return None if position is None else stays.ids[position]
+
+    def add(
+            self, reservation_id: str, hotel_id: str, room_number: int,
+            check_in: int, check_out: int
+            ) -> None:
+        """
+        Indexes a stay. Raises ValueError if it overlaps an existing one.
+        """
+        stays = self._rooms.setdefault((hotel_id, room_number), _RoomStays())
+        conflict = stays.find_overlap(check_in, check_out)
+        if conflict is not None:
+            raise ValueError(
+                f"Room {room_number} in hotel '{hotel_id}' is already "
+                f"booked by reservation '{stays.ids[conflict]}' for "
+                f"{date.fromordinal(check_in)} to "
+                f"{date.fromordinal(check_out)}."
+            )
+        position = bisect_left(stays.starts, check_in)
+        stays.starts.insert(position, check_in)
+        stays.ends.insert(position, check_out)
+        stays.ids.insert(position, reservation_id)
+        if _is_int(room_number) and room_number > MAX_BITMAP_ROOM:
+            self._oversized.setdefault(hotel_id, set()).add(room_number)
+        if self._nights is not None:
+            _mark(self._nights, hotel_id, room_number, check_in, check_out)
+
+    def remove(
+            self, reservation_id: str, hotel_id: str, room_number: int,
+            check_in: int
+            ) -> bool:
+        """
+        Removes an indexed stay. Returns False if it was not indexed.
+        """
+        key = (hotel_id, room_number)
+        stays = self._rooms.get(key)
+        if stays is None:
+            return False
+        position = bisect_left(stays.starts, check_in)
+        if (
+            position == len(stays.ids)
+            or stays.ids[position] != reservation_id
+        ):
+            return False
+        check_out = stays.ends[position]
+        del stays.starts[position]
+        del stays.ends[position]
+        del stays.ids[position]
+        if not stays.ids:
+            del self._rooms[key]
+            oversized = self._oversized.get(hotel_id)
+            if oversized is not None:
+                oversized.discard(room_number)
+                if not oversized:
+                    del self._oversized[hotel_id]
+        if self._nights is not None:
+            self._unmark(hotel_id, room_number, check_in, check_out)
+        return True
+
+    def _unmark(
+            self, hotel_id: str, room_number: int, check_in: int,
+            check_out: int
+            ) -> None:
+        """
+        Clears the bit of a room on each night of a stay.
+        """
+        bit = _room_bit(room_number)
+        if not bit:
+            return
+        nights = self._nights.get(hotel_id, {})
+        for night in range(check_in, check_out):
+            booked = nights.get(night, 0) & ~bit
+            if booked:
+                nights[night] = booked
+            else:
+                nights.pop(night, None)
+        if not nights:
+            self._nights.pop(hotel_id, None)
+
+    def _build_bitmaps(self) -> Dict[str, Dict[int, int]]:
+        """
+        Returns the night bitmaps of every indexed stay. They are built
+        aside, so a failure never leaves half-built bitmaps in place.
+        """
+        bitmaps: Dict[str, Dict[int, int]] = {}
+        for (hotel_id, room_number), stays in self._rooms.items():
+            for start, end in zip(stays.starts, stays.ends):
+                _mark(bitmaps, hotel_id, room_number, start, end)
+        return bitmaps
+
+    def free_room_counts(
+            self, hotels: Iterable[Tuple[str, int]], check_in: int,
+            check_out: int
+            ) -> List[int]:
+        """
+        Returns, for each (hotel_id, total_rooms) pair, the number of
+        rooms numbered 1 to total_rooms free for the whole stay.
+        """
+        if self._nights is None:
+            self._nights = self._build_bitmaps()
+        nights_range = range(check_in, check_out)
+        counts = []
+        for hotel_id, total_rooms in hotels:
+            if total_rooms <= 0:
+                counts.append(0)
+                continue
+            nights = self._nights.get(hotel_id)
+            booked = 0
+            if nights:
+                for night in nights_range:
+                    booked |= nights.get(night, 0)
+            # Bits 1..total_rooms are the hotel's rooms.
+            booked &= (1 << (min(total_rooms, MAX_BITMAP_ROOM) + 1)) - 2
+            taken = booked.bit_count()
+            if total_rooms > MAX_BITMAP_ROOM:
+                taken += sum(
+                    1 for room_number in self._oversized.get(hotel_id, ())
+                    if room_number <= total_rooms and self.find_conflict(
+                        hotel_id, room_number, check_in, check_out
+                    ) is not None
+                )
+            counts.append(total_rooms - taken)
+        return counts
+
+    def free_rooms(
+            self, hotel_id: str, room_numbers: Iterable[int],
+            check_in: int, check_out: int
+            ) -> List[int]:
+        """
+        Returns the subset of room_numbers free for the whole stay.
+        """
+        return [
+            room_number for room_number in room_numbers
+            if self.find_conflict(
+                hotel_id, room_number, check_in, check_out
+            ) is None
+        ]
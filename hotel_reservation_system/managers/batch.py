@@ -0,0 +1,25 @@
+"""
+Result type shared by the managers' bulk operations.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of a bulk operation.
+
+    succeeded holds the created/modified objects or the deleted IDs,
+    failed holds (item, error) pairs for the items that were skipped.
+    """
+    succeeded: List[Any] = field(default_factory=list)
+    failed: List[Tuple[Any, Exception]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns True if no item failed.
+        """
+        return not self.failed
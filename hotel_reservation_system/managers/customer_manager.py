@@ -1,12 +1,19 @@
 """
 Manager class that handles CRUD operations for Customer objects.
-Stores data in a JSON file.
+Stores data through a pluggable storage backend, a JSON file by default.
 """
 
 import json
 import os
-from typing import List, Optional
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional
+from managers import events
+from managers.batch import BatchResult
+from managers.metrics import instrumented
+from managers.persistence import PersistenceMixin, PersistencePolicy
 from models.customer import Customer
+from storage.base import DELETE, PUT, ProgressCallback, Storage
+from storage.json_storage import JsonFileStorage
 
 BASE_DIR = os.path.dirname(
     os.path.abspath(__file__)
@@ -17,114 +24,326 @@ CUSTOMER_DATA_FILE = os.path.join(
     )
 
 
-class CustomerManager:
+def _customer_from_record(item: dict) -> Customer:
+    """
+    Returns the Customer stored as a record.
+    Raises KeyError, ValueError or TypeError for invalid records.
+    """
+    return Customer(
+        customer_id=item["customer_id"],
+        name=item["name"],
+        phone=item["phone"]
+    )
+
+
+class CustomerManager(PersistenceMixin):
     """
     Manages Customer objects, including creation, deletion, display,
     modification, and saving/loading to/from JSON.
     """
 
-    def __init__(self):
-        self.customers: List[Customer] = []
+    metrics_name = "customer"
+    record_key = "customer_id"
+
+    def __init__(
+            self, storage: Optional[Storage] = None,
+            persistence: Optional[PersistencePolicy] = None,
+            lazy: bool = True
+            ):
+        """
+        :param storage: Storage backend, defaults to CUSTOMER_DATA_FILE
+        :param persistence: When mutations are written, immediately
+            by default
+        :param lazy: Load the customers on first access instead of now
+        """
+        # Guards the in-memory collection and orders writes to storage.
+        self._lock = threading.RLock()
+        self._init_persistence(
+            storage or JsonFileStorage(CUSTOMER_DATA_FILE, "customer_id"),
+            persistence
+        )
+        self._customers_by_id: Dict[str, Customer] = {}
+        if not lazy:
+            self.load_customers()
+
+    @property
+    def customers(self) -> List[Customer]:
+        """
+        Returns the managed customers in insertion order.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._customers_by_id.values())
+
+    def _load(self) -> None:
+        """
+        Loads the customers on first access.
+        """
         self.load_customers()
 
-    def load_customers(self) -> None:
+    @instrumented("load")
+    def load_customers(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> None:
         """
         Loads customer data from JSON file.
         Invalid records are logged and skipped.
-        """
-        self.customers = []
-        if not os.path.exists(CUSTOMER_DATA_FILE):
-            return
+        Records are streamed from storage one at a time.
 
-        try:
-            with open(CUSTOMER_DATA_FILE, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                for item in data:
+        :param progress: Called as progress(bytes_read, total_bytes)
+            while the file is read
+        """
+        with self._lock:
+            self._customers_by_id = {}
+            self._loaded = True
+            try:
+                for item in self.storage.iter_records(progress):
                     try:
-                        customer = Customer(
-                            customer_id=item["customer_id"],
-                            name=item["name"],
-                            phone=item["phone"]
-                        )
-                        self.customers.append(customer)
+                        customer = _customer_from_record(item)
+                        if customer.customer_id in self._customers_by_id:
+                            raise ValueError("duplicate customer ID")
+                        self._customers_by_id[customer.customer_id] = customer
                     except (KeyError, ValueError, TypeError) as error:
                         print("Error loading "
                               f"customer record: {item} => {error}")
-        except (json.JSONDecodeError, OSError) as error:
-            print(f"Error reading customer file: {error}")
+            except (json.JSONDecodeError, OSError) as error:
+                print(f"Error reading customer file: {error}")
 
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the customers if another process changed the storage since
+        they were loaded. Cheap enough to call at the start of every
+        request.
+
+        :return: True if the customers were reloaded
+        """
+        if not self._loaded or not self.storage.has_changed():
+            return False
+        self.load_customers()
+        return True
+
+    @instrumented("save")
     def save_customers(self) -> None:
         """
         Saves customer data to JSON file.
         """
-        data = []
-        for customer in self.customers:
-            data.append({
-                "customer_id": customer.customer_id,
-                "name": customer.name,
-                "phone": customer.phone
-            })
-        with open(CUSTOMER_DATA_FILE, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
+        self._save_all()
+
+    def _records(self) -> List[dict]:
+        """
+        Returns every customer as a serializable dictionary.
+        """
+        with self._lock:
+            return [
+                customer.to_dict()
+                for customer in self._customers_by_id.values()
+            ]
 
+    @instrumented("create")
     def create_customer(
             self, customer_id: str, name: str, phone: str
             ) -> Customer:
         """
         Creates a new Customer and saves it.
         """
-        if self.get_customer_by_id(customer_id) is not None:
-            raise ValueError("Customer with "
-                             f"ID '{customer_id}' already exists.")
+        self._ensure_loaded()
+        with self._lock:
+            if customer_id in self._customers_by_id:
+                raise ValueError("Customer with "
+                                 f"ID '{customer_id}' already exists.")
 
-        new_customer = Customer(customer_id, name, phone)
-        self.customers.append(new_customer)
-        self.save_customers()
-        return new_customer
+            new_customer = Customer(customer_id, name, phone)
+            self._customers_by_id[customer_id] = new_customer
+            record = new_customer.to_dict()
+            try:
+                self.storage.write(PUT, customer_id, record, self._records)
+            except Exception:
+                del self._customers_by_id[customer_id]
+                raise
+            self._publish(events.CREATE, [(customer_id, record)])
+            return new_customer
 
+    @instrumented("delete")
     def delete_customer(self, customer_id: str) -> bool:
         """
         Deletes a Customer by its ID if it exists.
         """
-        customer = self.get_customer_by_id(customer_id)
-        if customer:
-            self.customers.remove(customer)
-            self.save_customers()
-            return True
-        return False
+        self._ensure_loaded()
+        with self._lock:
+            customer = self._customers_by_id.pop(customer_id, None)
+            if customer is not None:
+                try:
+                    self.storage.write(DELETE, customer_id, None,
+                                       self._records)
+                except Exception:
+                    self._customers_by_id[customer_id] = customer
+                    raise
+                self._publish(events.DELETE, [(customer_id, None)])
+                return True
+            return False
+
+    @instrumented("create_many")
+    def create_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        Creates several customers from dictionaries with the same fields
+        as create_customer and saves them with a single write.
+        Invalid items are logged and skipped.
+        """
+        self._ensure_loaded()
+        result = BatchResult()
+        staged: Dict[str, Customer] = {}
+        with self._lock:
+            for item in items:
+                try:
+                    customer = _customer_from_record(item)
+                    if customer.customer_id in self._customers_by_id or (
+                            customer.customer_id in staged):
+                        raise ValueError("Customer with "
+                                         f"ID '{customer.customer_id}' "
+                                         "already exists.")
+                    staged[customer.customer_id] = customer
+                    result.succeeded.append(customer)
+                except (KeyError, ValueError, TypeError) as error:
+                    print("Error creating "
+                          f"customer record: {item} => {error}")
+                    result.failed.append((item, error))
+
+            self._customers_by_id.update(staged)
+            created = [(key, customer.to_dict())
+                       for key, customer in staged.items()]
+            try:
+                self._write_and_publish(events.CREATE, created)
+            except Exception:
+                for key in staged:
+                    del self._customers_by_id[key]
+                raise
+            return result
+
+    @instrumented("delete_many")
+    def delete_many(self, customer_ids: Iterable[str]) -> BatchResult:
+        """
+        Deletes several customers by ID and saves once.
+        Unknown IDs are logged and skipped.
+        """
+        self._ensure_loaded()
+        result = BatchResult()
+        removed: Dict[str, Customer] = {}
+        with self._lock:
+            for customer_id in customer_ids:
+                customer = self._customers_by_id.pop(customer_id, None)
+                if customer is None:
+                    error = ValueError("No customer found with "
+                                       f"ID '{customer_id}'.")
+                    print(f"Error deleting customer: {error}")
+                    result.failed.append((customer_id, error))
+                    continue
+                removed[customer_id] = customer
+                result.succeeded.append(customer_id)
+
+            try:
+                self._write_and_publish(
+                    events.DELETE, [(key, None) for key in removed]
+                )
+            except Exception:
+                self._customers_by_id.update(removed)
+                raise
+            return result
+
+    @instrumented("modify_many")
+    def modify_many(self, changes: Mapping[str, dict]) -> BatchResult:
+        """
+        Applies modify_customer_information to several customers, given
+        as a mapping of customer ID to the fields to change, and saves
+        once. Unknown IDs are logged and skipped.
+        """
+        self._ensure_loaded()
+        result = BatchResult()
+        previous: Dict[str, dict] = {}
+        with self._lock:
+            for customer_id, fields in changes.items():
+                customer = self._customers_by_id.get(customer_id)
+                if customer is None:
+                    error = ValueError("No customer found with "
+                                       f"ID '{customer_id}'.")
+                    print(f"Error modifying customer: {error}")
+                    result.failed.append(((customer_id, fields), error))
+                    continue
+                previous[customer_id] = customer.to_dict()
+                if "name" in fields:
+                    customer.name = fields["name"]
+                if "phone" in fields:
+                    customer.phone = fields["phone"]
+                result.succeeded.append(customer)
+
+            try:
+                self._write_and_publish(events.MODIFY, [
+                    (key, self._customers_by_id[key].to_dict())
+                    for key in previous
+                ])
+            except Exception:
+                for key, fields in previous.items():
+                    customer = self._customers_by_id[key]
+                    customer.name = fields["name"]
+                    customer.phone = fields["phone"]
+                raise
+            return result
 
     def display_customer_information(self, customer_id: str) -> None:
         """
         Prints customer information to console.
         """
-        customer = self.get_customer_by_id(customer_id)
-        if customer:
-            print(f"Customer ID: {customer.customer_id}")
-            print(f"Name: {customer.name}")
-            print(f"Phone: {customer.phone}")
-        else:
-            print(f"No customer found with ID '{customer_id}'.")
+        self._ensure_loaded()
+        with self._lock:
+            customer = self.get_customer_by_id(customer_id)
+            if customer:
+                print(f"Customer ID: {customer.customer_id}")
+                print(f"Name: {customer.name}")
+                print(f"Phone: {customer.phone}")
+            else:
+                print(f"No customer found with ID '{customer_id}'.")
 
+    @instrumented("modify")
     def modify_customer_information(self, customer_id: str, **kwargs) -> bool:
         """
         Modifies customer information (name, phone).
         """
-        customer = self.get_customer_by_id(customer_id)
-        if not customer:
-            return False
+        self._ensure_loaded()
+        with self._lock:
+            customer = self.get_customer_by_id(customer_id)
+            if not customer:
+                return False
 
-        if "name" in kwargs:
-            customer.name = kwargs["name"]
-        if "phone" in kwargs:
-            customer.phone = kwargs["phone"]
-        self.save_customers()
-        return True
+            previous = customer.to_dict()
+            if "name" in kwargs:
+                customer.name = kwargs["name"]
+            if "phone" in kwargs:
+                customer.phone = kwargs["phone"]
+            record = customer.to_dict()
+            try:
+                self.storage.write(PUT, customer_id, record, self._records)
+            except Exception:
+                customer.name = previous["name"]
+                customer.phone = previous["phone"]
+                raise
+            self._publish(events.MODIFY, [(customer_id, record)])
+            return True
 
+    @instrumented("get")
     def get_customer_by_id(self, customer_id: str) -> Optional[Customer]:
         """
         Returns a Customer object by ID or None.
+        Until the customers are loaded, a storage with point reads is
+        asked for the one customer instead.
         """
-        for customer in self.customers:
-            if customer.customer_id == customer_id:
-                return customer
-        return None
+        if not self._loaded and self.storage.point_reads:
+            item = self.storage.get(customer_id)
+            if item is None:
+                return None
+            try:
+                return _customer_from_record(item)
+            except (KeyError, ValueError, TypeError) as error:
+                print(f"Error loading customer record: {item} => {error}")
+                return None
+        self._ensure_loaded()
+        with self._lock:
+            return self._customers_by_id.get(customer_id)
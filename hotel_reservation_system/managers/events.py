@@ -0,0 +1,313 @@
+"""
+Events Module
+
+Change-data-capture feed for the managers. Once a ChangeFeed is
+attached, every create_*, modify_*, delete_*, cancel_* and archive call
+that changed something publishes one ChangeEvent per affected object:
+
+    {"seq": 42, "entity": "reservation", "op": "cancel", "key": "R7",
+     "record": null, "ts": 1760000000.0}
+
+record holds the object after the change, or null when it was removed.
+Sequence numbers increase by one with every event, across every manager
+attached to the feed and across restarts.
+
+Events go to in-process subscribers and, given a path, to an
+append-only JSON lines outbox. Several processes may share one outbox:
+appends hold the same file lock as the JSON storage, and each process
+picks up the sequence number where the others left it. Consumers resume
+with read(since) or subscribe(..., since=...) from the last sequence
+number they processed instead of rescanning the data files.
+
+Events are published once the manager's storage accepted the write; with
+a deferred persistence policy that is before the data file is written.
+An event is only numbered and delivered once it is in the outbox: if the
+outbox cannot be written, the changes are kept and retried, ahead of any
+new ones, by the next publish, so sequence numbers never skip one.
+Damaged lines in the outbox are logged and skipped.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+from storage.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+MODIFY = "modify"
+DELETE = "delete"
+CANCEL = "cancel"
+ARCHIVE = "archive"
+
+# An outbox offset is remembered every CHECKPOINT_EVERY events, so
+# read(since) seeks close to since instead of scanning from the start.
+CHECKPOINT_EVERY = 1024
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    One change to one managed object.
+    """
+
+    seq: int
+    entity: str
+    op: str
+    key: str
+    record: Optional[dict]
+    ts: float
+
+    def to_json(self) -> str:
+        """
+        Returns the event as a single compact JSON line.
+        """
+        return json.dumps(asdict(self), separators=(",", ":")) + "\n"
+
+
+Subscriber = Callable[[ChangeEvent], None]
+
+# (entity, op, key, record, ts) of a change waiting for its number.
+_Change = Tuple[str, str, str, Optional[dict], float]
+
+
+class ChangeFeed:  # pylint: disable=too-many-instance-attributes
+    """
+    Numbers change events and hands them to subscribers and an outbox.
+    """
+
+    def __init__(self, path: Optional[str] = None, fsync: bool = True):
+        """
+        :param path: Path of the outbox file, None to only notify
+            in-process subscribers
+        :param fsync: Whether each append is fsynced to disk
+        """
+        self.path = path
+        self.fsync = fsync
+        # Serializes publishing so events reach every subscriber and the
+        # outbox in sequence order.
+        self._lock = threading.RLock()
+        self._subscribers: Dict[int, Subscriber] = {}
+        self._next_token = 0
+        self._last_seq = 0
+        # Bytes of the outbox already scanned for sequence numbers.
+        self._end = 0
+        # (seq, offset of the line holding seq), sorted by seq.
+        self._checkpoints: List[Tuple[int, int]] = []
+        # Changes the outbox could not take yet, oldest first.
+        self._pending: List[_Change] = []
+        self._file_lock: Optional[FileLock] = None
+        if path is not None:
+            self._file_lock = FileLock(path + ".lock")
+            with self._file_lock.exclusive():
+                self._repair()
+                self._catch_up()
+
+    @property
+    def last_seq(self) -> int:
+        """
+        Returns the sequence number of the latest event seen.
+        """
+        with self._lock:
+            return self._last_seq
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns how many changes wait for the outbox to be writable.
+        """
+        with self._lock:
+            return len(self._pending)
+
+    def _repair(self) -> None:
+        """
+        Truncates a partial last line left by an interrupted append.
+        Must be called with the file lock held.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as file:
+            size = file.seek(0, os.SEEK_END)
+            if not size:
+                return
+            file.seek(max(size - 65536, 0))
+            tail = file.read()
+            if tail.endswith(b"\n"):
+                return
+            end = size - len(tail) + tail.rfind(b"\n") + 1
+            logger.warning("Truncating partial event at the end of %s",
+                           self.path)
+            file.truncate(end)
+
+    def _catch_up(self) -> None:
+        """
+        Reads the sequence numbers appended since the last scan, by this
+        or another process. Must be called with the file lock held.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            file.seek(self._end)
+            offset = self._end
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                event = self._parse(line, offset)
+                if event is not None:
+                    self._note(event.seq, offset)
+                offset += len(line)
+            self._end = offset
+
+    def _parse(self, line: bytes, offset: int) -> Optional[ChangeEvent]:
+        """
+        Returns the event stored on an outbox line, or None after
+        logging it if the line is damaged.
+        """
+        try:
+            event = ChangeEvent(**json.loads(line))
+            if isinstance(event.seq, int):
+                return event
+        except (ValueError, TypeError):
+            pass
+        logger.warning("Skipping damaged event at byte %d of %s",
+                       offset, self.path)
+        return None
+
+    def _note(self, seq: int, offset: int) -> None:
+        """
+        Records that the event seq starts at offset in the outbox.
+        """
+        self._last_seq = seq
+        if seq % CHECKPOINT_EVERY == 1:
+            self._checkpoints.append((seq, offset))
+
+    def publish(
+            self, entity: str, op: str,
+            changes: Iterable[Tuple[str, Optional[dict]]]
+            ) -> List[ChangeEvent]:
+        """
+        Publishes one event per (key, record) pair, after any changes
+        still pending, and returns the events published.
+
+        If the outbox cannot be written the error is logged, not raised,
+        since the changes have already been made: they stay pending and
+        are published by the next call.
+        """
+        now = time.time()
+        with self._lock:
+            self._pending.extend((entity, op, key, record, now)
+                                 for key, record in changes)
+            if not self._pending:
+                return []
+            if self._file_lock is None:
+                events = self._number()
+                self._last_seq = events[-1].seq
+            else:
+                try:
+                    with self._file_lock.exclusive():
+                        self._catch_up()
+                        events = self._number()
+                        self._append(events)
+                except OSError as error:
+                    logger.error("Could not write events to %s, %d kept "
+                                 "for the next publish: %s", self.path,
+                                 len(self._pending), error)
+                    return []
+            self._pending = []
+            for event in events:
+                self._deliver(event)
+            return events
+
+    def _number(self) -> List[ChangeEvent]:
+        """
+        Returns the pending changes as events numbered after the latest
+        one seen.
+        """
+        return [
+            ChangeEvent(self._last_seq + number, *change)
+            for number, change in enumerate(self._pending, start=1)
+        ]
+
+    def _append(self, events: List[ChangeEvent]) -> None:
+        """
+        Appends events to the outbox in a single write, truncating it
+        back if that fails. Must be called with the file lock held.
+        """
+        lines = [event.to_json().encode("utf-8") for event in events]
+        # Unbuffered, so nothing is left to be written after a truncate.
+        with open(self.path, "ab", buffering=0) as file:
+            try:
+                data = memoryview(b"".join(lines))
+                while data:
+                    data = data[file.write(data):]
+                if self.fsync:
+                    os.fsync(file.fileno())
+            except OSError:
+                file.truncate(self._end)
+                raise
+        for event, line in zip(events, lines):
+            self._note(event.seq, self._end)
+            self._end += len(line)
+
+    def _deliver(self, event: ChangeEvent) -> None:
+        """
+        Hands an event to every subscriber. A failing subscriber is
+        logged and does not stop the others.
+        """
+        for subscriber in list(self._subscribers.values()):
+            try:
+                subscriber(event)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error("Change subscriber failed on event %d: %s",
+                             event.seq, error)
+
+    def subscribe(
+            self, subscriber: Subscriber, since: Optional[int] = None
+            ) -> Callable[[], None]:
+        """
+        Calls subscriber with every event published from now on and
+        returns a function that unsubscribes it. Given since, the events
+        after that sequence number are replayed from the outbox first,
+        with no gap or repeat before the live ones.
+        """
+        with self._lock:
+            if since is not None:
+                for event in self.read(since):
+                    subscriber(event)
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = subscriber
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers.pop(token, None)
+        return unsubscribe
+
+    def read(self, since: int = 0) -> Iterator[ChangeEvent]:
+        """
+        Yields the outbox events with a sequence number above since, in
+        order. Reading starts at the nearest checkpoint, not at the
+        beginning of the file.
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with self._lock:
+            position = bisect.bisect_right(self._checkpoints,
+                                           (since + 1, float("inf")))
+            offset = self._checkpoints[position - 1][1] if position else 0
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    return
+                event = self._parse(line, offset)
+                offset += len(line)
+                if event is not None and event.seq > since:
+                    yield event
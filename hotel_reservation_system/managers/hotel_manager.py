@@ -1,12 +1,22 @@
 """
 Manager class that handles CRUD operations for Hotel objects.
-Stores data in a JSON file.
+Stores data through a pluggable storage backend, a JSON file by default.
+Hotels are also indexed by location, compared ignoring case and extra
+whitespace.
 """
 
 import json
 import os
-from typing import List, Optional
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional
+from managers import events
+from managers.batch import BatchResult
+from managers.indexes import GroupIndex
+from managers.metrics import instrumented
+from managers.persistence import PersistenceMixin, PersistencePolicy
 from models.hotel import Hotel
+from storage.base import DELETE, PUT, ProgressCallback, Storage
+from storage.json_storage import JsonFileStorage
 
 
 BASE_DIR = os.path.dirname(
@@ -15,118 +25,375 @@ BASE_DIR = os.path.dirname(
 HOTEL_DATA_FILE = os.path.join(BASE_DIR, "../data/hotels.json")
 
 
-class HotelManager:
+def location_key(location: str) -> str:
+    """
+    Returns the form of a location used to compare it with others.
+    """
+    return " ".join(str(location).split()).casefold()
+
+
+def _hotel_from_record(item: dict) -> Hotel:
+    """
+    Returns the Hotel stored as a record.
+    Raises KeyError, ValueError or TypeError for invalid records.
+    """
+    return Hotel(
+        hotel_id=item["hotel_id"],
+        name=item["name"],
+        location=item["location"],
+        total_rooms=int(item["total_rooms"])
+    )
+
+
+class HotelManager(PersistenceMixin):
     """
     Manages Hotel objects, including creation, deletion, display,
     modification, and saving/loading to/from JSON.
     """
 
-    def __init__(self):
-        self.hotels: List[Hotel] = []
+    metrics_name = "hotel"
+    record_key = "hotel_id"
+
+    def __init__(
+            self, storage: Optional[Storage] = None,
+            persistence: Optional[PersistencePolicy] = None,
+            lazy: bool = True
+            ):
+        """
+        :param storage: Storage backend, defaults to HOTEL_DATA_FILE
+        :param persistence: When mutations are written, immediately
+            by default
+        :param lazy: Load the hotels on first access instead of now
+        """
+        # Guards the in-memory collection and orders writes to storage.
+        self._lock = threading.RLock()
+        self._init_persistence(
+            storage or JsonFileStorage(HOTEL_DATA_FILE, "hotel_id"),
+            persistence
+        )
+        self._hotels_by_id: Dict[str, Hotel] = {}
+        self._by_location: GroupIndex[Hotel] = GroupIndex()
+        if not lazy:
+            self.load_hotels()
+
+    @property
+    def hotels(self) -> List[Hotel]:
+        """
+        Returns the managed hotels in insertion order.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._hotels_by_id.values())
+
+    def _load(self) -> None:
+        """
+        Loads the hotels on first access.
+        """
         self.load_hotels()
 
-    def load_hotels(self) -> None:
+    @instrumented("load")
+    def load_hotels(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> None:
         """
         Loads hotel data from the JSON file.
         Invalid records are logged to console and skipped.
-        """
-        self.hotels = []
-        if not os.path.exists(HOTEL_DATA_FILE):
-            return
+        Records are streamed from storage one at a time.
 
-        try:
-            with open(HOTEL_DATA_FILE, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                for item in data:
+        :param progress: Called as progress(bytes_read, total_bytes)
+            while the file is read
+        """
+        with self._lock:
+            self._hotels_by_id = {}
+            self._by_location.clear()
+            self._loaded = True
+            try:
+                for item in self.storage.iter_records(progress):
                     try:
-                        hotel = Hotel(
-                            hotel_id=item["hotel_id"],
-                            name=item["name"],
-                            location=item["location"],
-                            total_rooms=int(item["total_rooms"])
-                        )
-                        self.hotels.append(hotel)
+                        hotel = _hotel_from_record(item)
+                        if hotel.hotel_id in self._hotels_by_id:
+                            raise ValueError("duplicate hotel ID")
+                        self._add(hotel)
                     except (KeyError, ValueError, TypeError) as error:
                         print(f"Error loading hotel record: {item} => {error}")
-        except (json.JSONDecodeError, OSError) as error:
-            print(f"Error reading hotel file: {error}")
+            except (json.JSONDecodeError, OSError) as error:
+                print(f"Error reading hotel file: {error}")
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the hotels if another process changed the storage since
+        they were loaded. Cheap enough to call at the start of every
+        request.
 
+        :return: True if the hotels were reloaded
+        """
+        if not self._loaded or not self.storage.has_changed():
+            return False
+        self.load_hotels()
+        return True
+
+    @instrumented("save")
     def save_hotels(self) -> None:
         """
         Saves hotel data to the JSON file.
         """
-        data = []
-        for hotel in self.hotels:
-            data.append({
-                "hotel_id": hotel.hotel_id,
-                "name": hotel.name,
-                "location": hotel.location,
-                "total_rooms": hotel.total_rooms
-            })
-        with open(HOTEL_DATA_FILE, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
+        self._save_all()
+
+    def _records(self) -> List[dict]:
+        """
+        Returns every hotel as a serializable dictionary.
+        """
+        with self._lock:
+            return [hotel.to_dict() for hotel in self._hotels_by_id.values()]
 
+    @instrumented("create")
     def create_hotel(
             self, hotel_id: str, name: str, location: str, total_rooms: int
             ) -> Hotel:
         """
         Creates a new Hotel and saves it to file.
         """
-        # Check if hotel ID already exists
-        if self.get_hotel_by_id(hotel_id) is not None:
-            raise ValueError(f"Hotel with ID '{hotel_id}' already exists.")
+        self._ensure_loaded()
+        with self._lock:
+            # Check if hotel ID already exists
+            if hotel_id in self._hotels_by_id:
+                raise ValueError(f"Hotel with ID '{hotel_id}' already exists.")
 
-        new_hotel = Hotel(hotel_id, name, location, total_rooms)
-        self.hotels.append(new_hotel)
-        self.save_hotels()
-        return new_hotel
+            new_hotel = Hotel(hotel_id, name, location, total_rooms)
+            self._add(new_hotel)
+            record = new_hotel.to_dict()
+            try:
+                self.storage.write(PUT, hotel_id, record, self._records)
+            except Exception:
+                self._remove(new_hotel)
+                raise
+            self._publish(events.CREATE, [(hotel_id, record)])
+            return new_hotel
 
+    @instrumented("delete")
     def delete_hotel(self, hotel_id: str) -> bool:
         """
         Deletes a Hotel by its ID if it exists.
         """
-        hotel = self.get_hotel_by_id(hotel_id)
-        if hotel:
-            self.hotels.remove(hotel)
-            self.save_hotels()
-            return True
-        return False
+        self._ensure_loaded()
+        with self._lock:
+            hotel = self._hotels_by_id.get(hotel_id)
+            if hotel is not None:
+                self._remove(hotel)
+                try:
+                    self.storage.write(DELETE, hotel_id, None, self._records)
+                except Exception:
+                    self._add(hotel)
+                    raise
+                self._publish(events.DELETE, [(hotel_id, None)])
+                return True
+            return False
+
+    @instrumented("create_many")
+    def create_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        Creates several hotels from dictionaries with the same fields as
+        create_hotel and saves them with a single write.
+        Invalid items are logged to console and skipped.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            result = BatchResult()
+            staged: Dict[str, Hotel] = {}
+            for item in items:
+                try:
+                    hotel = _hotel_from_record(item)
+                    if hotel.hotel_id in self._hotels_by_id or (
+                            hotel.hotel_id in staged):
+                        raise ValueError(f"Hotel with ID '{hotel.hotel_id}' "
+                                         "already exists.")
+                    staged[hotel.hotel_id] = hotel
+                    result.succeeded.append(hotel)
+                except (KeyError, ValueError, TypeError) as error:
+                    print(f"Error creating hotel record: {item} => {error}")
+                    result.failed.append((item, error))
+
+            for hotel in staged.values():
+                self._add(hotel)
+            created = [(key, hotel.to_dict()) for key, hotel in staged.items()]
+            try:
+                self._write_and_publish(events.CREATE, created)
+            except Exception:
+                for hotel in staged.values():
+                    self._remove(hotel)
+                raise
+            return result
+
+    @instrumented("delete_many")
+    def delete_many(self, hotel_ids: Iterable[str]) -> BatchResult:
+        """
+        Deletes several hotels by ID and saves once.
+        Unknown IDs are logged to console and skipped.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            result = BatchResult()
+            removed: Dict[str, Hotel] = {}
+            for hotel_id in hotel_ids:
+                hotel = self._hotels_by_id.get(hotel_id)
+                if hotel is None:
+                    error = ValueError(f"No hotel found with ID '{hotel_id}'.")
+                    print(f"Error deleting hotel: {error}")
+                    result.failed.append((hotel_id, error))
+                    continue
+                self._remove(hotel)
+                removed[hotel_id] = hotel
+                result.succeeded.append(hotel_id)
+
+            try:
+                self._write_and_publish(
+                    events.DELETE, [(key, None) for key in removed]
+                )
+            except Exception:
+                for hotel in removed.values():
+                    self._add(hotel)
+                raise
+            return result
+
+    @instrumented("modify_many")
+    def modify_many(self, changes: Mapping[str, dict]) -> BatchResult:
+        """
+        Applies modify_hotel_information to several hotels, given as a
+        mapping of hotel ID to the fields to change, and saves once.
+        Unknown IDs and invalid values are logged to console and skipped.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            result = BatchResult()
+            previous: Dict[str, dict] = {}
+            for hotel_id, fields in changes.items():
+                try:
+                    hotel = self._hotels_by_id.get(hotel_id)
+                    if hotel is None:
+                        raise ValueError(
+                            f"No hotel found with ID '{hotel_id}'."
+                        )
+                    updated = hotel.to_dict()
+                    for name in ("name", "location"):
+                        if name in fields:
+                            updated[name] = fields[name]
+                    if "total_rooms" in fields:
+                        updated["total_rooms"] = int(fields["total_rooms"])
+                except (ValueError, TypeError) as error:
+                    print(f"Error modifying hotel {hotel_id}: {error}")
+                    result.failed.append(((hotel_id, fields), error))
+                    continue
+                previous[hotel_id] = hotel.to_dict()
+                self._apply_fields(hotel, updated)
+                result.succeeded.append(hotel)
+
+            modified = [(key, self._hotels_by_id[key].to_dict())
+                        for key in previous]
+            try:
+                self._write_and_publish(events.MODIFY, modified)
+            except Exception:
+                for key, fields in previous.items():
+                    self._apply_fields(self._hotels_by_id[key], fields)
+                raise
+            return result
+
+    def _apply_fields(self, hotel: Hotel, fields: dict) -> None:
+        """
+        Copies the editable fields of a hotel dictionary onto the hotel.
+        """
+        self._by_location.remove(location_key(hotel.location), hotel.hotel_id)
+        hotel.name = fields["name"]
+        hotel.location = fields["location"]
+        hotel.total_rooms = fields["total_rooms"]
+        self._by_location.add(
+            location_key(hotel.location), hotel.hotel_id, hotel
+        )
+
+    def _add(self, hotel: Hotel) -> None:
+        """
+        Registers a hotel by ID and by location.
+        """
+        self._hotels_by_id[hotel.hotel_id] = hotel
+        self._by_location.add(
+            location_key(hotel.location), hotel.hotel_id, hotel
+        )
+
+    def _remove(self, hotel: Hotel) -> None:
+        """
+        Removes a hotel from the ID and location indexes.
+        """
+        del self._hotels_by_id[hotel.hotel_id]
+        self._by_location.remove(location_key(hotel.location), hotel.hotel_id)
 
     def display_hotel_information(self, hotel_id: str) -> None:
         """
         Prints hotel information to console.
         """
-        hotel = self.get_hotel_by_id(hotel_id)
-        if hotel:
-            print(f"Hotel ID: {hotel.hotel_id}")
-            print(f"Name: {hotel.name}")
-            print(f"Location: {hotel.location}")
-            print(f"Total Rooms: {hotel.total_rooms}")
-        else:
-            print(f"No hotel found with ID '{hotel_id}'.")
+        self._ensure_loaded()
+        with self._lock:
+            hotel = self.get_hotel_by_id(hotel_id)
+            if hotel:
+                print(f"Hotel ID: {hotel.hotel_id}")
+                print(f"Name: {hotel.name}")
+                print(f"Location: {hotel.location}")
+                print(f"Total Rooms: {hotel.total_rooms}")
+            else:
+                print(f"No hotel found with ID '{hotel_id}'.")
 
+    @instrumented("modify")
     def modify_hotel_information(self, hotel_id: str, **kwargs) -> bool:
         """
         Modifies hotel information (name, location, total_rooms).
         """
-        hotel = self.get_hotel_by_id(hotel_id)
-        if not hotel:
-            return False
+        self._ensure_loaded()
+        with self._lock:
+            hotel = self.get_hotel_by_id(hotel_id)
+            if not hotel:
+                return False
 
-        if "name" in kwargs:
-            hotel.name = kwargs["name"]
-        if "location" in kwargs:
-            hotel.location = kwargs["location"]
-        if "total_rooms" in kwargs:
-            hotel.total_rooms = int(kwargs["total_rooms"])
-        self.save_hotels()
-        return True
+            previous = hotel.to_dict()
+            updated = dict(previous)
+            for name in ("name", "location"):
+                if name in kwargs:
+                    updated[name] = kwargs[name]
+            if "total_rooms" in kwargs:
+                updated["total_rooms"] = int(kwargs["total_rooms"])
+            self._apply_fields(hotel, updated)
+            record = hotel.to_dict()
+            try:
+                self.storage.write(PUT, hotel_id, record, self._records)
+            except Exception:
+                self._apply_fields(hotel, previous)
+                raise
+            self._publish(events.MODIFY, [(hotel_id, record)])
+            return True
+
+    @instrumented("by_location")
+    def get_hotels_by_location(self, location: str) -> List[Hotel]:
+        """
+        Returns the hotels in a location, ignoring case and extra
+        whitespace.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_location.get(location_key(location))
 
+    @instrumented("get")
     def get_hotel_by_id(self, hotel_id: str) -> Optional[Hotel]:
         """
         Returns a Hotel object by ID, or None if not found.
+        Until the hotels are loaded, a storage with point reads is asked
+        for the one hotel instead.
         """
-        for hotel in self.hotels:
-            if hotel.hotel_id == hotel_id:
-                return hotel
-        return None
+        if not self._loaded and self.storage.point_reads:
+            item = self.storage.get(hotel_id)
+            if item is None:
+                return None
+            try:
+                return _hotel_from_record(item)
+            except (KeyError, ValueError, TypeError) as error:
+                print(f"Error loading hotel record: {item} => {error}")
+                return None
+        self._ensure_loaded()
+        with self._lock:
+            return self._hotels_by_id.get(hotel_id)
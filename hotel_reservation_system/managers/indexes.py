@@ -0,0 +1,125 @@
+"""
+Secondary indexes kept by ReservationManager alongside its ID index.
+"""
+
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from typing import (
+    Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar
+)
+
+T = TypeVar("T")
+
+
+class GroupIndex(Generic[T]):
+    """
+    Maps a grouping key (e.g. a customer or hotel ID) to the items of
+    that group, keyed by item ID for O(1) removal.
+    """
+
+    def __init__(self):
+        self._groups: Dict[str, Dict[str, T]] = {}
+
+    def clear(self) -> None:
+        """
+        Removes every indexed item.
+        """
+        self._groups = {}
+
+    def add(self, group: str, item_id: str, item: T) -> None:
+        """
+        Adds an item to a group.
+        """
+        self._groups.setdefault(group, {})[item_id] = item
+
+    def remove(self, group: str, item_id: str) -> None:
+        """
+        Removes an item from a group, dropping the group once empty.
+        """
+        items = self._groups.get(group)
+        if items is None:
+            return
+        items.pop(item_id, None)
+        if not items:
+            del self._groups[group]
+
+    def get(self, group: str) -> List[T]:
+        """
+        Returns the items of a group in insertion order.
+        """
+        return list(self._groups.get(group, {}).values())
+
+
+class DateIndex:
+    """
+    Item IDs sorted by a day ordinal, answering range queries with two
+    bisects.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[int, str]] = []
+        self._deferred = False
+
+    def clear(self) -> None:
+        """
+        Removes every indexed entry.
+        """
+        self._entries = []
+
+    def add(self, day: int, item_id: str) -> None:
+        """
+        Indexes an item under the given day.
+        """
+        entry = (day, item_id)
+        if self._deferred or not self._entries or entry >= self._entries[-1]:
+            self._entries.append(entry)
+        else:
+            insort(self._entries, entry)
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """
+        Appends the entries added inside the block and sorts them once
+        when it exits, instead of inserting each in place. Queries must
+        not run inside the block.
+        """
+        self._deferred = True
+        try:
+            yield
+        finally:
+            self._deferred = False
+            self._entries.sort()
+
+    def remove(self, day: int, item_id: str) -> None:
+        """
+        Removes an item indexed under the given day, if present.
+        """
+        position = bisect_left(self._entries, (day, item_id))
+        if (
+            position < len(self._entries)
+            and self._entries[position] == (day, item_id)
+        ):
+            del self._entries[position]
+
+    def remove_many(self, entries: Iterable[Tuple[int, str]]) -> None:
+        """
+        Removes several (day, item_id) entries in a single pass, which
+        is cheaper than remove() once more than a few are removed.
+        """
+        doomed = set(entries)
+        if doomed:
+            self._entries = [
+                entry for entry in self._entries if entry not in doomed
+            ]
+
+    def range(self, start: int, end: int) -> Iterator[str]:
+        """
+        Yields the IDs indexed under days in [start, end), by day.
+        """
+        position = bisect_left(self._entries, (start,))
+        while position < len(self._entries):
+            day, item_id = self._entries[position]
+            if day >= end:
+                return
+            yield item_id
+            position += 1
@@ -0,0 +1,203 @@
+"""
+Metrics Module
+
+Timing and counters for the manager operations. Every instrumented
+method reports to the process-wide sink:
+
+- "<manager>.<operation>.calls": number of calls
+- "<manager>.<operation>.errors": calls that raised
+- "<manager>.<operation>.seconds": latency histogram
+- "<manager>.<operation>.bytes": bytes the storage wrote during the call,
+  for operations that persist
+
+The default sink discards everything and the instrumented methods skip
+the timing altogether, so the cost is one attribute check per call.
+Install InMemoryMetrics (or any MetricsSink) with set_sink() to collect.
+"""
+
+import functools
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+Function = TypeVar("Function", bound=Callable[..., Any])
+
+
+class Histogram:
+    """
+    Summarizes observed values in power-of-two buckets, so recording is
+    constant time and memory while percentiles stay within a factor of
+    two of the true value.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.buckets: Dict[int, int] = {}
+
+    def observe(self, value: float) -> None:
+        """
+        Records one value.
+        """
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        exponent = math.frexp(value)[1] if value > 0 else -1074
+        self.buckets[exponent] = self.buckets.get(exponent, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the given fraction
+        (0.99 = p99) of the values, capped at the maximum seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for exponent in sorted(self.buckets):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return min(math.ldexp(1.0, exponent), self.maximum)
+        return self.maximum
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns the count, sum, extremes and main percentiles.
+        """
+        if not self.count:
+            return {"count": 0, "sum": 0.0}
+        return {
+            "count": self.count, "sum": self.total,
+            "min": self.minimum, "max": self.maximum,
+            "mean": self.total / self.count,
+            "p50": self.percentile(0.5), "p99": self.percentile(0.99),
+        }
+
+
+class MetricsSink:
+    """
+    Receives metrics from the instrumented operations. This base class
+    is the no-op default; subclasses that record anything must set
+    enabled to True.
+    """
+
+    enabled = False
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        Adds value to the counter name.
+        """
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Records value in the histogram name.
+        """
+
+
+class InMemoryMetrics(MetricsSink):
+    """
+    Keeps counters and histograms in memory, for tests, benchmarks or a
+    periodic exporter reading snapshot().
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        Adds value to the counter name.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Records value in the histogram name.
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a copy of every counter and a summary of every histogram.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: histogram.snapshot()
+                    for name, histogram in self.histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """
+        Drops everything recorded so far.
+        """
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+_sink: MetricsSink = MetricsSink()
+
+
+def get_sink() -> MetricsSink:
+    """
+    Returns the sink the instrumented operations report to.
+    """
+    return _sink
+
+
+def set_sink(sink: Optional[MetricsSink]) -> MetricsSink:
+    """
+    Installs sink, or the no-op default if None, and returns the sink it
+    replaces.
+    """
+    global _sink  # pylint: disable=global-statement
+    previous = _sink
+    _sink = sink if sink is not None else MetricsSink()
+    return previous
+
+
+def instrumented(operation: str) -> Callable[[Function], Function]:
+    """
+    Decorates a manager method so its calls, errors, latency and the
+    bytes its storage wrote are reported under
+    "<metrics_name>.<operation>".
+    """
+    def decorate(method: Function) -> Function:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            sink = _sink
+            if not sink.enabled:
+                return method(self, *args, **kwargs)
+            name = f"{self.metrics_name}.{operation}"
+            storage = self.storage
+            written = storage.bytes_written
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            except Exception:
+                sink.increment(f"{name}.errors")
+                raise
+            finally:
+                sink.observe(f"{name}.seconds",
+                             time.perf_counter() - started)
+                sink.increment(f"{name}.calls")
+                written = storage.bytes_written - written
+                if written:
+                    sink.observe(f"{name}.bytes", written)
+        return wrapper  # type: ignore[return-value]
+    return decorate
@@ -0,0 +1,277 @@
+"""
+Persistence policies and lazy loading shared by the managers.
+
+By default every mutation is written to storage before the call returns
+(immediate). A debounced policy queues writes and flushes them from a
+background thread at most every flush_interval seconds or once
+max_pending changes are queued; a manual policy only writes on flush().
+Queued changes are flushed when the interpreter exits, including those
+of managers the caller no longer references: a manager is kept alive
+while it has writes queued.
+
+Managers can also be used as context managers: writes made inside a
+``with manager:`` block are queued whatever the policy and written once
+when the outermost block exits.
+
+Managers read their storage on first access rather than when they are
+created, so code that only needs one of them does not pay for the rest.
+
+Setting a manager's change_feed publishes its mutations as change events;
+see managers.events.
+"""
+
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import (
+    Callable, ContextManager, Iterable, List, Optional, Tuple
+)
+from managers.events import ChangeFeed
+from storage.base import DELETE, PUT, Storage
+from storage.buffered import BufferedStorage
+
+logger = logging.getLogger(__name__)
+
+IMMEDIATE = "immediate"
+DEBOUNCED = "debounced"
+MANUAL = "manual"
+
+
+@dataclass(frozen=True)
+class PersistencePolicy:
+    """
+    When a manager writes its mutations to storage.
+    """
+
+    mode: str = IMMEDIATE
+    flush_interval: Optional[float] = None
+    max_pending: Optional[int] = None
+
+    def __post_init__(self):
+        """
+        Validates the mode and its limits.
+        """
+        if self.mode not in (IMMEDIATE, DEBOUNCED, MANUAL):
+            raise ValueError(f"Unknown persistence mode {self.mode!r}.")
+        if self.mode == DEBOUNCED and (
+                self.flush_interval is None and self.max_pending is None):
+            raise ValueError("A debounced policy needs a flush_interval "
+                             "or a max_pending limit.")
+
+    @classmethod
+    def immediate(cls) -> "PersistencePolicy":
+        """
+        Writes every mutation before returning; the default.
+        """
+        return cls(IMMEDIATE)
+
+    @classmethod
+    def debounced(
+            cls, flush_interval: Optional[float] = 0.1,
+            max_pending: Optional[int] = None
+            ) -> "PersistencePolicy":
+        """
+        Flushes at most every flush_interval seconds, or as soon as
+        max_pending changes are queued.
+        """
+        return cls(DEBOUNCED, flush_interval, max_pending)
+
+    @classmethod
+    def manual(cls) -> "PersistencePolicy":
+        """
+        Only writes on flush() and at interpreter exit.
+        """
+        return cls(MANUAL)
+
+    def wrap(self, storage: Storage, key: Optional[str] = None) -> Storage:
+        """
+        Returns the storage a manager should write to under this policy.
+
+        :param key: Primary key field of the records, for storages
+            created without one
+        """
+        if self.mode == IMMEDIATE:
+            return storage
+        return BufferedStorage(
+            storage, key=key, flush_interval=self.flush_interval,
+            max_pending=self.max_pending
+        )
+
+
+class PersistenceMixin:
+    """
+    flush(), context manager support and lazy loading for the managers.
+
+    Subclasses call _init_persistence() from __init__, implement _load()
+    and call _ensure_loaded() before taking their locks in every public
+    method. They may override _exclusive() if self._lock does not block
+    every writer.
+    """
+
+    storage: Storage
+    _lock: ContextManager
+    metrics_name: str
+    # Primary key field of the manager's records.
+    record_key: str
+    # Feed the manager's mutations are published to, if any.
+    change_feed: Optional[ChangeFeed] = None
+
+    def _init_persistence(
+            self, storage: Storage, policy: Optional[PersistencePolicy]
+            ) -> None:
+        """
+        Sets self.storage according to the policy.
+        """
+        self.storage = (policy or PersistencePolicy()).wrap(
+            storage, self.record_key
+        )
+        self._unbuffered: Optional[Storage] = None
+        # Flushes the storage of the outermost with block, if any.
+        self._block_flush: Optional[weakref.finalize] = None
+        self._blocks = 0
+        # Set by _load() implementations once loading has started.
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        if isinstance(self.storage, BufferedStorage):
+            self._flush_when_collected(self.storage)
+
+    def _flush_when_collected(
+            self, storage: BufferedStorage
+            ) -> weakref.finalize:
+        """
+        Flushes storage when this manager is collected or, at the
+        latest, when the interpreter exits. The finalizer holds storage,
+        whose queued writes hold the manager's snapshot callable, so the
+        manager is only collected once nothing is left queued.
+        """
+        return weakref.finalize(self, _flush_queued, storage,
+                                type(self).__name__)
+
+    def _load(self) -> None:
+        """
+        Loads the collection from storage and sets self._loaded.
+        """
+        raise NotImplementedError
+
+    def _ensure_loaded(self) -> None:
+        """
+        Loads the collection on first use. Must not be called while
+        holding the manager's locks, which loading takes.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load()
+
+    def _exclusive(self) -> ContextManager:
+        """
+        Returns a context that keeps every writer out.
+        """
+        return self._lock
+
+    def _save_all(self) -> None:
+        """
+        Replaces the stored collection with the one in memory.
+        """
+        self._ensure_loaded()
+        with self._exclusive():
+            self.storage.save(self._records())
+
+    def _records(self) -> List[dict]:
+        """
+        Returns every managed object as a serializable dictionary.
+        """
+        raise NotImplementedError
+
+    def _snapshot(self) -> Callable[[], Iterable[dict]]:
+        """
+        Returns the snapshot callable handed to storage writes.
+        """
+        return self._records
+
+    def _publish(
+            self, op: str, changes: Iterable[Tuple[str, Optional[dict]]]
+            ) -> None:
+        """
+        Publishes (key, record) changes to the change feed, if any. Called
+        after the storage accepted them, with the manager's lock held so
+        events of one object come out in the order of its writes.
+        """
+        feed = self.change_feed
+        if feed is not None:
+            feed.publish(self.metrics_name, op, changes)
+
+    def _write_and_publish(
+            self, op: str, changes: List[Tuple[str, Optional[dict]]]
+            ) -> None:
+        """
+        Writes (key, record) changes with a single write, a None record
+        deleting its key, then publishes them as op events.
+        """
+        self.storage.write_many(
+            [(PUT if record is not None else DELETE, key, record)
+             for key, record in changes],
+            self._snapshot()
+        )
+        self._publish(op, changes)
+
+    def flush(self) -> None:
+        """
+        Writes every queued change to storage.
+        """
+        self.storage.flush()
+
+    def __enter__(self):
+        """
+        Starts queueing writes until the outermost block exits.
+        """
+        with self._exclusive():
+            self._blocks += 1
+            if self._blocks == 1 and not isinstance(
+                    self.storage, BufferedStorage):
+                self._unbuffered = self.storage
+                self.storage = BufferedStorage(
+                    self.storage, key=self.record_key
+                )
+                self._block_flush = self._flush_when_collected(
+                    self.storage
+                )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Writes the changes queued in the block once, when the outermost
+        block exits. If that write fails the changes stay queued for
+        the next flush().
+        """
+        with self._exclusive():
+            self._blocks -= 1
+            if self._blocks:
+                return
+        # flush() cannot run under the lock its snapshot takes, so the
+        # plain storage is only restored once nothing is left queued.
+        self.flush()
+        while self._unbuffered is not None:
+            with self._exclusive():
+                if self._blocks:
+                    return
+                if not self.storage.pending:
+                    self.storage = self._unbuffered
+                    self._unbuffered = None
+                    self._block_flush.detach()
+                    self._block_flush = None
+                    return
+            self.flush()
+
+
+def _flush_queued(storage: BufferedStorage, name: str) -> None:
+    """
+    Flushes the queued writes of a collected manager, or of a live one at
+    interpreter exit.
+    """
+    try:
+        storage.flush()
+    except Exception as error:  # pylint: disable=broad-except
+        logger.error("Error flushing %s: %s", name, error)
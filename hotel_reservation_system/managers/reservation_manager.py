@@ -2,18 +2,46 @@
 Reservation Manager Module
 
 This module provides a class to manage hotel reservations, including:
-- Loading and saving reservations from a JSON file.
+- Loading and saving reservations through a storage backend
+  (a JSON file by default).
 - Creating and canceling reservations.
 - Retrieving reservation details.
+- Checking room availability for a date range, for one room or as
+  free-room counts across many hotels.
+- Querying reservations by customer, hotel and check-in/out date.
+- Moving past reservations to a compressed archive, so only current
+  and future stays stay resident.
+- Publishing every change to an attached managers.events.ChangeFeed.
+
+The manager is safe to share between threads. Mutations lock the hotel
+they affect, so bookings for different hotels persist in parallel, while
+a short internal lock guards the in-memory indexes. Over a
+storage.sharded.ShardedStorage each hotel is also persisted to its own
+file, and a manager can be limited to a subset of the hotels.
 """
 
 import json
 import os
 import logging
-from typing import List, Optional
-from models.reservation import Reservation
+import threading
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from typing import (
+    ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+from managers import events
+from managers.availability import RoomAvailabilityIndex
+from managers.batch import BatchResult
+from managers.indexes import DateIndex, GroupIndex
+from managers.metrics import instrumented
+from managers.persistence import PersistenceMixin, PersistencePolicy
+from models.reservation import DateLike, Reservation, to_date
+from storage.archive import ReservationArchive
+from storage.base import DELETE, PUT, ProgressCallback, Storage
+from storage.json_storage import JsonFileStorage
+from storage.sharded import HotelSnapshot
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(
     os.path.abspath(__file__)
@@ -21,98 +49,599 @@ BASE_DIR = os.path.dirname(
 RESERVATION_DATA_FILE = os.path.join(BASE_DIR, "../data/reservations.json")
 
 
-class ReservationManager:
+class ReservationManager(PersistenceMixin):
+    # pylint: disable=too-many-instance-attributes
     """
     Manages Reservation objects, including creation, cancellation,
     and saving/loading to/from JSON.
     """
 
-    def __init__(self):
-        self.reservations: List[Reservation] = []
+    metrics_name = "reservation"
+    record_key = "reservation_id"
+
+    def __init__(
+            self, storage: Optional[Storage] = None,
+            per_hotel_locks: bool = True,
+            persistence: Optional[PersistencePolicy] = None,
+            lazy: bool = True
+            ):
+        """
+        :param storage: Storage backend, defaults to RESERVATION_DATA_FILE
+        :param per_hotel_locks: Serialize mutations per hotel; if False a
+            single lock serializes every mutation
+        :param persistence: When mutations are written, immediately
+            by default
+        :param lazy: Load the reservations on first access instead of now
+        """
+        # Lock order: hotel locks (sorted by hotel ID), then the storage's
+        # own lock, then self._lock. self._lock only guards the indexes
+        # and is never held while waiting for another lock.
+        self._lock = threading.RLock()
+        self._per_hotel_locks = per_hotel_locks
+        self._hotel_locks: Dict[str, threading.Lock] = {}
+        self._hotel_locks_guard = threading.Lock()
+        self._global_lock = threading.Lock()
+        self._init_persistence(
+            storage or JsonFileStorage(
+                RESERVATION_DATA_FILE, "reservation_id"
+            ),
+            persistence
+        )
+        self._reservations_by_id: Dict[str, Reservation] = {}
+        self._availability = RoomAvailabilityIndex()
+        self._by_customer: GroupIndex[Reservation] = GroupIndex()
+        self._by_hotel: GroupIndex[Reservation] = GroupIndex()
+        self._by_check_in = DateIndex()
+        self._by_check_out = DateIndex()
+        if not lazy:
+            self.load_reservations()
+
+    @property
+    def reservations(self) -> List[Reservation]:
+        """
+        Returns the managed reservations in insertion order.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._reservations_by_id.values())
+
+    def _hotel_lock(self, hotel_id: str) -> threading.Lock:
+        """
+        Returns the lock serializing mutations of a hotel.
+        """
+        if not self._per_hotel_locks:
+            return self._global_lock
+        with self._hotel_locks_guard:
+            lock = self._hotel_locks.get(hotel_id)
+            if lock is None:
+                lock = self._hotel_locks[hotel_id] = threading.Lock()
+            return lock
+
+    @contextmanager
+    def _locked_hotels(self, hotel_ids: Iterable[str]) -> Iterator[None]:
+        """
+        Holds the locks of several hotels, acquired in sorted order so
+        concurrent batches cannot deadlock.
+        """
+        locks: Dict[int, threading.Lock] = {}
+        for hotel_id in sorted(set(hotel_ids), key=str):
+            lock = self._hotel_lock(hotel_id)
+            locks.setdefault(id(lock), lock)
+        with ExitStack() as stack:
+            for lock in locks.values():
+                stack.enter_context(lock)
+            yield
+
+    @contextmanager
+    def _locked_all_hotels(self) -> Iterator[None]:
+        """
+        Holds every hotel lock, keeping new hotels out until released,
+        so no mutation runs concurrently.
+        """
+        if not self._per_hotel_locks:
+            with self._global_lock:
+                yield
+            return
+        with self._hotel_locks_guard:
+            with ExitStack() as stack:
+                for hotel_id in sorted(self._hotel_locks, key=str):
+                    stack.enter_context(self._hotel_locks[hotel_id])
+                yield
+
+    def _exclusive(self) -> ContextManager:
+        """
+        Returns a context holding every hotel lock, which keeps every
+        writer out.
+        """
+        return self._locked_all_hotels()
+
+    def _load(self) -> None:
+        """
+        Loads the reservations on first access.
+        """
         self.load_reservations()
 
-    def load_reservations(self) -> None:
+    @instrumented("load")
+    def load_reservations(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> None:
         """
         Loads reservation data from the JSON file.
         Invalid records are logged to console and skipped.
+        Records are streamed from storage one at a time.
+
+        :param progress: Called as progress(bytes_read, total_bytes)
+            while the file is read
         """
-        self.reservations = []
-        if not os.path.exists(RESERVATION_DATA_FILE):
-            return
+        with self._locked_all_hotels(), self._lock:
+            self._reservations_by_id = {}
+            self._loaded = True
+            self._availability.clear()
+            self._by_customer.clear()
+            self._by_hotel.clear()
+            self._by_check_in.clear()
+            self._by_check_out.clear()
+            try:
+                with self._by_check_in.bulk(), self._by_check_out.bulk():
+                    for item in self.storage.iter_records(progress):
+                        try:
+                            reservation = Reservation(**item)
+                            if reservation.reservation_id in (
+                                    self._reservations_by_id):
+                                raise ValueError("duplicate reservation ID")
+                            self._add(reservation)
+                        except (KeyError, ValueError, TypeError) as error:
+                            logger.warning("Error loading reservation "
+                                           "record: %s => %s", item, error)
+            except (json.JSONDecodeError, OSError) as error:
+                logger.error("Error reading reservation file: %s", error)
 
-        try:
-            with open(RESERVATION_DATA_FILE, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                for item in data:
-                    try:
-                        reservation = Reservation(**item)
-                        self.reservations.append(reservation)
-                    except (KeyError, ValueError, TypeError) as error:
-                        logging.warning("Error loading reservation "
-                                        "record: %s => %s", item, error)
-        except (json.JSONDecodeError, OSError) as error:
-            logging.error("Error reading reservation file: %s", error)
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the reservations if another process changed the storage since
+        they were loaded. Cheap enough to call at the start of every
+        request.
+
+        :return: True if the reservations were reloaded
+        """
+        if not self._loaded or not self.storage.has_changed():
+            return False
+        self.load_reservations()
+        return True
 
+    @instrumented("save")
     def save_reservations(self) -> None:
         """
         Saves reservation data to the JSON file.
         """
-        data = [res.__dict__ for res in self.reservations]
-        with open(RESERVATION_DATA_FILE, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
+        self._save_all()
+
+    def _records(self) -> List[dict]:
+        """
+        Returns every reservation as a serializable dictionary.
+        """
+        with self._lock:
+            return [
+                res.to_dict() for res in self._reservations_by_id.values()
+            ]
+
+    def _hotel_records(self, hotel_id: str) -> List[dict]:
+        """
+        Returns the reservations of one hotel as serializable
+        dictionaries.
+        """
+        with self._lock:
+            return [res.to_dict() for res in self._by_hotel.get(hotel_id)]
 
+    def _snapshot(self) -> HotelSnapshot:
+        """
+        Returns a snapshot that sharded storages can read per hotel.
+        """
+        return HotelSnapshot(self._records, self._hotel_records)
+
+    @instrumented("create")
     def create_reservation(self, reservation_data: dict) -> Reservation:
         """
         Creates a new Reservation if not already existing.
+        Raises ValueError if the room is already booked for an
+        overlapping stay.
         """
-        if (
-            self.get_reservation_by_id(reservation_data["reservation_id"])
-            is not None
-        ):
+        self._ensure_loaded()
+        reservation_id = reservation_data["reservation_id"]
+        if self.get_reservation_by_id(reservation_id) is not None:
             raise ValueError(
-                f"Reservation with ID '{reservation_data['reservation_id']}'"
-                " already exists."
+                f"Reservation with ID '{reservation_id}' already exists."
             )
 
         new_reservation = Reservation(**reservation_data)
-        self.reservations.append(new_reservation)
-        self.save_reservations()
+        with self._hotel_lock(new_reservation.hotel_id):
+            with self._lock:
+                if reservation_id in self._reservations_by_id:
+                    raise ValueError(
+                        f"Reservation with ID '{reservation_id}'"
+                        " already exists."
+                    )
+                self._add(new_reservation)
+            record = new_reservation.to_dict()
+            try:
+                self.storage.write(PUT, reservation_id, record,
+                                   self._snapshot())
+            except Exception:
+                with self._lock:
+                    self._remove(new_reservation)
+                raise
+            self._publish(events.CREATE, [(reservation_id, record)])
         return new_reservation
 
+    @instrumented("cancel")
     def cancel_reservation(self, reservation_id: str) -> bool:
         """
         Cancels (deletes) a reservation by ID, if it exists.
         """
+        self._ensure_loaded()
         reservation = self.get_reservation_by_id(reservation_id)
-        if reservation:
-            self.reservations.remove(reservation)
-            self.save_reservations()
-            return True
-        return False
+        if reservation is None:
+            return False
+        with self._hotel_lock(reservation.hotel_id):
+            with self._lock:
+                # Another thread may have canceled it meanwhile.
+                if self._reservations_by_id.get(reservation_id) is not (
+                        reservation):
+                    return False
+                self._remove(reservation)
+            try:
+                self.storage.write(DELETE, reservation_id, None,
+                                   self._snapshot())
+            except Exception:
+                with self._lock:
+                    self._add(reservation)
+                raise
+            self._publish(events.CANCEL, [(reservation_id, None)])
+        return True
+
+    @instrumented("create_many")
+    def create_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        Creates several reservations and saves them with a single write.
+        Items that are invalid, duplicated or that overlap an existing or
+        earlier item of the batch are logged and skipped.
+        """
+        self._ensure_loaded()
+        result = BatchResult()
+        parsed: List[tuple] = []
+        for item in items:
+            try:
+                parsed.append((item, Reservation(**item)))
+            except (KeyError, ValueError, TypeError) as error:
+                logger.warning("Error creating reservation "
+                               "record: %s => %s", item, error)
+                result.failed.append((item, error))
+
+        with self._locked_hotels(res.hotel_id for _, res in parsed):
+            with self._lock, self._by_check_in.bulk(), (
+                    self._by_check_out.bulk()):
+                for item, reservation in parsed:
+                    try:
+                        if reservation.reservation_id in (
+                                self._reservations_by_id):
+                            raise ValueError(
+                                "Reservation with ID "
+                                f"'{reservation.reservation_id}'"
+                                " already exists."
+                            )
+                        self._add(reservation)
+                        result.succeeded.append(reservation)
+                    except ValueError as error:
+                        logger.warning("Error creating reservation "
+                                       "record: %s => %s", item, error)
+                        result.failed.append((item, error))
 
+            created = [(res.reservation_id, res.to_dict())
+                       for res in result.succeeded]
+            try:
+                self._write_and_publish(events.CREATE, created)
+            except Exception:
+                with self._lock:
+                    self._remove_many(result.succeeded)
+                raise
+        return result
+
+    @instrumented("cancel_many")
+    def cancel_many(self, reservation_ids: Iterable[str]) -> BatchResult:
+        """
+        Cancels several reservations by ID and saves once.
+        Unknown IDs are logged and skipped.
+        """
+        self._ensure_loaded()
+        result = BatchResult()
+        reservation_ids = list(reservation_ids)
+        with self._lock:
+            hotel_ids = [
+                self._reservations_by_id[key].hotel_id
+                for key in reservation_ids if key in self._reservations_by_id
+            ]
+        removed: List[Reservation] = []
+        with self._locked_hotels(hotel_ids):
+            with self._lock:
+                for reservation_id in reservation_ids:
+                    reservation = self._reservations_by_id.get(reservation_id)
+                    # Skip reservations (re)created in a hotel whose lock
+                    # we do not hold.
+                    if reservation is None or (
+                            reservation.hotel_id not in hotel_ids):
+                        error = ValueError("No reservation found with "
+                                           f"ID '{reservation_id}'.")
+                        logger.warning("Error canceling reservation: %s",
+                                       error)
+                        result.failed.append((reservation_id, error))
+                        continue
+                    self._remove(reservation)
+                    removed.append(reservation)
+                    result.succeeded.append(reservation_id)
+
+            try:
+                self._write_and_publish(
+                    events.CANCEL,
+                    [(res.reservation_id, None) for res in removed]
+                )
+            except Exception:
+                with self._lock:
+                    for reservation in removed:
+                        self._add(reservation)
+                raise
+        return result
+
+    @instrumented("archive")
+    def archive_before(
+            self, cutoff: DateLike, archive: ReservationArchive
+            ) -> int:
+        """
+        Moves every reservation checking out before cutoff to archive
+        and drops it from memory and from storage. Returns how many
+        were moved.
+
+        Reservations are appended to the archive before they are
+        deleted, so an interrupted run never loses one; running again
+        archives the leftovers a second time, which the archive reports
+        once.
+        """
+        self._ensure_loaded()
+        cutoff_day = to_date(cutoff).toordinal()
+        with self._lock:
+            hotel_ids = {
+                self._reservations_by_id[key].hotel_id
+                for key in self._by_check_out.range(1, cutoff_day)
+            }
+        with self._locked_hotels(hotel_ids):
+            with self._lock:
+                # Only hotels whose lock we hold; the rest wait for the
+                # next run.
+                moved = [
+                    self._reservations_by_id[key]
+                    for key in self._by_check_out.range(1, cutoff_day)
+                    if self._reservations_by_id[key].hotel_id in hotel_ids
+                ]
+            if not moved:
+                return 0
+            archive.append(res.to_dict() for res in moved)
+            with self._lock:
+                self._remove_many(moved)
+            try:
+                self._write_and_publish(
+                    events.ARCHIVE,
+                    [(res.reservation_id, None) for res in moved]
+                )
+            except Exception:
+                with self._lock:
+                    for reservation in moved:
+                        self._add(reservation)
+                raise
+        return len(moved)
+
+    def _add(self, reservation: Reservation) -> None:
+        """
+        Registers a reservation in every index.
+        Raises ValueError if its room is already booked for those dates.
+        """
+        key = reservation.reservation_id
+        check_in = reservation.check_in.toordinal()
+        check_out = reservation.check_out.toordinal()
+        self._availability.add(
+            key, reservation.hotel_id, reservation.room_number,
+            check_in, check_out
+        )
+        self._reservations_by_id[key] = reservation
+        self._by_customer.add(reservation.customer_id, key, reservation)
+        self._by_hotel.add(reservation.hotel_id, key, reservation)
+        self._by_check_in.add(check_in, key)
+        self._by_check_out.add(check_out, key)
+
+    def _remove(self, reservation: Reservation) -> None:
+        """
+        Removes a reservation from every index.
+        """
+        key = reservation.reservation_id
+        del self._reservations_by_id[key]
+        self._availability.remove(
+            key, reservation.hotel_id, reservation.room_number,
+            reservation.check_in.toordinal()
+        )
+        self._by_customer.remove(reservation.customer_id, key)
+        self._by_hotel.remove(reservation.hotel_id, key)
+        self._by_check_in.remove(reservation.check_in.toordinal(), key)
+        self._by_check_out.remove(reservation.check_out.toordinal(), key)
+
+    def _remove_many(self, reservations: List[Reservation]) -> None:
+        """
+        Removes several reservations from every index, rebuilding the
+        date indexes once instead of once per reservation.
+        """
+        for reservation in reservations:
+            key = reservation.reservation_id
+            del self._reservations_by_id[key]
+            self._availability.remove(
+                key, reservation.hotel_id, reservation.room_number,
+                reservation.check_in.toordinal()
+            )
+            self._by_customer.remove(reservation.customer_id, key)
+            self._by_hotel.remove(reservation.hotel_id, key)
+        self._by_check_in.remove_many(
+            (res.check_in.toordinal(), res.reservation_id)
+            for res in reservations
+        )
+        self._by_check_out.remove_many(
+            (res.check_out.toordinal(), res.reservation_id)
+            for res in reservations
+        )
+
+    @instrumented("by_customer")
+    def get_reservations_by_customer(
+            self, customer_id: str
+            ) -> List[Reservation]:
+        """
+        Returns every reservation of a customer.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_customer.get(customer_id)
+
+    @instrumented("by_hotel")
+    def get_reservations_by_hotel(self, hotel_id: str) -> List[Reservation]:
+        """
+        Returns every reservation in a hotel.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_hotel.get(hotel_id)
+
+    @instrumented("checking_in")
+    def get_reservations_checking_in(
+            self, start: DateLike, end: Optional[DateLike] = None,
+            hotel_id: Optional[str] = None
+            ) -> List[Reservation]:
+        """
+        Returns the reservations checking in on [start, end), sorted by
+        check-in date. end defaults to the day after start.
+        """
+        self._ensure_loaded()
+        return self._date_range(self._by_check_in, start, end, hotel_id)
+
+    @instrumented("checking_out")
+    def get_reservations_checking_out(
+            self, start: DateLike, end: Optional[DateLike] = None,
+            hotel_id: Optional[str] = None
+            ) -> List[Reservation]:
+        """
+        Returns the reservations checking out on [start, end), sorted by
+        check-out date. end defaults to the day after start.
+        """
+        self._ensure_loaded()
+        return self._date_range(self._by_check_out, start, end, hotel_id)
+
+    def _date_range(
+            self, index: DateIndex, start: DateLike,
+            end: Optional[DateLike], hotel_id: Optional[str]
+            ) -> List[Reservation]:
+        """
+        Resolves a date index range query into reservations, optionally
+        restricted to one hotel.
+        """
+        start_day = to_date(start)
+        end_day = to_date(end) if end is not None else (
+            start_day + timedelta(days=1)
+        )
+        with self._lock:
+            reservations = [
+                self._reservations_by_id[key]
+                for key in index.range(start_day.toordinal(),
+                                       end_day.toordinal())
+            ]
+        if hotel_id is None:
+            return reservations
+        return [res for res in reservations if res.hotel_id == hotel_id]
+
+    @instrumented("is_room_available")
+    def is_room_available(
+            self, hotel_id: str, room_number: int,
+            check_in: DateLike, check_out: DateLike
+            ) -> bool:
+        """
+        Returns True if the room has no reservation overlapping
+        [check_in, check_out).
+        """
+        self._ensure_loaded()
+        start, end = to_date(check_in), to_date(check_out)
+        with self._lock:
+            return self._availability.find_conflict(
+                hotel_id, room_number, start.toordinal(), end.toordinal()
+            ) is None
+
+    @instrumented("available_rooms")
+    def get_available_rooms(
+            self, hotel_id: str, room_numbers: Iterable[int],
+            check_in: DateLike, check_out: DateLike
+            ) -> List[int]:
+        """
+        Returns the rooms among room_numbers that are free for
+        [check_in, check_out).
+        """
+        self._ensure_loaded()
+        start, end = to_date(check_in), to_date(check_out)
+        with self._lock:
+            return self._availability.free_rooms(
+                hotel_id, room_numbers, start.toordinal(), end.toordinal()
+            )
+
+    @instrumented("count_free_rooms")
+    def count_free_rooms(
+            self, hotels: Iterable[Tuple[str, int]],
+            check_in: DateLike, check_out: DateLike
+            ) -> List[int]:
+        """
+        Returns, for each (hotel_id, total_rooms) pair, how many of the
+        rooms numbered 1 to total_rooms are free for [check_in,
+        check_out). The first call builds per-night room bitmaps for
+        every hotel; later calls are a few integer ORs per hotel.
+        """
+        self._ensure_loaded()
+        start, end = to_date(check_in), to_date(check_out)
+        with self._lock:
+            return self._availability.free_room_counts(
+                hotels, start.toordinal(), end.toordinal()
+            )
+
+    @instrumented("get")
     def get_reservation_by_id(
         self, reservation_id: str
     ) -> Optional[Reservation]:
 
         """
         Returns a Reservation object by ID or None if not found.
+        Until the reservations are loaded, a storage with point reads is
+        asked for the one reservation instead.
         """
-        return next(
-            (
-                res
-                for res in self.reservations
-                if res.reservation_id == reservation_id
-            ),
-            None
-        )
+        if not self._loaded and self.storage.point_reads:
+            item = self.storage.get(reservation_id)
+            if item is None:
+                return None
+            try:
+                return Reservation(**item)
+            except (KeyError, ValueError, TypeError) as error:
+                logger.warning("Error loading reservation record: %s => %s",
+                               item, error)
+                return None
+        self._ensure_loaded()
+        with self._lock:
+            return self._reservations_by_id.get(reservation_id)
 
     def display_reservation_information(self, reservation_id: str) -> None:
         """
         Prints the reservation information to the console.
         """
+        self._ensure_loaded()
         reservation = self.get_reservation_by_id(reservation_id)
         if reservation:
-            logging.info(
+            logger.info(
                 "Reservation ID: %s\nCustomer ID: %s\nHotel ID:"
                 " %s\nRoom Number: %d\nCheck-In: %s\nCheck-Out: %s",
                 reservation.reservation_id,
@@ -123,5 +652,5 @@ class ReservationManager:
                 reservation.check_out,
             )
         else:
-            logging.warning("No reservation "
-                            "found with ID '%s'.", reservation_id)
+            logger.warning("No reservation "
+                           "found with ID '%s'.", reservation_id)
@@ -8,6 +8,8 @@ class Customer:
     Represents a Customer with basic attributes.
     """
 
+    __slots__ = ("customer_id", "name", "phone")
+
     def __init__(self, customer_id: str, name: str, phone: str):
         """
         Initializes a new Customer instance.
@@ -8,6 +8,8 @@ class Hotel:
     Represents a Hotel with basic attributes.
     """
 
+    __slots__ = ("hotel_id", "name", "location", "total_rooms")
+
     def __init__(
             self, hotel_id: str, name: str, location: str, total_rooms: int
             ):
@@ -3,7 +3,43 @@ Module defining the Reservation class, compliant with PEP8, Flake8, and Pylint.
 """
 
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, datetime
+from typing import Union
+
+DateLike = Union[date, str, int]
+
+
+def to_date(value: DateLike) -> date:
+    """
+    Converts an ISO "YYYY-MM-DD" string or a proleptic Gregorian ordinal
+    to a date. Dates are returned unchanged, datetimes are truncated.
+    Raises ValueError or TypeError for anything else.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return date.fromordinal(value)
+    raise TypeError(f"Cannot convert {value!r} to a date.")
+
+
+def to_room_number(value: Union[int, str]) -> int:
+    """
+    Converts a room number given as an int or a decimal string to an
+    int. Raises ValueError unless it is a positive integer, or TypeError
+    for values of other types.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise TypeError(f"Invalid room number {value!r}.")
+    room_number = int(value)
+    if room_number < 1:
+        raise ValueError(
+            f"Room number must be a positive integer, not {value!r}."
+        )
+    return room_number
 
 
 @dataclass
@@ -11,6 +47,9 @@ class Reservation:
     """
     Represents a reservation with basic attributes.
     """
+    __slots__ = ("reservation_id", "customer_id", "hotel_id",
+                 "room_number", "check_in", "check_out")
+
     reservation_id: str
     customer_id: str
     hotel_id: str
@@ -21,7 +60,14 @@ class Reservation:
     def __post_init__(self):
         """
         Validates the reservation details after initialization.
+        The room number may be given as an int or a decimal string and
+        is always stored as a positive int, so "2" and 2 are the same
+        room. Check-in and check-out may be given as dates, ISO strings
+        or ordinals and are always stored as dates.
         """
+        self.room_number = to_room_number(self.room_number)
+        self.check_in = to_date(self.check_in)
+        self.check_out = to_date(self.check_out)
         if self.check_in >= self.check_out:
             raise ValueError("Check-in date must be before check-out date.")
 
@@ -33,3 +79,17 @@ class Reservation:
                 f"Customer={self.customer_id}, "
                 f"Hotel={self.hotel_id}, Room={self.room_number}, "
                 f"CheckIn={self.check_in}, CheckOut={self.check_out})")
+
+    def to_dict(self):
+        """
+        Returns a JSON-serializable dictionary representation of the
+        reservation, with dates as ISO strings.
+        """
+        return {
+            "reservation_id": self.reservation_id,
+            "customer_id": self.customer_id,
+            "hotel_id": self.hotel_id,
+            "room_number": self.room_number,
+            "check_in": self.check_in.isoformat(),
+            "check_out": self.check_out.isoformat(),
+        }
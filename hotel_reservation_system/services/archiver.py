@@ -0,0 +1,110 @@
+"""
+Scheduled archival of past reservations.
+
+ReservationArchiver moves every reservation that checked out more than
+a horizon ago from a ReservationManager to a ReservationArchive, keeping
+only current and future stays in memory and in the live data file. Run
+it once at startup to trim what was loaded, then every interval with
+start(). Archived reservations are read back on demand with history().
+"""
+
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Callable, List, Optional
+from managers.reservation_manager import ReservationManager
+from models.reservation import DateLike, Reservation
+from storage.archive import ReservationArchive
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationArchiver:
+    """
+    Moves reservations past a horizon to an archive, on demand or on a
+    schedule.
+    """
+
+    def __init__(
+            self, reservations: ReservationManager,
+            archive: ReservationArchive,
+            horizon: timedelta = timedelta(days=30),
+            today: Callable[[], date] = date.today
+            ):
+        """
+        :param reservations: Manager holding the live reservations
+        :param archive: Archive the past reservations are moved to
+        :param horizon: How long after check-out a reservation stays
+            live
+        :param today: Returns the current date
+        """
+        self.reservations = reservations
+        self.archive = archive
+        self.horizon = horizon
+        self.today = today
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> int:
+        """
+        Archives every reservation that checked out before the horizon
+        and returns how many were moved.
+        """
+        cutoff = self.today() - self.horizon
+        moved = self.reservations.archive_before(cutoff, self.archive)
+        if moved:
+            logger.info("Archived %d reservations checking out before %s",
+                        moved, cutoff)
+        return moved
+
+    def start(self, interval: float = 24 * 60 * 60) -> None:
+        """
+        Runs the job now and then every interval seconds on a background
+        thread until stop() is called. Failures are logged and retried
+        at the next interval.
+        """
+        if self._thread is not None:
+            raise RuntimeError("The archive job is already running.")
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run_periodically, args=(interval,),
+            name="reservation-archiver", daemon=True
+        )
+        self._thread.start()
+
+    def _run_periodically(self, interval: float) -> None:
+        """
+        Background thread body.
+        """
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error("Error archiving reservations: %s", error)
+            self._stop.wait(interval)
+
+    def stop(self) -> None:
+        """
+        Stops the background job, waiting for a run in progress.
+        """
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def history(
+            self, customer_id: Optional[str] = None,
+            hotel_id: Optional[str] = None,
+            start: Optional[DateLike] = None,
+            end: Optional[DateLike] = None
+            ) -> List[Reservation]:
+        """
+        Returns the archived reservations matching every given filter;
+        see ReservationArchive.query(). The archive is read on every
+        call.
+        """
+        return [
+            Reservation(**record)
+            for record in self.archive.query(customer_id, hotel_id,
+                                             start, end)
+        ]
@@ -0,0 +1,232 @@
+"""
+Booking service coordinating the hotel, customer and reservation
+managers.
+
+The managers stay independent of each other; BookingService enforces the
+references between them. A reservation may only be booked for an
+existing customer and hotel, in a room between 1 and the hotel's
+total_rooms. Every check is a dictionary lookup, so validating a batch
+costs O(batch) whatever the size of the collections.
+
+Deleting a hotel or customer finds its reservations through the
+reservation manager's per-hotel and per-customer indexes. Deletion is
+refused while reservations remain, unless cascading is enabled, in which
+case they are canceled first with a single write. Shrinking a hotel below
+a booked room number is refused the same way.
+
+The checks hold for changes made through the service. Bookings run
+concurrently with each other; deletions and modifications wait for the
+bookings in progress and keep new ones out until they finish.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+from managers.batch import BatchResult
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from models.reservation import Reservation, to_room_number
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedLock:
+    """
+    Lock held either by any number of shared holders or by a single
+    exclusive one.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Holds the lock alongside other shared holders.
+        """
+        with self._condition:
+            while self._exclusive:
+                self._condition.wait()
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                if not self._shared:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Holds the lock alone.
+        """
+        with self._condition:
+            while self._exclusive:
+                self._condition.wait()
+            # Claim it first so new shared holders queue up behind us.
+            self._exclusive = True
+            while self._shared:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+class BookingService:
+    """
+    Books reservations and deletes hotels and customers while keeping
+    the references between them valid.
+    """
+
+    def __init__(
+            self, hotels: HotelManager, customers: CustomerManager,
+            reservations: ReservationManager, cascade: bool = False
+            ):
+        """
+        :param hotels: Manager of the hotels reservations refer to
+        :param customers: Manager of the customers reservations refer to
+        :param reservations: Manager of the reservations
+        :param cascade: Whether deleting a hotel or customer cancels its
+            reservations instead of being refused
+        """
+        self.hotels = hotels
+        self.customers = customers
+        self.reservations = reservations
+        self.cascade = cascade
+        self._lock = _SharedLock()
+
+    def validate(self, reservation_data: dict) -> dict:
+        """
+        Returns a copy of the reservation data with its room number
+        normalized to an int, as it is checked and booked.
+        Raises ValueError if the reservation refers to an unknown
+        customer or hotel, or to a room the hotel does not have.
+        """
+        customer_id = reservation_data["customer_id"]
+        if self.customers.get_customer_by_id(customer_id) is None:
+            raise ValueError(f"No customer found with ID '{customer_id}'.")
+        hotel_id = reservation_data["hotel_id"]
+        hotel = self.hotels.get_hotel_by_id(hotel_id)
+        if hotel is None:
+            raise ValueError(f"No hotel found with ID '{hotel_id}'.")
+        room_number = to_room_number(reservation_data["room_number"])
+        if room_number > hotel.total_rooms:
+            raise ValueError(
+                f"Hotel '{hotel_id}' has no room {room_number}; its rooms "
+                f"are numbered 1 to {hotel.total_rooms}."
+            )
+        return dict(reservation_data, room_number=room_number)
+
+    def book(self, reservation_data: dict) -> Reservation:
+        """
+        Validates and creates a reservation.
+        Raises ValueError if it is invalid, as create_reservation does.
+        """
+        with self._lock.shared():
+            return self.reservations.create_reservation(
+                self.validate(reservation_data)
+            )
+
+    def book_many(self, items: Iterable[dict]) -> BatchResult:
+        """
+        Validates and creates several reservations with a single write.
+        Invalid items are logged and skipped.
+        """
+        result = BatchResult()
+        valid: List[dict] = []
+        with self._lock.shared():
+            for item in items:
+                try:
+                    valid.append(self.validate(item))
+                except (KeyError, ValueError, TypeError) as error:
+                    logger.warning("Error booking reservation: %s => %s",
+                                   item, error)
+                    result.failed.append((item, error))
+            created = self.reservations.create_many(valid)
+        result.succeeded.extend(created.succeeded)
+        result.failed.extend(created.failed)
+        return result
+
+    def delete_hotel(
+            self, hotel_id: str, cascade: Optional[bool] = None
+            ) -> bool:
+        """
+        Deletes a hotel, canceling its reservations if cascading.
+        Raises ValueError if it still has reservations otherwise.
+
+        :param cascade: Overrides the service's cascade setting
+        """
+        with self._lock.exclusive():
+            if self.hotels.get_hotel_by_id(hotel_id) is None:
+                return False
+            self._release(
+                self.reservations.get_reservations_by_hotel(hotel_id),
+                f"hotel '{hotel_id}'", cascade
+            )
+            return self.hotels.delete_hotel(hotel_id)
+
+    def delete_customer(
+            self, customer_id: str, cascade: Optional[bool] = None
+            ) -> bool:
+        """
+        Deletes a customer, canceling their reservations if cascading.
+        Raises ValueError if they still have reservations otherwise.
+
+        :param cascade: Overrides the service's cascade setting
+        """
+        with self._lock.exclusive():
+            if self.customers.get_customer_by_id(customer_id) is None:
+                return False
+            self._release(
+                self.reservations.get_reservations_by_customer(customer_id),
+                f"customer '{customer_id}'", cascade
+            )
+            return self.customers.delete_customer(customer_id)
+
+    def modify_hotel_information(self, hotel_id: str, **kwargs) -> bool:
+        """
+        Modifies a hotel as HotelManager.modify_hotel_information does.
+        Raises ValueError if total_rooms would drop below a booked room.
+        """
+        with self._lock.exclusive():
+            if "total_rooms" in kwargs:
+                total_rooms = int(kwargs["total_rooms"])
+                booked = max(
+                    (reservation.room_number for reservation in
+                     self.reservations.get_reservations_by_hotel(hotel_id)),
+                    default=0
+                )
+                if booked > total_rooms:
+                    raise ValueError(
+                        f"Hotel '{hotel_id}' has room {booked} booked; "
+                        f"total_rooms cannot drop to {total_rooms}."
+                    )
+            return self.hotels.modify_hotel_information(hotel_id, **kwargs)
+
+    def _release(
+            self, dependents: List[Reservation], owner: str,
+            cascade: Optional[bool]
+            ) -> None:
+        """
+        Cancels the reservations of an owner about to be deleted, or
+        raises ValueError if there are any and cascading is off.
+        Must be called with the lock held exclusively.
+        """
+        if not dependents:
+            return
+        if not (self.cascade if cascade is None else cascade):
+            raise ValueError(
+                f"Cannot delete {owner}: it has {len(dependents)} "
+                "reservation(s)."
+            )
+        self.reservations.cancel_many(
+            reservation.reservation_id for reservation in dependents
+        )
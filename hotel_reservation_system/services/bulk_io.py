@@ -0,0 +1,265 @@
+"""
+Bulk import and export of hotels, customers and reservations.
+
+import_records() loads a CSV (with a header row) or JSON lines file
+into a manager. The main process only splits the file into chunks of
+whole records; parsing and validation run in a ProcessPoolExecutor,
+using the same rules as the models (e.g. Reservation's date and room
+number checks and int() coercion of total_rooms). The validated records
+are then merged with the manager's create_many(), so the whole file is
+persisted with a single write and duplicate or conflicting records are
+rejected exactly as they would be one at a time.
+
+export_records() streams a manager's objects to a JSON lines file one
+line at a time, without serializing the whole collection first.
+"""
+
+import csv
+import io
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import (
+    IO, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+)
+from managers.batch import BatchResult
+from models.customer import Customer
+from models.hotel import Hotel
+from models.reservation import Reservation
+from storage.file_lock import atomic_write
+
+CSV = "csv"
+JSONL = "jsonl"
+FORMATS = {".csv": CSV, ".jsonl": JSONL, ".ndjson": JSONL}
+
+# Records of one manager kind that fail validation, as (line, message).
+Failures = List[Tuple[int, str]]
+# (kind, format, CSV header, line number of the first record, text)
+Chunk = Tuple[str, str, Optional[List[str]], int, str]
+
+
+def _hotel(item: dict) -> dict:
+    """
+    Returns a hotel record validated like HotelManager.create_many().
+    """
+    return Hotel(
+        hotel_id=item["hotel_id"], name=item["name"],
+        location=item["location"], total_rooms=int(item["total_rooms"])
+    ).to_dict()
+
+
+def _customer(item: dict) -> dict:
+    """
+    Returns a customer record validated like
+    CustomerManager.create_many().
+    """
+    return Customer(
+        customer_id=item["customer_id"], name=item["name"],
+        phone=item["phone"]
+    ).to_dict()
+
+
+def _reservation(item: dict) -> dict:
+    """
+    Returns a reservation record validated by Reservation, with its
+    room number as an int and its dates as ISO strings.
+    """
+    return Reservation(
+        reservation_id=item["reservation_id"],
+        customer_id=item["customer_id"], hotel_id=item["hotel_id"],
+        room_number=item["room_number"],
+        check_in=item["check_in"], check_out=item["check_out"]
+    ).to_dict()
+
+
+# Validators by manager metrics_name.
+VALIDATORS: Dict[str, Callable[[dict], dict]] = {
+    "hotel": _hotel, "customer": _customer, "reservation": _reservation,
+}
+
+
+def file_format(path: str) -> str:
+    """
+    Returns CSV or JSONL from a file's extension.
+    Raises ValueError for any other extension.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot import {path!r}: expected one of "
+                         f"{', '.join(sorted(FORMATS))}.")
+    return FORMATS[extension]
+
+
+def parse_chunk(chunk: Chunk) -> Tuple[List[dict], Failures]:
+    """
+    Parses and validates one chunk; runs in a worker process. Returns
+    the valid records and a (line, message) pair per invalid one.
+    """
+    kind, fmt, header, first_line, text = chunk
+    validate = VALIDATORS[kind]
+    records: List[dict] = []
+    failures: Failures = []
+    if fmt == CSV:
+        reader = csv.DictReader(io.StringIO(text, newline=""),
+                                fieldnames=header)
+        line = first_line
+        for item in reader:
+            try:
+                records.append(validate(item))
+            except (KeyError, ValueError, TypeError) as error:
+                failures.append((line, f"{type(error).__name__}: {error}"))
+            line = first_line + reader.line_num
+        return records, failures
+    for line, text_line in enumerate(text.split("\n"), start=first_line):
+        if not text_line.strip():
+            continue
+        try:
+            item = json.loads(text_line)
+            if not isinstance(item, dict):
+                raise TypeError("expected a JSON object")
+            records.append(validate(item))
+        except (KeyError, ValueError, TypeError) as error:
+            failures.append((line, f"{type(error).__name__}: {error}"))
+    return records, failures
+
+
+def _read_chunks(
+        path: str, kind: str, chunk_size: int
+        ) -> Iterator[Chunk]:
+    """
+    Yields the file as chunks of at most chunk_size records. CSV records
+    spanning several lines (quoted newlines) are kept whole.
+    """
+    fmt = file_format(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        header = None
+        line_number = 1
+        if fmt == CSV:
+            header_line = file.readline()
+            header = next(csv.reader([header_line]), None)
+            if not header:
+                return
+            line_number = 2
+        lines: List[str] = []
+        records = 0
+        first_line = line_number
+        pending_quotes = 0
+        for line in file:
+            lines.append(line)
+            line_number += 1
+            if fmt == CSV:
+                # A record ends on a line that closes every quote.
+                pending_quotes += line.count('"')
+                if pending_quotes % 2:
+                    continue
+                pending_quotes = 0
+            records += 1
+            if records >= chunk_size:
+                yield kind, fmt, header, first_line, "".join(lines)
+                lines, records, first_line = [], 0, line_number
+        if lines:
+            yield kind, fmt, header, first_line, "".join(lines)
+
+
+def parse_file(
+        path: str, kind: str, workers: Optional[int] = None,
+        chunk_size: int = 10_000
+        ) -> Iterator[Tuple[List[dict], Failures]]:
+    """
+    Yields (records, failures) for each chunk of the file, in file
+    order, parsing the chunks in worker processes. A file that fits in
+    one chunk is parsed in this process.
+
+    :param kind: "hotel", "customer" or "reservation"
+    :param workers: Number of worker processes, defaults to the CPUs
+    :param chunk_size: Records per chunk sent to a worker
+    """
+    if kind not in VALIDATORS:
+        raise ValueError(f"Unknown record kind {kind!r}.")
+    chunks = _read_chunks(path, kind, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    if second is None or workers == 1:
+        yield from map(parse_chunk, itertools.chain(
+            [first], [second] if second is not None else [], chunks
+        ))
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _parse_in_pool(
+            executor, 2 * workers, itertools.chain([first, second], chunks)
+        )
+
+
+def _parse_in_pool(
+        executor: Executor, limit: int, chunks: Iterator[Chunk]
+        ) -> Iterator[Tuple[List[dict], Failures]]:
+    """
+    Parses chunks in the pool in order, keeping at most limit of them in
+    flight so the file is never held in memory at once.
+    """
+    in_flight: Deque[Future] = deque()
+    for chunk in chunks:
+        if len(in_flight) >= limit:
+            yield in_flight.popleft().result()
+        in_flight.append(executor.submit(parse_chunk, chunk))
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def import_records(
+        manager: Any, path: str, workers: Optional[int] = None,
+        chunk_size: int = 10_000
+        ) -> BatchResult:
+    """
+    Imports a CSV or JSON lines file into a hotel, customer or
+    reservation manager with a single write. Returns the created
+    objects, and the records that failed as ("path:line", error) pairs
+    or, when rejected by the manager, as (record, error) pairs.
+    """
+    valid: List[dict] = []
+    failed: List[Tuple[Any, Exception]] = []
+    for records, failures in parse_file(path, manager.metrics_name,
+                                        workers, chunk_size):
+        valid.extend(records)
+        failed.extend((f"{path}:{line}", ValueError(message))
+                      for line, message in failures)
+    result = manager.create_many(valid)
+    result.failed[:0] = failed
+    return result
+
+
+def export_records(
+        manager: Any, path: str, buffer_records: int = 10_000
+        ) -> int:
+    """
+    Writes every object of a hotel, customer or reservation manager to
+    a JSON lines file and returns how many were written. Objects are
+    serialized as they are written, buffer_records lines at a time, and
+    the file is replaced atomically once complete.
+    """
+    objects = {
+        "hotel": lambda: manager.hotels,
+        "customer": lambda: manager.customers,
+        "reservation": lambda: manager.reservations,
+    }[manager.metrics_name]()
+    count = 0
+
+    def write(file: IO) -> None:
+        nonlocal count
+        lines: List[str] = []
+        for item in objects:
+            lines.append(json.dumps(item.to_dict()) + "\n")
+            if len(lines) >= buffer_records:
+                file.write("".join(lines))
+                count += len(lines)
+                lines = []
+        file.write("".join(lines))
+        count += len(lines)
+
+    atomic_write(path, write)
+    return count
@@ -0,0 +1,94 @@
+"""
+Free-room search across hotels by location and date range.
+
+Candidate hotels come from HotelManager's location index. Their free
+rooms are counted by ReservationManager from per-hotel, per-night
+bitmaps of booked rooms, so a query costs a few integer operations per
+candidate hotel and night, whatever the number of reservations. Only the
+best results are sorted.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import List, Optional
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from models.reservation import DateLike, to_date
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    A hotel with rooms free for the whole requested stay.
+    """
+
+    hotel_id: str
+    name: str
+    location: str
+    free_rooms: int
+    total_rooms: int
+
+    @property
+    def free_ratio(self) -> float:
+        """
+        Returns the share of the hotel's rooms that are free.
+        """
+        if not self.total_rooms:
+            return 0.0
+        return self.free_rooms / self.total_rooms
+
+
+class RoomSearch:  # pylint: disable=too-few-public-methods
+    """
+    Finds hotels with free rooms for a stay.
+    """
+
+    def __init__(
+            self, hotels: HotelManager, reservations: ReservationManager
+            ):
+        """
+        :param hotels: Manager of the hotels to search
+        :param reservations: Manager of the reservations booking them
+        """
+        self.hotels = hotels
+        self.reservations = reservations
+
+    def search(
+            self, location: Optional[str], check_in: DateLike,
+            check_out: DateLike, rooms: int = 1, limit: int = 20
+            ) -> List[SearchResult]:
+        """
+        Returns the hotels in location with at least rooms rooms free
+        for every night of [check_in, check_out). Hotels with the most
+        free rooms come first; ties are ordered by hotel ID.
+        Raises ValueError if check_out is not after check_in.
+
+        :param location: Location to search, or None for every hotel
+        :param rooms: Number of free rooms required
+        :param limit: Maximum number of results
+        """
+        start, end = to_date(check_in), to_date(check_out)
+        if end <= start:
+            raise ValueError("check_out must be after check_in.")
+        if location is None:
+            candidates = self.hotels.hotels
+        else:
+            candidates = self.hotels.get_hotels_by_location(location)
+        counts = self.reservations.count_free_rooms(
+            ((hotel.hotel_id, hotel.total_rooms) for hotel in candidates),
+            start, end
+        )
+        # Hotel IDs are unique, so the positions are never compared.
+        best = heapq.nsmallest(limit, [
+            (-free, hotel.hotel_id, position)
+            for position, (hotel, free) in enumerate(zip(candidates, counts))
+            if free >= rooms
+        ])
+        results = []
+        for free, _, position in best:
+            hotel = candidates[position]
+            results.append(SearchResult(
+                hotel.hotel_id, hotel.name, hotel.location, -free,
+                hotel.total_rooms
+            ))
+        return results
@@ -0,0 +1,133 @@
+"""
+Compressed, append-only archive of past reservations.
+
+The archive is a gzip file of JSON lines, one reservation per line. Each
+append() compresses its batch as a separate gzip member and writes it
+with a single call, so the file only ever grows and readers see
+concatenated members as one stream. Nothing is kept in memory; query()
+scans the file on demand.
+
+A reservation archived twice (e.g. a job interrupted between archiving
+and deleting the live copy, then run again) is reported once, with its
+latest content.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Iterable, Iterator, List, Optional
+from models.reservation import DateLike, to_date
+from storage.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationArchive:
+    """
+    Appends reservation records to a gzip-compressed JSON lines file.
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        """
+        :param path: Path of the archive file
+        :param compresslevel: gzip compression level, 1 (fast) to 9
+        """
+        self.path = path
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(path + ".lock")
+        self.bytes_written = 0
+
+    def append(self, records: Iterable[dict]) -> int:
+        """
+        Adds records to the end of the archive and returns how many were
+        written. The data is fsynced before returning. A failed write is
+        truncated away so the archive stays readable.
+        """
+        lines = [json.dumps(record, separators=(",", ":")) + "\n"
+                 for record in records]
+        if not lines:
+            return 0
+        data = gzip.compress("".join(lines).encode("utf-8"),
+                             self.compresslevel)
+        with self._lock, self._file_lock.exclusive():
+            with open(self.path, "ab") as file:
+                size = file.tell()
+                try:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                except BaseException:
+                    file.truncate(size)
+                    raise
+            self.bytes_written += len(data)
+        return len(lines)
+
+    def iter_records(self) -> Iterator[dict]:
+        """
+        Yields every archived record in the order it was appended.
+        Unreadable lines are logged and skipped; a damaged tail (e.g. a
+        write cut short by a crash) is logged and ends the scan.
+        """
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            line_number = 0
+            try:
+                for line_number, line in enumerate(file, start=1):
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as error:
+                        logger.warning("Skipping archive line %s:%d => %s",
+                                       self.path, line_number, error)
+            except (EOFError, OSError, zlib.error) as error:
+                logger.error("Archive %s is damaged after line %d: %s",
+                             self.path, line_number, error)
+
+    def query(
+            self, customer_id: Optional[str] = None,
+            hotel_id: Optional[str] = None,
+            start: Optional[DateLike] = None,
+            end: Optional[DateLike] = None
+            ) -> List[dict]:
+        """
+        Returns the archived reservations matching every given filter,
+        in the order they were archived.
+
+        :param customer_id: Only this customer's reservations
+        :param hotel_id: Only this hotel's reservations
+        :param start: Only stays checking out on or after this date
+        :param end: Only stays checking out before this date
+        """
+        start_day = to_date(start) if start is not None else None
+        end_day = to_date(end) if end is not None else None
+        found = {}
+        for record in self.iter_records():
+            if customer_id is not None and (
+                    record.get("customer_id") != customer_id):
+                continue
+            if hotel_id is not None and record.get("hotel_id") != hotel_id:
+                continue
+            if start_day is not None or end_day is not None:
+                check_out = to_date(record["check_out"])
+                if start_day is not None and check_out < start_day:
+                    continue
+                if end_day is not None and check_out >= end_day:
+                    continue
+            key = record.get("reservation_id")
+            found.pop(key, None)
+            found[key] = record
+        return list(found.values())
+
+    def get(self, reservation_id: str) -> Optional[dict]:
+        """
+        Returns the latest archived record of a reservation, or None.
+        """
+        found = None
+        for record in self.iter_records():
+            if record.get("reservation_id") == reservation_id:
+                found = record
+        return found
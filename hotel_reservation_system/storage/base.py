@@ -0,0 +1,113 @@
+"""
+Storage interface shared by every persistence backend.
+
+Managers keep their objects in memory and hand each mutation to a
+Storage as an (op, key, record) change. Backends that can only rewrite
+the whole collection ask for a snapshot of every current record instead.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+PUT = "put"
+DELETE = "delete"
+
+# (op, key, record) triple describing one mutation.
+Change = Tuple[str, str, Optional[dict]]
+
+# Called as progress(done, total) while records are read.
+ProgressCallback = Callable[[int, int], None]
+
+
+class Storage(ABC):
+    """
+    Persists a collection of records identified by a primary key.
+
+    Backends must be safe to call from several threads. Whole-collection
+    writers take the snapshot while holding their write lock, so the
+    last write to finish always carries the latest state.
+    """
+
+    # Bytes written to the data files so far; backends that cannot tell
+    # leave it at 0.
+    bytes_written = 0
+
+    # Whether get() is cheap enough for a manager to look records up one
+    # at a time instead of loading the whole collection first.
+    point_reads = False
+
+    @abstractmethod
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields every stored record.
+
+        :param progress: Called as progress(done, total) while reading
+        """
+
+    def has_changed(self) -> bool:
+        """
+        Returns whether another process changed the stored data since
+        it was last read with iter_records(). Backends that cannot tell
+        return False.
+        """
+        return False
+
+    def load(self) -> List[dict]:
+        """
+        Returns every stored record.
+        """
+        return list(self.iter_records())
+
+    @abstractmethod
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces the stored collection with the given records.
+        """
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key, or None.
+        Backends without point reads raise NotImplementedError.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support point reads."
+        )
+
+    def write(
+            self, op: str, key: str, record: Optional[dict],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Persists a single mutation.
+
+        :param op: PUT for create/modify, DELETE for delete
+        :param key: Primary key of the affected record
+        :param record: New record content for PUT, None for DELETE
+        :param snapshot: Returns every current record; used by backends
+            that can only rewrite the whole collection
+        """
+        self.write_many([(op, key, record)], snapshot)
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Persists several mutations at once. The default implementation
+        rewrites the whole collection a single time.
+        """
+        if changes:
+            self.save(snapshot())
+
+    def flush(self) -> None:
+        """
+        Writes any change the backend still holds in memory. Backends
+        that write through do nothing.
+        """
+
+    def close(self) -> None:
+        """
+        Releases any resource held by the backend.
+        """
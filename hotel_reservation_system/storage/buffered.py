@@ -0,0 +1,291 @@
+"""
+Write-behind wrapper around another storage backend.
+
+BufferedStorage queues mutations in memory and hands them to the
+wrapped storage in a single write when flush() is called, so a burst of
+changes from many callers costs one write (group commit). Several
+changes to the same key are coalesced into the last one.
+
+Queued changes are visible to readers before they are flushed:
+iter_records() and get() apply them on top of the wrapped storage. This
+also means that neither reads nor save() ever wait for a flush, so a
+manager may call them while holding the lock its snapshot callable
+takes. flush() itself may call that snapshot callable and must not be
+called with that lock held.
+
+Given a flush_interval or max_pending, a background thread flushes on
+its own, at most flush_interval seconds after the first queued change
+or as soon as max_pending changes are queued (debounced persistence).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from storage.base import DELETE, PUT, Change, ProgressCallback, Storage
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedStorage(Storage):  # pylint: disable=too-many-instance-attributes
+    """
+    Queues writes in memory until flush() hands them to another storage.
+    """
+
+    def __init__(
+            self, storage: Storage, key: Optional[str] = None,
+            flush_interval: Optional[float] = None,
+            max_pending: Optional[int] = None
+            ):
+        """
+        :param storage: Storage the queued writes are flushed to
+        :param key: Name of the primary key field of each record,
+            defaults to the key of the wrapped storage; one of them is
+            required to coalesce queued changes by key
+        :param flush_interval: Seconds after the first queued change at
+            which the background thread flushes
+        :param max_pending: Number of queued changes at which the
+            background thread flushes
+        """
+        self.storage = storage
+        self.key = key or getattr(storage, "key", None)
+        if not self.key:
+            raise ValueError("BufferedStorage needs a key: pass one or "
+                             "wrap a storage that has one.")
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # Guards the queues; never held while the wrapped storage runs.
+        self._lock = threading.Condition()
+        # Orders flushes so the wrapped storage sees them one at a time.
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, Change] = {}
+        self._in_flight: Dict[str, Change] = {}
+        self._replacement: Optional[List[dict]] = None
+        self._replacement_in_flight: Optional[List[dict]] = None
+        self._snapshot: Callable[[], Iterable[dict]] = list
+        # Number of writes queued so far, flushed or not.
+        self.queued = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of queued writes not yet flushed.
+        """
+        with self._lock:
+            return len(self._pending) + (self._replacement is not None)
+
+    @property
+    def bytes_written(self) -> int:
+        """
+        Returns the bytes the wrapped storage wrote so far.
+        """
+        return self.storage.bytes_written
+
+    @property
+    def point_reads(self) -> bool:
+        """
+        Returns whether the wrapped storage serves cheap point reads.
+        """
+        return self.storage.point_reads
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields the stored records with the queued changes applied.
+
+        :param progress: Passed on to the wrapped storage
+        """
+        with self._lock:
+            overlay = {**self._in_flight, **self._pending}
+            replacement = self._replacement_or_in_flight()
+        if replacement is not None:
+            records: Iterable[dict] = replacement
+        else:
+            records = self.storage.iter_records(progress)
+        for item in records:
+            try:
+                change = overlay.pop(item[self.key], None)
+            except (KeyError, TypeError):
+                # Malformed records are handed back for the caller to
+                # report, as the wrapped storage would.
+                yield item
+                continue
+            if change is None:
+                yield item
+            elif change[0] == PUT:
+                yield change[2]
+        for op, _, record in overlay.values():
+            if op == PUT:
+                yield record
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key, queued changes included.
+        """
+        with self._lock:
+            change = self._pending.get(key) or self._in_flight.get(key)
+            replacement = self._replacement_or_in_flight()
+        if change is not None:
+            return change[2] if change[0] == PUT else None
+        if replacement is not None:
+            return next(
+                (item for item in replacement
+                 if isinstance(item, dict) and item.get(self.key) == key),
+                None
+            )
+        return self.storage.get(key)
+
+    def _replacement_or_in_flight(self) -> Optional[List[dict]]:
+        """
+        Returns the queued or in-flight replacement of the collection.
+        Must be called with the lock held.
+        """
+        if self._replacement is not None:
+            return self._replacement
+        return self._replacement_in_flight
+
+    def has_changed(self) -> bool:
+        """
+        Returns whether another process changed the wrapped storage.
+        """
+        return self.storage.has_changed()
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Queues a replacement of the whole collection, superseding every
+        change queued before it.
+        """
+        records = list(records)
+        with self._lock:
+            self._replacement = records
+            self._pending = {}
+            self.queued += 1
+            self._wake_flusher()
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Queues the changes; they are written on the next flush().
+        """
+        with self._lock:
+            for change in changes:
+                if change[0] not in (PUT, DELETE):
+                    raise ValueError(f"Unknown storage op {change[0]!r}.")
+                self._pending[change[1]] = change
+            self._snapshot = snapshot
+            self.queued += len(changes)
+            self._wake_flusher()
+
+    def _wake_flusher(self) -> None:
+        """
+        Starts or notifies the background flusher, if there is one.
+        Must be called with the lock held.
+        """
+        if self.flush_interval is None and self.max_pending is None:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run_flusher, name="buffered-storage-flush",
+                daemon=True
+            )
+            self._thread.start()
+        self._lock.notify()
+
+    def _due(self) -> bool:
+        """
+        Returns whether enough changes are queued to flush right away.
+        Must be called with the lock held.
+        """
+        queued = len(self._pending) + (self._replacement is not None)
+        return self.max_pending is not None and queued >= self.max_pending
+
+    def _run_flusher(self) -> None:
+        """
+        Background thread body: waits for queued changes and flushes
+        them once the interval elapses or max_pending is reached.
+        """
+        while True:
+            with self._lock:
+                while not self._closed and not self._has_pending():
+                    self._lock.wait()
+                if self._closed:
+                    return
+                deadline = None
+                if self.flush_interval is not None:
+                    deadline = time.monotonic() + self.flush_interval
+                while not self._closed and not self._due():
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self._lock.wait(timeout)
+            try:
+                self.flush()
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error("Error flushing queued writes: %s", error)
+                # Back off instead of retrying a failing storage in a
+                # tight loop; the changes stay queued.
+                with self._lock:
+                    self._lock.wait(self.flush_interval or 1.0)
+
+    def _has_pending(self) -> bool:
+        """
+        Returns whether anything is queued. Must be called with the lock
+        held.
+        """
+        return bool(self._pending) or self._replacement is not None
+
+    def flush(self) -> None:
+        """
+        Writes every queued change to the wrapped storage at once.
+        If the write fails the changes stay queued and the error is
+        raised; the next flush() retries them.
+        """
+        with self._flush_lock:
+            with self._lock:
+                replacement, self._replacement = self._replacement, None
+                changes, self._pending = self._pending, {}
+                self._in_flight = changes
+                self._replacement_in_flight = replacement
+                snapshot = self._snapshot
+            try:
+                if replacement is not None:
+                    self.storage.save(replacement)
+                if changes:
+                    self.storage.write_many(list(changes.values()), snapshot)
+            except Exception:
+                with self._lock:
+                    if self._replacement is None:
+                        self._replacement = replacement
+                        changes.update(self._pending)
+                        self._pending = changes
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight = {}
+                    self._replacement_in_flight = None
+            with self._lock:
+                if not self._has_pending():
+                    # Lets the owner of the snapshot callable be
+                    # collected while nothing is queued.
+                    self._snapshot = list
+
+    def close(self) -> None:
+        """
+        Stops the background flusher, flushes the queued changes and
+        closes the wrapped storage.
+        """
+        with self._lock:
+            self._closed = True
+            self._lock.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+        self.storage.close()
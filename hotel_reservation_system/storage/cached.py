@@ -0,0 +1,227 @@
+"""
+Read-through cache in front of a storage backend's point reads.
+
+CachedStorage keeps up to max_entries records returned by get() in
+least-recently-used order, each for at most ttl seconds, so repeated
+lookups of the same hot keys only reach the wrapped storage once.
+Misses are cached too, as absent records. Writes go through to the
+wrapped storage first and then update or invalidate the cached entries
+of the keys they touch; save() drops the whole cache. Changes made by
+other processes are seen once the entry expires.
+
+It is meant for backends where each read is a round trip (a database or
+a remote service). The hotel and customer managers use point reads for
+lookups until they have to load the whole collection, but only when the
+wrapped storage serves them cheaply; see Storage.point_reads.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Callable, Iterable, Iterator, List, Optional, Tuple
+)
+from storage.base import PUT, Change, ProgressCallback, Storage
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    Counters of a CachedStorage since it was created or reset.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Returns the share of lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachedStorage(Storage):  # pylint: disable=too-many-instance-attributes
+    """
+    Caches point reads of another storage with LRU eviction and an
+    optional time to live.
+    """
+
+    def __init__(
+            self, storage: Storage, max_entries: int = 10_000,
+            ttl: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic
+            ):
+        """
+        :param storage: Storage the reads and writes go to
+        :param max_entries: Number of records kept before the least
+            recently used is evicted
+        :param ttl: Seconds an entry is served before it is read again,
+            None to keep it until evicted or written
+        :param clock: Returns the current time in seconds
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.storage = storage
+        self.key = getattr(storage, "key", None)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        # Guards the entries and counters; never held while the wrapped
+        # storage runs.
+        self._lock = threading.Lock()
+        # key -> (expiry time, record or None if absent)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[dict]]]" = (
+            OrderedDict()
+        )
+        # Bumped by every write, so a read that raced with one is not
+        # cached.
+        self._generation = 0
+        self._hits = self._misses = self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def bytes_written(self) -> int:
+        """
+        Returns the bytes the wrapped storage wrote so far.
+        """
+        return self.storage.bytes_written
+
+    @property
+    def point_reads(self) -> bool:
+        """
+        Returns whether the wrapped storage serves cheap point reads.
+        """
+        return self.storage.point_reads
+
+    def stats(self) -> CacheStats:
+        """
+        Returns the hit, miss, eviction and expiration counts.
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              self._expirations, len(self._entries))
+
+    def reset_stats(self) -> None:
+        """
+        Sets every counter back to zero, keeping the cached entries.
+        """
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+            self._expirations = 0
+
+    def clear(self) -> None:
+        """
+        Drops every cached entry.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key, from the cache if it holds
+        a live entry and from the wrapped storage otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl is None or entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return _copy(entry[1])
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            generation = self._generation
+        record = self.storage.get(key)
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, record)
+        return _copy(record)
+
+    def _store(self, key: str, record: Optional[dict]) -> None:
+        """
+        Caches a record (None if absent), evicting the least recently
+        used entries beyond max_entries. Must be called with the lock
+        held.
+        """
+        expires = self.clock() + self.ttl if self.ttl is not None else 0.0
+        self._entries[key] = (expires, _copy(record))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields every record of the wrapped storage.
+        """
+        return self.storage.iter_records(progress)
+
+    def has_changed(self) -> bool:
+        """
+        Returns whether the wrapped storage changed since it was read.
+        """
+        return self.storage.has_changed()
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces the stored collection and drops the cache.
+        """
+        try:
+            self.storage.save(records)
+        finally:
+            self.clear()
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Writes the changes through, then caches the new records and
+        marks deleted keys absent. If the write fails, the keys it
+        touched are dropped from the cache instead.
+        """
+        with self._lock:
+            self._generation += 1
+        try:
+            self.storage.write_many(changes, snapshot)
+        except Exception:
+            with self._lock:
+                self._generation += 1
+                for _, key, _ in changes:
+                    self._entries.pop(key, None)
+            raise
+        with self._lock:
+            self._generation += 1
+            for op, key, record in changes:
+                self._store(key, record if op == PUT else None)
+
+    def flush(self) -> None:
+        """
+        Flushes the wrapped storage.
+        """
+        self.storage.flush()
+
+    def close(self) -> None:
+        """
+        Closes the wrapped storage and drops the cache.
+        """
+        self.clear()
+        self.storage.close()
+
+
+def _copy(record: Optional[dict]) -> Optional[dict]:
+    """
+    Returns a shallow copy of record, so callers cannot change the
+    cached one.
+    """
+    return None if record is None else dict(record)
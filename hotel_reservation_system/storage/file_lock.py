@@ -0,0 +1,124 @@
+"""
+Helpers that make file backends safe to share between processes.
+
+FileLock takes an advisory fcntl lock on a sidecar lock file and keeps a
+generation counter in it that every writer bumps, so other processes can
+tell whether the data changed since they last read it. atomic_write
+writes to a temporary file in the same directory and renames it over
+the target, so readers never see a half-written file.
+
+fcntl is only available on Unix; elsewhere the lock is a no-op and only
+the in-process locks of the backends apply.
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import IO, BinaryIO, Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-Unix platforms
+    fcntl = None
+
+
+class FileLock:
+    """
+    Advisory cross-process lock plus a generation counter, both kept in
+    a sidecar file.
+
+    The lock is reentrant and also excludes other threads of the same
+    process, since flock alone does not.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the lock file; created on first use
+        """
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file: Optional[BinaryIO] = None
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Holds an exclusive lock for the duration of the with block.
+        """
+        with self._thread_lock:
+            if self._depth == 0:
+                # pylint: disable=consider-using-with
+                self._file = open(self.path, "a+b")
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                    self._file.close()
+                    self._file = None
+
+    def generation(self) -> int:
+        """
+        Returns the current generation, 0 if nothing was written yet.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                return int(file.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """
+        Increments the generation and returns the new value.
+        Must be called while holding the exclusive lock.
+        """
+        generation = self.generation() + 1
+        with open(self.path, "r+b") as file:
+            file.write(b"%d" % generation)
+            file.truncate()
+        return generation
+
+
+def atomic_write(
+        path: str, write: Callable[[IO], None], binary: bool = False
+        ) -> int:
+    """
+    Replaces path with the content produced by write(file) and returns
+    its size in bytes. The file is opened in text mode, or in binary
+    mode if binary is True.
+
+    The content goes to a temporary file in the same directory, which is
+    fsynced and then renamed over path, so a crash leaves either the old
+    or the new file in place, never a truncated one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        if binary:
+            file = os.fdopen(descriptor, "wb")
+        else:
+            file = os.fdopen(descriptor, "w", encoding="utf-8")
+        with file:
+            # mkstemp creates the file as 0600; keep the target's mode.
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+            size = os.fstat(file.fileno()).st_size
+        os.replace(tmp_path, path)
+        return size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,407 @@
+"""
+JSON file storage backends used by the managers.
+
+JsonFileStorage rewrites the whole collection on every write, which is
+what the managers have always done. JournaledJsonStorage appends one
+compact record per mutation to a log file next to the snapshot and folds
+the log back into the snapshot once it grows past a threshold.
+
+Both are safe to share between processes: files are replaced
+atomically, writers hold an exclusive lock on a sidecar .lock file, and
+each backend remembers which version of the files its caller last
+loaded. has_changed() tells whether another process wrote since, and a
+write made on top of such a change is merged into the records on disk
+instead of overwriting them.
+
+Given a cache_path, a storage also keeps a marshal snapshot of the
+records it last read or saved, tagged with the version of the files it
+came from. As long as the files have not changed since, iter_records()
+loads the snapshot instead of parsing JSON, which makes warm starts
+several times faster. The cache is only a copy; deleting it is safe.
+"""
+
+import json
+import logging
+import marshal
+import os
+import sys
+import threading
+from typing import (
+    Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+)
+from storage.base import DELETE, PUT, Change, ProgressCallback, Storage
+from storage.file_lock import FileLock, atomic_write
+from storage.json_stream import iter_json_array
+
+logger = logging.getLogger(__name__)
+
+# Marshal's format may change between Python versions.
+CACHE_TAG = f"records-v1-{sys.implementation.cache_tag}"
+
+
+class JsonFileStorage(Storage):
+    """
+    Stores a collection of records as a JSON array in a single file.
+    """
+
+    def __init__(
+            self, path: str, key: Optional[str] = None,
+            cache_path: Optional[str] = None
+            ):
+        """
+        :param path: Path of the JSON data file
+        :param key: Name of the primary key field, needed by get()
+        :param cache_path: Path of the marshal snapshot cache, if any
+        """
+        self.path = path
+        self.key = key
+        self.cache_path = cache_path
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(path + ".lock")
+        # Version of the files the caller's in-memory state reflects.
+        self._loaded_version: Optional[Hashable] = None
+
+    def _version(self) -> Hashable:
+        """
+        Returns a value that changes whenever the stored data does.
+        """
+        return (_file_stamp(self.path), self._file_lock.generation())
+
+    def has_changed(self) -> bool:
+        """
+        Returns whether the file changed since it was last loaded by
+        iter_records() or written through this storage.
+        """
+        return self._version() != self._loaded_version
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields the raw records one at a time without reading the whole
+        file into memory, and marks that version of the file as loaded.
+
+        :param progress: Called as progress(bytes_read, total_bytes)
+        Raises json.JSONDecodeError or OSError if the file is unreadable;
+        records yielded before the error remain valid.
+        """
+        version = self._version()
+        self._loaded_version = version
+        if self.cache_path is None:
+            yield from self._iter_file(progress)
+            return
+        cached = self._read_cache(version)
+        if cached is not None:
+            yield from cached
+            return
+        records = []
+        for item in self._iter_file(progress):
+            records.append(item)
+            yield item
+        self._write_cache(version, records)
+
+    def _read_cache(self, version: Hashable) -> Optional[List[dict]]:
+        """
+        Returns the cached records if they match version, else None.
+        """
+        try:
+            # marshal.load() on a file object reads it in small pieces;
+            # reading the bytes first is several times faster.
+            with open(self.cache_path, "rb") as file:
+                tag, cached_version, records = marshal.loads(file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as error:
+            logger.warning("Ignoring unreadable cache %s: %s",
+                           self.cache_path, error)
+            return None
+        if tag != CACHE_TAG or cached_version != version:
+            return None
+        return records
+
+    def _write_cache(self, version: Hashable, records: List[dict]) -> None:
+        """
+        Stores the records as the snapshot of version. Failures are
+        logged; the cache is only an optimization.
+        """
+        try:
+            atomic_write(
+                self.cache_path,
+                lambda file: marshal.dump((CACHE_TAG, version, records), file),
+                binary=True
+            )
+        except (OSError, ValueError) as error:
+            logger.warning("Could not write cache %s: %s",
+                           self.cache_path, error)
+
+    def _iter_file(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields the records of the data file. Files are only ever
+        replaced, never rewritten in place, so no lock is needed.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            total_bytes = os.fstat(file.fileno()).st_size
+            yield from iter_json_array(
+                file, total_bytes=total_bytes, progress=progress
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key by scanning the file.
+        """
+        if self.key is None:
+            raise ValueError("JsonFileStorage needs a key field for get().")
+        for item in self._iter_file():
+            if isinstance(item, dict) and item.get(self.key) == key:
+                return item
+        return None
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces the file content with the given records.
+        """
+        records = list(records)
+        with self._lock, self._file_lock.exclusive():
+            self._replace(records)
+            self._loaded_version = self._version()
+            if self.cache_path is not None:
+                self._write_cache(self._loaded_version, records)
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Rewrites the whole file once for all the changes. If another
+        process changed the file since it was loaded, the changes are
+        applied to the records on disk instead of the snapshot.
+        """
+        if not changes:
+            return
+        with self._lock:
+            records = list(snapshot())
+            with self._file_lock.exclusive():
+                stale = self.has_changed()
+                if stale and self.key is None:
+                    logger.warning("%s changed on disk and has no key "
+                                   "field to merge on; overwriting it",
+                                   self.path)
+                    stale = False
+                if stale:
+                    self._replace(_apply_changes(
+                        self._iter_file(), changes, self.key
+                    ))
+                else:
+                    self.save(records)
+
+    def _replace(self, records: List[dict]) -> None:
+        """
+        Atomically replaces the data file and bumps the generation.
+        Must be called while holding the file lock.
+        """
+        self.bytes_written += atomic_write(
+            self.path, lambda file: json.dump(records, file, indent=4)
+        )
+        self._file_lock.bump()
+
+
+class JournaledJsonStorage(JsonFileStorage):
+    """
+    JSON snapshot plus an append-only log of mutations.
+
+    Each write appends a single line to the log instead of rewriting the
+    snapshot. Once the log holds compact_threshold entries it is folded
+    into the snapshot and truncated. load() replays snapshot plus log.
+    """
+
+    def __init__(
+            self, path: str, key: str,
+            log_path: Optional[str] = None,
+            compact_threshold: int = 1000,
+            fsync: bool = False
+            ):
+        """
+        :param path: Path of the JSON snapshot file
+        :param key: Name of the primary key field of each record
+        :param log_path: Path of the log file, defaults to the snapshot
+            path with a .log extension
+        :param compact_threshold: Number of logged mutations that
+            triggers a compaction
+        :param fsync: Whether each appended entry is fsynced to disk
+        """
+        super().__init__(path, key)
+        self.log_path = log_path or os.path.splitext(path)[0] + ".log"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.log_entries = 0
+
+    def _version(self) -> Hashable:
+        """
+        Returns a value that changes whenever the snapshot or the log
+        does.
+        """
+        return (
+            _file_stamp(self.path), _file_stamp(self.log_path),
+            self._file_lock.generation()
+        )
+
+    def _iter_file(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields the snapshot records with the logged mutations applied.
+        Only the log is held in memory; the snapshot is streamed.
+        Log lines that cannot be parsed (e.g. a torn final write) are
+        logged and skipped.
+        """
+        latest = self._read_log()
+        for item in super()._iter_file(progress):
+            try:
+                key = item[self.key]
+                entry = latest.get(key)
+            except (KeyError, TypeError):
+                # Malformed snapshot records are handed back untouched so
+                # the manager can report them like the plain JSON file.
+                yield item
+                continue
+            if entry is None:
+                yield item
+            elif entry["op"] == PUT and "record" in entry:
+                yield entry.pop("record")
+        for entry in latest.values():
+            if entry["op"] == PUT and "record" in entry:
+                yield entry["record"]
+
+    def _read_log(self) -> Dict[str, dict]:
+        """
+        Returns the last logged entry for every key in the log.
+        """
+        latest: Dict[str, dict] = {}
+        self.log_entries = 0
+        if not os.path.exists(self.log_path):
+            return latest
+
+        with open(self.log_path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    if entry["op"] not in (PUT, DELETE):
+                        raise ValueError(f"unknown op {entry['op']!r}")
+                    if entry["op"] == PUT and "record" not in entry:
+                        raise ValueError("missing record")
+                    latest.pop(entry["key"], None)
+                    latest[entry["key"]] = entry
+                except (json.JSONDecodeError, KeyError, TypeError,
+                        ValueError) as error:
+                    logger.warning("Skipping log entry %s:%d => %s",
+                                   self.log_path, line_number, error)
+                    continue
+                self.log_entries += 1
+        return latest
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Writes a new snapshot and truncates the log.
+        """
+        self.compact(records)
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Appends every mutation to the log in a single write, compacting
+        once the log reaches the configured threshold. If another
+        process wrote since the log was loaded, compaction folds the
+        files on disk rather than the snapshot.
+        """
+        if not changes:
+            return
+        lines = []
+        for op, key, record in changes:
+            entry = {"op": op, "key": key}
+            if op == PUT:
+                entry["record"] = record
+            lines.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        data = "".join(lines).encode("utf-8")
+        with self._lock, self._file_lock.exclusive():
+            stale = self.has_changed()
+            with open(self.log_path, "ab") as file:
+                file.write(data)
+                if self.fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            self._file_lock.bump()
+            self.bytes_written += len(data)
+            self.log_entries += len(lines)
+            if self.log_entries >= self.compact_threshold:
+                self._compact(
+                    list(self._iter_file()) if stale else list(snapshot())
+                )
+            if not stale:
+                self._loaded_version = self._version()
+
+    def compact(self, records: Iterable[dict]) -> None:
+        """
+        Folds the current records into the snapshot and empties the log.
+        """
+        records = list(records)
+        with self._lock, self._file_lock.exclusive():
+            self._compact(records)
+            self._loaded_version = self._version()
+
+    def _compact(self, records: List[dict]) -> None:
+        """
+        Replaces the snapshot atomically and truncates the log, so a
+        crash before the truncation only causes already-applied entries
+        to be replayed. Must be called while holding the file lock.
+        """
+        self.bytes_written += atomic_write(
+            self.path,
+            lambda file: json.dump(records, file, separators=(",", ":"))
+        )
+        with open(self.log_path, "w", encoding="utf-8"):
+            pass
+        self._file_lock.bump()
+        self.log_entries = 0
+
+
+def _file_stamp(path: str) -> Optional[tuple]:
+    """
+    Returns the inode, modification time and size of a file, or None if
+    it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _apply_changes(
+        records: Iterable[dict], changes: List[Change], key: str
+        ) -> List[dict]:
+    """
+    Returns the records with the changes applied, keeping their order.
+    Records without a usable key are kept as they are.
+    """
+    merged: Dict[object, dict] = {}
+    for index, item in enumerate(records):
+        try:
+            merged[item[key]] = item
+        except (KeyError, TypeError):
+            merged[("unkeyed", index)] = item
+    for op, change_key, record in changes:
+        if op == PUT:
+            merged[change_key] = record
+        elif op == DELETE:
+            merged.pop(change_key, None)
+        else:
+            raise ValueError(f"Unknown storage op {op!r}.")
+    return list(merged.values())
@@ -0,0 +1,96 @@
+"""
+Incremental parser for files holding a single top-level JSON array.
+
+Elements are decoded one at a time from a bounded read buffer, so the
+whole file never has to be held in memory as text or as a list.
+"""
+
+import codecs
+import json
+import re
+from typing import BinaryIO, Iterator, Optional
+from storage.base import ProgressCallback
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(
+        file: BinaryIO, total_bytes: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None
+        ) -> Iterator:
+    """
+    Yields the elements of the JSON array stored in a binary file.
+
+    :param file: File opened in binary mode, positioned at the array
+    :param total_bytes: File size, passed through to progress
+    :param chunk_size: Number of bytes read at a time
+    :param progress: Called as progress(bytes_read, total_bytes) after
+        every chunk read
+    :raises json.JSONDecodeError: If the content is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    state = {"buffer": "", "bytes_read": 0, "eof": False}
+
+    def read_more() -> bool:
+        if state["eof"]:
+            return False
+        chunk = file.read(chunk_size)
+        state["eof"] = not chunk
+        state["bytes_read"] += len(chunk)
+        state["buffer"] += text_decoder.decode(chunk, final=not chunk)
+        if progress is not None:
+            progress(state["bytes_read"], total_bytes)
+        return True
+
+    def next_token(pos: int) -> int:
+        """Skips whitespace, reading more input as needed."""
+        while True:
+            pos = _WHITESPACE.match(state["buffer"], pos).end()
+            if pos < len(state["buffer"]) or not read_more():
+                return pos
+
+    def fail(message: str, pos: int):
+        raise json.JSONDecodeError(message, state["buffer"], pos)
+
+    pos = next_token(0)
+    if pos >= len(state["buffer"]) or state["buffer"][pos] != "[":
+        fail("Expecting '['", pos)
+    pos = next_token(pos + 1)
+    if pos < len(state["buffer"]) and state["buffer"][pos] == "]":
+        return
+
+    while True:
+        # Decode one element; an incomplete element needs more input. A
+        # number cut off by the end of the buffer ("0." of "0.5") decodes
+        # as a shorter one, so an element only counts once a separator
+        # follows it.
+        while True:
+            try:
+                value, end = decoder.raw_decode(state["buffer"], pos)
+                after = next_token(end)
+                if state["eof"] or (
+                        after < len(state["buffer"])
+                        and state["buffer"][after] in ",]"):
+                    break
+            except json.JSONDecodeError:
+                if state["eof"]:
+                    raise
+            read_more()
+        yield value
+
+        pos = next_token(end)
+        if pos >= len(state["buffer"]):
+            fail("Unterminated array", pos)
+        separator = state["buffer"][pos]
+        if separator == "]":
+            return
+        if separator != ",":
+            fail("Expecting ',' delimiter", pos)
+        pos = next_token(pos + 1)
+        # Drop consumed text so the buffer stays bounded.
+        if pos > chunk_size:
+            state["buffer"] = state["buffer"][pos:]
+            pos = 0
@@ -0,0 +1,385 @@
+"""
+Memory-mapped reservation storage with fixed-width records.
+
+Every reservation occupies one RECORD-sized slot of a memory-mapped
+file, so a record is read or rewritten in place by offset without
+parsing the rest of the file. IDs are stored as NUL-padded UTF-8 of at
+most ID_SIZE bytes and dates as ordinals. Deleted slots are flagged free
+and reused.
+
+Side indexes (ID to slot, and check-in day to slot) are rebuilt from the
+mapping when the file is opened; building them only decodes the ID and
+date fields, never whole reservations. The query methods unpack rows
+straight from the mapping and only materialize the Reservation objects
+that are actually returned.
+
+The store serves cheap point reads, so a ReservationManager over it
+answers get_reservation_by_id from the mapping until something makes it
+load. Its other queries (by customer, hotel, check-in or check-out date)
+and every mutation still load all reservations into memory first, since
+the manager's indexes and double-booking checks need them; use
+checking_in() and reservation() directly to avoid that.
+
+A file belongs to one process at a time. In-place writes are not atomic
+across a crash; save() replaces the whole file atomically.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+from models.reservation import DateLike, Reservation, to_date
+from storage.base import DELETE, PUT, Change, ProgressCallback, Storage
+from storage.file_lock import atomic_write
+
+MAGIC = b"HRSRES01"
+ID_SIZE = 32
+# magic, record size, number of slots in use (live or free)
+HEADER = struct.Struct("<8sII")
+# flags, padding, reservation_id, customer_id, hotel_id, room_number,
+# check_in ordinal, check_out ordinal
+RECORD = struct.Struct(f"<B3x{ID_SIZE}s{ID_SIZE}s{ID_SIZE}siii")
+LIVE = 1
+INITIAL_CAPACITY = 1024
+
+
+def _encode_id(value: str) -> bytes:
+    """
+    Returns an ID as bytes for a fixed-width field.
+    Raises ValueError if it does not fit.
+    """
+    encoded = str(value).encode("utf-8")
+    if len(encoded) > ID_SIZE or b"\0" in encoded:
+        raise ValueError(
+            f"ID {value!r} does not fit a {ID_SIZE}-byte field."
+        )
+    return encoded
+
+
+def _decode_id(value: bytes) -> str:
+    """
+    Returns the ID stored in a fixed-width field.
+    """
+    return value.rstrip(b"\0").decode("utf-8")
+
+
+def _pack(record: dict) -> Tuple[bytes, int]:
+    """
+    Returns a reservation record as a packed row and its check-in day.
+    Raises ValueError, TypeError or KeyError for invalid records.
+    """
+    check_in = to_date(record["check_in"]).toordinal()
+    room_number = int(record["room_number"])
+    try:
+        row = RECORD.pack(
+            LIVE,
+            _encode_id(record["reservation_id"]),
+            _encode_id(record["customer_id"]),
+            _encode_id(record["hotel_id"]),
+            room_number,
+            check_in,
+            to_date(record["check_out"]).toordinal(),
+        )
+    except struct.error as error:
+        raise ValueError(
+            f"Room number {room_number} does not fit a 32-bit field."
+        ) from error
+    return row, check_in
+
+
+class MmapReservationStorage(Storage):
+    # pylint: disable=too-many-instance-attributes
+    """
+    Stores reservations as fixed-width rows of a memory-mapped file.
+    """
+
+    point_reads = True
+
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        :param path: Path of the data file; created if missing
+        :param fsync: Whether each write is flushed to disk with msync
+        """
+        self.path = path
+        self.key = "reservation_id"
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            atomic_write(path, lambda file: _write_file(file, []),
+                         binary=True)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._slots: Dict[str, int] = {}
+        self._by_check_in: List[Tuple[int, int]] = []
+        self._free: List[int] = []
+        self._count = 0
+        self._open()
+
+    def _open(self) -> None:
+        """
+        Maps the file and rebuilds the side indexes from it.
+        """
+        # pylint: disable=consider-using-with
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, record_size, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{self.path} is not a reservation store.")
+        self._count = count
+        self._slots = {}
+        self._by_check_in = []
+        self._free = []
+        with memoryview(self._map) as view:
+            rows = view[HEADER.size:HEADER.size + count * RECORD.size]
+            for slot, (flags, reservation_id, *_, check_in, _) in (
+                    enumerate(RECORD.iter_unpack(rows))):
+                if flags & LIVE:
+                    self._slots[_decode_id(reservation_id)] = slot
+                    self._by_check_in.append((check_in, slot))
+                else:
+                    self._free.append(slot)
+            rows.release()
+        self._by_check_in.sort()
+        # Reuse the lowest free slots first.
+        self._free.reverse()
+
+    def _offset(self, slot: int) -> int:
+        """
+        Returns the file offset of a slot.
+        """
+        return HEADER.size + slot * RECORD.size
+
+    def _capacity(self) -> int:
+        """
+        Returns the number of slots the mapping can hold.
+        """
+        return (len(self._map) - HEADER.size) // RECORD.size
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of the file and maps it again.
+        """
+        size = self._offset(max(self._capacity() * 2, INITIAL_CAPACITY))
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _row(self, slot: int) -> tuple:
+        """
+        Unpacks a slot straight from the mapping.
+        """
+        return RECORD.unpack_from(self._map, self._offset(slot))
+
+    @staticmethod
+    def _materialize(row: tuple) -> Reservation:
+        """
+        Returns the Reservation stored in an unpacked row.
+        """
+        _, reservation_id, customer_id, hotel_id, room, check_in, \
+            check_out = row
+        return Reservation(
+            _decode_id(reservation_id), _decode_id(customer_id),
+            _decode_id(hotel_id), room, date.fromordinal(check_in),
+            date.fromordinal(check_out)
+        )
+
+    @staticmethod
+    def _as_record(row: tuple) -> dict:
+        """
+        Returns an unpacked row as a record with ISO dates.
+        """
+        _, reservation_id, customer_id, hotel_id, room, check_in, \
+            check_out = row
+        return {
+            "reservation_id": _decode_id(reservation_id),
+            "customer_id": _decode_id(customer_id),
+            "hotel_id": _decode_id(hotel_id),
+            "room_number": room,
+            "check_in": date.fromordinal(check_in).isoformat(),
+            "check_out": date.fromordinal(check_out).isoformat(),
+        }
+
+    def count(self) -> int:
+        """
+        Returns the number of stored reservations.
+        """
+        with self._lock:
+            return len(self._slots)
+
+    def reservation(self, reservation_id: str) -> Optional[Reservation]:
+        """
+        Returns the stored Reservation with the given ID, or None.
+        """
+        with self._lock:
+            slot = self._slots.get(reservation_id)
+            if slot is None:
+                return None
+            return self._materialize(self._row(slot))
+
+    def checking_in(
+            self, start: DateLike, end: DateLike
+            ) -> Iterator[Reservation]:
+        """
+        Yields the reservations checking in on days in [start, end), by
+        day. Each one is materialized only when the iterator reaches it.
+        """
+        start_day = to_date(start).toordinal()
+        end_day = to_date(end).toordinal()
+        with self._lock:
+            position = bisect_left(self._by_check_in, (start_day,))
+            slots = []
+            while position < len(self._by_check_in):
+                day, slot = self._by_check_in[position]
+                if day >= end_day:
+                    break
+                slots.append(slot)
+                position += 1
+        for slot in slots:
+            with self._lock:
+                row = self._row(slot)
+            if row[0] & LIVE:
+                yield self._materialize(row)
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields every stored reservation as a record, in slot order.
+
+        :param progress: Called as progress(records_read, total_records)
+        """
+        with self._lock:
+            slots = sorted(self._slots.values())
+        total = len(slots)
+        for done, slot in enumerate(slots, start=1):
+            with self._lock:
+                row = self._row(slot)
+            if row[0] & LIVE:
+                yield self._as_record(row)
+            if progress is not None and (done % 1000 == 0 or done == total):
+                progress(done, total)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key, or None.
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            return None if slot is None else self._as_record(self._row(slot))
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces the file with the given records, atomically.
+        """
+        rows = [_pack(record)[0] for record in records]
+        with self._lock:
+            self._close_map()
+            self.bytes_written += atomic_write(
+                self.path, lambda file: _write_file(file, rows), binary=True
+            )
+            self._open()
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Rewrites, appends or frees the affected slots in place.
+        Every record is validated before any slot is touched.
+        """
+        packed = {}
+        for op, key, record in changes:
+            if op == PUT:
+                packed[key] = _pack(record)
+            elif op != DELETE:
+                raise ValueError(f"Unknown storage op {op!r}.")
+        with self._lock:
+            for op, key, _ in changes:
+                if op == PUT:
+                    self._put(key, *packed[key])
+                else:
+                    self._delete(key)
+            HEADER.pack_into(self._map, 0, MAGIC, RECORD.size, self._count)
+            if self.fsync:
+                self._map.flush()
+            self.bytes_written += HEADER.size + sum(
+                RECORD.size if op == PUT else 1 for op, _, _ in changes
+            )
+
+    def _put(self, key: str, row: bytes, check_in: int) -> None:
+        """
+        Writes a packed row to the slot of key, allocating one if new.
+        Must be called with the lock held.
+        """
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._unindex(slot)
+        elif self._free:
+            slot = self._free.pop()
+        else:
+            if self._count == self._capacity():
+                self._grow()
+            slot = self._count
+            self._count += 1
+        offset = self._offset(slot)
+        self._map[offset:offset + RECORD.size] = row
+        self._slots[key] = slot
+        insort(self._by_check_in, (check_in, slot))
+
+    def _delete(self, key: str) -> None:
+        """
+        Frees the slot of key, if it is stored.
+        Must be called with the lock held.
+        """
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        self._unindex(slot)
+        self._map[self._offset(slot)] = 0
+        self._free.append(slot)
+
+    def _unindex(self, slot: int) -> None:
+        """
+        Removes a slot from the check-in index.
+        Must be called with the lock held.
+        """
+        entry = (self._row(slot)[5], slot)
+        position = bisect_left(self._by_check_in, entry)
+        if (position < len(self._by_check_in)
+                and self._by_check_in[position] == entry):
+            del self._by_check_in[position]
+
+    def _close_map(self) -> None:
+        """
+        Flushes and unmaps the file. Must be called with the lock held.
+        """
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """
+        Flushes and unmaps the file.
+        """
+        with self._lock:
+            self._close_map()
+
+
+def _write_file(file, rows: List[bytes]) -> None:
+    """
+    Writes a complete store holding the given packed rows.
+    """
+    capacity = max(len(rows), INITIAL_CAPACITY)
+    file.write(HEADER.pack(MAGIC, RECORD.size, len(rows)))
+    file.write(b"".join(rows))
+    file.write(bytes((capacity - len(rows)) * RECORD.size))
@@ -0,0 +1,372 @@
+"""
+Reservation storage partitioned into one data file per hotel.
+
+ShardedStorage routes every record to a shard named after its hotel_id,
+and optionally its check-in month, each shard being an ordinary
+JsonFileStorage:
+
+    <directory>/<hotel_id>.json                  by hotel
+    <directory>/<hotel_id>/<YYYY-MM>.json        by hotel and month
+
+A write only touches the shards of the records it changes, so bookings
+for different hotels never contend on the same file, and each shard
+keeps the file lock and merge-on-conflict behavior of JsonFileStorage.
+
+A shard that rewrites its whole file needs the current records of that
+shard. Given a HotelSnapshot, as ReservationManager passes, they are
+taken from the caller's records of that hotel only; any other snapshot
+callable lists the whole collection, once per write.
+
+Given hotel_ids, an instance only reads the shards of those hotels. This
+lets separate worker processes each own a disjoint set of hotels over
+one directory: a ReservationManager built on such a storage loads and
+writes its own hotels' files only. Shards are opened on first use.
+"""
+
+import os
+import threading
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+)
+from urllib.parse import quote, unquote
+from models.reservation import to_date
+from storage.base import DELETE, PUT, Change, ProgressCallback, Storage
+from storage.json_storage import JsonFileStorage
+
+# (hotel_id,) or (hotel_id, "YYYY-MM")
+Shard = Tuple[str, ...]
+
+SUFFIX = ".json"
+
+
+class HotelSnapshot:  # pylint: disable=too-few-public-methods
+    """
+    Snapshot callable that can also return the records of one hotel.
+    """
+
+    __slots__ = ("_records", "hotel")
+
+    def __init__(
+            self, records: Callable[[], Iterable[dict]],
+            hotel: Callable[[str], Iterable[dict]]
+            ):
+        """
+        :param records: Returns every current record
+        :param hotel: Returns the current records of one hotel ID
+        """
+        self._records = records
+        self.hotel = hotel
+
+    def __call__(self) -> Iterable[dict]:
+        """
+        Returns every current record.
+        """
+        return self._records()
+
+
+def _encode_name(value: str) -> str:
+    """
+    Returns value as a file name that cannot escape the directory.
+    """
+    return quote(value, safe="").replace(".", "%2E")
+
+
+class ShardedStorage(Storage):  # pylint: disable=too-many-instance-attributes
+    """
+    Stores reservations in one JsonFileStorage per hotel (and month).
+    """
+
+    def __init__(
+            self, directory: str, key: str = "reservation_id",
+            by_month: bool = False,
+            hotel_ids: Optional[Iterable[str]] = None
+            ):
+        """
+        :param directory: Directory holding the shard files
+        :param key: Name of the primary key field of each record
+        :param by_month: Also split each hotel by check-in month
+        :param hotel_ids: Hotels whose shards this instance reads,
+            defaults to every shard in the directory
+        """
+        self.directory = directory
+        self.key = key
+        self.by_month = by_month
+        self.hotel_ids: Optional[Set[str]] = (
+            None if hotel_ids is None else set(hotel_ids)
+        )
+        # Guards the open shards and the key map, never held while a
+        # shard reads or writes.
+        self._lock = threading.Lock()
+        self._shards: Dict[Shard, Storage] = {}
+        self._shard_of: Dict[str, Shard] = {}
+        self._loaded: Set[Shard] = set()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def bytes_written(self) -> int:
+        """
+        Returns the bytes written to every open shard so far.
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+        return sum(shard.bytes_written for shard in shards)
+
+    def shard_for(self, record: dict) -> Shard:
+        """
+        Returns the shard a record belongs to.
+        Raises KeyError, TypeError or ValueError for invalid records.
+        """
+        hotel_id = str(record["hotel_id"])
+        if not self.by_month:
+            return (hotel_id,)
+        return (hotel_id, to_date(record["check_in"]).strftime("%Y-%m"))
+
+    def _path(self, shard: Shard) -> str:
+        """
+        Returns the data file of a shard.
+        """
+        names = [_encode_name(part) for part in shard]
+        return os.path.join(self.directory, *names) + SUFFIX
+
+    def _open_shard(self, path: str) -> Storage:
+        """
+        Returns the storage of one shard file. Subclasses may override
+        this to use another backend per shard.
+        """
+        return JsonFileStorage(path, self.key)
+
+    def _shard(self, shard: Shard) -> Storage:
+        """
+        Returns the storage of a shard, opening it on first use.
+        """
+        with self._lock:
+            storage = self._shards.get(shard)
+            if storage is None:
+                path = self._path(shard)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                storage = self._shards[shard] = self._open_shard(path)
+                if not os.path.exists(path):
+                    # Nothing to read: a new shard starts out up to date.
+                    storage.load()
+            return storage
+
+    def shards(self) -> List[Shard]:
+        """
+        Returns the shards on disk that this instance reads, sorted.
+        """
+        found = []
+        for hotel_id, entry in self._list(self.directory):
+            if not self._reads((hotel_id,)):
+                continue
+            if not self.by_month:
+                if entry.is_file():
+                    found.append((hotel_id,))
+            elif entry.is_dir():
+                found.extend(
+                    (hotel_id, month)
+                    for month, month_entry in self._list(entry.path)
+                    if month_entry.is_file()
+                )
+        return sorted(found)
+
+    @staticmethod
+    def _list(directory: str) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Yields (decoded name, entry) for each shard file or hotel
+        directory in directory.
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    yield unquote(entry.name), entry
+                elif entry.name.endswith(SUFFIX):
+                    yield unquote(entry.name[:-len(SUFFIX)]), entry
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields the records of every shard this instance reads.
+
+        :param progress: Called as progress(shards_read, total_shards)
+        """
+        shards = self.shards()
+        with self._lock:
+            self._shard_of.clear()
+            self._loaded = set(shards)
+        for done, shard in enumerate(shards, start=1):
+            yield from self.iter_shard(shard)
+            if progress is not None:
+                progress(done, len(shards))
+
+    def iter_shard(self, shard: Shard) -> Iterator[dict]:
+        """
+        Yields the records of a single shard, opening only that file.
+        """
+        for record in self._shard(shard).iter_records():
+            if isinstance(record, dict) and self.key in record:
+                with self._lock:
+                    self._shard_of[record[self.key]] = shard
+            yield record
+
+    def iter_hotel(self, hotel_id: str) -> Iterator[dict]:
+        """
+        Yields the reservations of one hotel, reading only its shards.
+        """
+        if not self.by_month:
+            yield from self.iter_shard((hotel_id,))
+            return
+        directory = os.path.join(self.directory, _encode_name(hotel_id))
+        if os.path.isdir(directory):
+            months = sorted(month for month, entry in self._list(directory)
+                            if entry.is_file())
+            for month in months:
+                yield from self.iter_shard((hotel_id, month))
+
+    def has_changed(self) -> bool:
+        """
+        Returns whether a shard was added, removed or changed on disk
+        since the last iter_records().
+        """
+        with self._lock:
+            loaded = set(self._loaded)
+            opened = [self._shards[shard] for shard in loaded
+                      if shard in self._shards]
+        if set(self.shards()) != loaded:
+            return True
+        return any(storage.has_changed() for storage in opened)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key, reading only its shard if
+        it is known.
+        """
+        with self._lock:
+            shard = self._shard_of.get(key)
+        if shard is not None:
+            return self._shard(shard).get(key)
+        for shard in self.shards():
+            record = self._shard(shard).get(key)
+            if record is not None:
+                return record
+        return None
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces every shard this instance reads with the given records;
+        shards left without records are emptied.
+        """
+        groups: Dict[Shard, List[dict]] = {
+            shard: [] for shard in self.shards()
+        }
+        for record in records:
+            groups.setdefault(self.shard_for(record), []).append(record)
+        for shard, shard_records in groups.items():
+            self._shard(shard).save(shard_records)
+        with self._lock:
+            self._shard_of = {
+                record[self.key]: shard
+                for shard, shard_records in groups.items()
+                for record in shard_records
+            }
+            self._loaded = set(groups)
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Hands each shard the changes to its records. Shards that rewrite
+        their whole file get the part of the snapshot they hold: the
+        records of their hotel from a HotelSnapshot, otherwise from the
+        whole snapshot, taken at most once per call.
+        """
+        routed = self._route(changes)
+        taken: List[List[dict]] = []
+
+        def shard_snapshot(shard: Shard) -> Callable[[], List[dict]]:
+            def records() -> List[dict]:
+                if isinstance(snapshot, HotelSnapshot):
+                    candidates = snapshot.hotel(shard[0])
+                else:
+                    if not taken:
+                        taken.append(list(snapshot()))
+                    candidates = taken[0]
+                return [record for record in candidates
+                        if self.shard_for(record) == shard]
+            return records
+
+        for shard, shard_changes in routed.items():
+            self._shard(shard).write_many(
+                shard_changes, shard_snapshot(shard)
+            )
+
+    def _route(self, changes: List[Change]) -> Dict[Shard, List[Change]]:
+        """
+        Groups changes by shard and updates the key map. A record whose
+        hotel or month changed is deleted from its previous shard.
+        Raises KeyError, TypeError or ValueError for invalid records
+        before anything is written.
+        """
+        targets = [
+            self.shard_for(record) if op == PUT else None
+            for op, _, record in changes
+        ]
+        with self._lock:
+            unknown = [key for op, key, _ in changes
+                       if op == DELETE and key not in self._shard_of]
+        located = self._locate(unknown) if unknown else {}
+        routed: Dict[Shard, List[Change]] = {}
+        with self._lock:
+            for (op, key, record), shard in zip(changes, targets):
+                previous = self._shard_of.pop(key, None) or located.pop(
+                    key, None)
+                if previous is not None and previous != shard:
+                    routed.setdefault(previous, []).append(
+                        (DELETE, key, None)
+                    )
+                if op == PUT:
+                    self._shard_of[key] = shard
+                    routed.setdefault(shard, []).append((op, key, record))
+                    if self._reads(shard):
+                        self._loaded.add(shard)
+        return routed
+
+    def _reads(self, shard: Shard) -> bool:
+        """
+        Returns whether this instance reads the given shard.
+        """
+        return self.hotel_ids is None or shard[0] in self.hotel_ids
+
+    def _locate(self, keys: List[str]) -> Dict[str, Shard]:
+        """
+        Returns the shard holding each of keys that is found in a shard
+        this instance reads.
+        """
+        found: Dict[str, Shard] = {}
+        shards = self.shards()
+        for key in keys:
+            for shard in shards:
+                if self._shard(shard).get(key) is not None:
+                    found[key] = shard
+                    break
+        return found
+
+    def flush(self) -> None:
+        """
+        Flushes every open shard.
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            shard.flush()
+
+    def close(self) -> None:
+        """
+        Closes every open shard.
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+        for shard in shards:
+            shard.close()
@@ -0,0 +1,249 @@
+"""
+SQLite storage backend.
+
+Each collection lives in its own table with the primary key as the
+table key, so creating, modifying or deleting a record only touches that
+row. The database runs in WAL mode, and every statement is a fixed,
+parameterized SQL string that sqlite3 compiles once and keeps in its
+statement cache.
+"""
+
+import sqlite3
+import threading
+from typing import (
+    Callable, Iterable, Iterator, List, Mapping, Optional, Sequence
+)
+from storage.base import DELETE, PUT, Change, ProgressCallback, Storage
+
+FETCH_SIZE = 1000
+
+HOTEL_COLUMNS = {
+    "hotel_id": "TEXT",
+    "name": "TEXT",
+    "location": "TEXT",
+    "total_rooms": "INTEGER",
+}
+CUSTOMER_COLUMNS = {
+    "customer_id": "TEXT",
+    "name": "TEXT",
+    "phone": "TEXT",
+}
+RESERVATION_COLUMNS = {
+    "reservation_id": "TEXT",
+    "customer_id": "TEXT",
+    "hotel_id": "TEXT",
+    "room_number": "INTEGER",
+    "check_in": "TEXT",
+    "check_out": "TEXT",
+}
+RESERVATION_INDEXES = (
+    ("hotel_id", "room_number"),
+    ("customer_id",),
+    ("check_in",),
+    ("check_out",),
+)
+
+
+class SQLiteStorage(Storage):  # pylint: disable=too-many-instance-attributes
+    """
+    Stores a collection of records as rows of a SQLite table.
+    """
+
+    point_reads = True
+
+    def __init__(
+            self, path: str, table: str, key: str,
+            columns: Mapping[str, str],
+            indexes: Sequence[Sequence[str]] = ()
+            ):
+        """
+        :param path: Path of the database file
+        :param table: Table holding the collection
+        :param key: Primary key column
+        :param columns: Column names mapped to their SQL types; records
+            are stored and returned with exactly these fields
+        :param indexes: Column tuples to create secondary indexes on
+        """
+        self.path = path
+        self.table = table
+        self.key = key
+        self.columns = list(columns)
+        # One connection shared by every thread; the lock serializes it.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        # Changes whenever another connection commits to the database.
+        self._loaded_version: Optional[int] = None
+
+        definitions = ", ".join(
+            f"{name} {sql_type}" + (" PRIMARY KEY" if name == key else "")
+            for name, sql_type in columns.items()
+        )
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ({definitions})"
+        )
+        for index_columns in indexes:
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS "
+                f"{table}_{'_'.join(index_columns)}_idx "
+                f"ON {table} ({', '.join(index_columns)})"
+            )
+
+        column_list = ", ".join(self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        self._sql = {
+            "select_all": f"SELECT {column_list} FROM {table} ORDER BY rowid",
+            "select_one": f"SELECT {column_list} FROM {table} "
+                          f"WHERE {key} = ?",
+            "count": f"SELECT COUNT(*) FROM {table}",
+            "upsert": f"INSERT OR REPLACE INTO {table} ({column_list}) "
+                      f"VALUES ({placeholders})",
+            "delete": f"DELETE FROM {table} WHERE {key} = ?",
+            "delete_all": f"DELETE FROM {table}",
+        }
+
+    def _row(self, record: dict) -> tuple:
+        """
+        Returns the column values of a record in table order.
+        """
+        return tuple(record.get(name) for name in self.columns)
+
+    def _record(self, row: tuple) -> dict:
+        """
+        Returns a record dictionary for a table row.
+        """
+        return dict(zip(self.columns, row))
+
+    def iter_records(
+            self, progress: Optional[ProgressCallback] = None
+            ) -> Iterator[dict]:
+        """
+        Yields every row as a record.
+
+        :param progress: Called as progress(rows_read, total_rows)
+        """
+        with self._lock:
+            self._loaded_version = self._data_version()
+            total = self._connection.execute(self._sql["count"]).fetchone()[0]
+            cursor = self._connection.execute(self._sql["select_all"])
+        done = 0
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield self._record(row)
+            done += len(rows)
+            if progress is not None:
+                progress(done, total)
+
+    def has_changed(self) -> bool:
+        """
+        Returns whether another connection committed since the table was
+        last read. Commits made through this storage do not count.
+        """
+        with self._lock:
+            return self._data_version() != self._loaded_version
+
+    def _data_version(self) -> int:
+        """
+        Returns SQLite's data_version counter. Must be called with the
+        lock held.
+        """
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the record stored under key, or None.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                self._sql["select_one"], (key,)
+            ).fetchone()
+        return None if row is None else self._record(row)
+
+    def save(self, records: Iterable[dict]) -> None:
+        """
+        Replaces every row with the given records in one transaction.
+        """
+        rows = [self._row(record) for record in records]
+
+        def replace(cursor: sqlite3.Cursor) -> None:
+            cursor.execute(self._sql["delete_all"])
+            cursor.executemany(self._sql["upsert"], rows)
+
+        with self._lock:
+            self._transaction(replace)
+
+    def write_many(
+            self, changes: List[Change],
+            snapshot: Callable[[], Iterable[dict]]
+            ) -> None:
+        """
+        Applies the changes row by row in one transaction.
+        """
+        # pylint: disable=unused-argument
+        if not changes:
+            return
+
+        def apply(cursor: sqlite3.Cursor) -> None:
+            for op, key, record in changes:
+                if op == PUT:
+                    cursor.execute(self._sql["upsert"], self._row(record))
+                elif op == DELETE:
+                    cursor.execute(self._sql["delete"], (key,))
+                else:
+                    raise ValueError(f"Unknown storage op {op!r}.")
+
+        with self._lock:
+            self._transaction(apply)
+
+    def _transaction(self, body: Callable[[sqlite3.Cursor], None]) -> None:
+        """
+        Runs body inside BEGIN/COMMIT, rolling back if it raises.
+        Must be called with the lock held.
+        """
+        cursor = self._connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            body(cursor)
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def hotel_storage(path: str) -> SQLiteStorage:
+    """
+    Returns a SQLiteStorage for HotelManager.
+    """
+    return SQLiteStorage(path, "hotels", "hotel_id", HOTEL_COLUMNS)
+
+
+def customer_storage(path: str) -> SQLiteStorage:
+    """
+    Returns a SQLiteStorage for CustomerManager.
+    """
+    return SQLiteStorage(path, "customers", "customer_id", CUSTOMER_COLUMNS)
+
+
+def reservation_storage(path: str) -> SQLiteStorage:
+    """
+    Returns a SQLiteStorage for ReservationManager, with indexes on the
+    columns the manager queries by.
+    """
+    return SQLiteStorage(
+        path, "reservations", "reservation_id", RESERVATION_COLUMNS,
+        RESERVATION_INDEXES
+    )
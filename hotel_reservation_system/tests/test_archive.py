@@ -0,0 +1,126 @@
+"""
+Unit tests for the reservation archive and the archive job.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import date, timedelta
+from managers.reservation_manager import ReservationManager
+from services.archiver import ReservationArchiver
+from storage.archive import ReservationArchive
+from storage.json_storage import JsonFileStorage
+
+
+def _record(number, check_out, hotel_id="H1"):
+    """Returns a two-night reservation checking out on check_out."""
+    check_out = date.fromisoformat(check_out)
+    return {
+        "reservation_id": f"R{number}", "customer_id": f"C{number % 2}",
+        "hotel_id": hotel_id, "room_number": number,
+        "check_in": (check_out - timedelta(days=2)).isoformat(),
+        "check_out": check_out.isoformat()
+    }
+
+
+class TestReservationArchive(unittest.TestCase):
+    """Tests for ReservationArchive and ReservationArchiver."""
+
+    def setUp(self):
+        """Create a manager and an archive in a temporary directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.storage = JsonFileStorage(
+            os.path.join(self.tmp_dir, "reservations.json"),
+            "reservation_id"
+        )
+        self.manager = ReservationManager(self.storage)
+        self.archive = ReservationArchive(
+            os.path.join(self.tmp_dir, "archive.jsonl.gz")
+        )
+        self.archiver = ReservationArchiver(
+            self.manager, self.archive, timedelta(days=30),
+            today=lambda: date(2025, 6, 30)
+        )
+        self.manager.create_many([
+            _record(1, "2025-04-01"), _record(2, "2025-05-30"),
+            _record(3, "2025-05-31", "H2"), _record(4, "2025-07-01"),
+        ])
+
+    def tearDown(self):
+        """Stop the job and remove the temporary directory."""
+        self.archiver.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_run_moves_past_reservations(self):
+        """Test that only stays past the horizon leave the manager."""
+        self.assertEqual(self.archiver.run(), 2)
+        self.assertEqual(
+            sorted(r.reservation_id for r in self.manager.reservations),
+            ["R3", "R4"]
+        )
+        self.assertEqual(
+            sorted(r.reservation_id
+                   for r in ReservationManager(self.storage).reservations),
+            ["R3", "R4"]
+        )
+        self.assertIsNone(self.manager.get_reservation_by_id("R1"))
+        self.assertEqual(
+            self.manager.get_reservations_checking_out("2025-01-01",
+                                                       "2026-01-01"),
+            [self.manager.get_reservation_by_id("R3"),
+             self.manager.get_reservation_by_id("R4")]
+        )
+        # The room is free again once its stay is archived.
+        self.assertTrue(self.manager.is_room_available(
+            "H1", 1, "2025-03-30", "2025-04-01"))
+        self.assertEqual(self.archiver.run(), 0)
+
+    def test_history_queries_the_archive(self):
+        """Test the on-demand filters over archived reservations."""
+        self.archiver.run()
+        self.archiver.today = lambda: date(2025, 7, 25)
+        self.archiver.run()
+        self.assertEqual(
+            [r.reservation_id for r in self.archiver.history()],
+            ["R1", "R2", "R3"]
+        )
+        self.assertEqual(
+            [r.reservation_id
+             for r in self.archiver.history(customer_id="C1")],
+            ["R1", "R3"]
+        )
+        self.assertEqual(
+            [r.reservation_id for r in self.archiver.history(
+                hotel_id="H1", start="2025-05-01", end="2025-06-01")],
+            ["R2"]
+        )
+        self.assertEqual(self.archive.get("R2")["room_number"], 2)
+        self.assertIsNone(self.archive.get("R4"))
+
+    def test_duplicates_and_damaged_tail(self):
+        """Test re-archived duplicates and a damaged archive tail."""
+        self.archive.append([_record(1, "2025-04-01")])
+        self.archiver.run()
+        self.assertEqual(len(self.archive.query()), 2)
+        with open(self.archive.path, "ab") as file:
+            file.write(b"\x1f\x8b\x08\x00garbage")
+        with self.assertLogs("storage.archive", "ERROR"):
+            self.assertEqual(len(self.archive.query()), 2)
+
+    def test_scheduled_job(self):
+        """Test that start() runs the job in the background."""
+        self.archiver.start(interval=0.01)
+        with self.assertRaises(RuntimeError):
+            self.archiver.start()
+        deadline = time.monotonic() + 5
+        while len(self.manager.reservations) > 2:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.archiver.stop()
+        self.assertEqual(len(self.archive.query()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Unit tests for the asyncio managers and the buffered storage.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from managers.async_managers import (
+    AsyncHotelManager, AsyncReservationManager
+)
+from managers.customer_manager import CustomerManager
+from managers.persistence import PersistencePolicy
+from storage.base import DELETE, PUT
+from storage.buffered import BufferedStorage
+from storage.json_storage import JsonFileStorage
+
+
+class TestBufferedStorage(unittest.TestCase):
+    """Tests for BufferedStorage functionalities."""
+
+    def setUp(self):
+        """Create a temporary data file with one record."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.inner = JsonFileStorage(
+            os.path.join(self.tmp_dir, "hotels.json"), "hotel_id"
+        )
+        self.inner.save([{"hotel_id": "H1", "v": 1}])
+        self.storage = BufferedStorage(self.inner)
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_queued_changes_are_visible_before_flush(self):
+        """Test that reads apply the queued changes."""
+        self.storage.write(PUT, "H2", {"hotel_id": "H2", "v": 1}, list)
+        self.storage.write(DELETE, "H1", None, list)
+        self.assertEqual(self.storage.load(), [{"hotel_id": "H2", "v": 1}])
+        self.assertIsNone(self.storage.get("H1"))
+        self.assertEqual(self.inner.load(), [{"hotel_id": "H1", "v": 1}])
+
+    def test_flush_coalesces_into_one_write(self):
+        """Test that queued changes reach the storage in one write."""
+        current = [{"hotel_id": "H1", "v": 3}]
+        with patch.object(self.inner, "write_many",
+                          wraps=self.inner.write_many) as write_many:
+            self.storage.write(PUT, "H1", {"hotel_id": "H1", "v": 2}, list)
+            self.storage.write(PUT, "H1", current[0], lambda: current)
+            self.storage.flush()
+        write_many.assert_called_once()
+        self.assertEqual(len(write_many.call_args[0][0]), 1)
+        self.assertEqual(self.storage.pending, 0)
+        self.assertEqual(self.inner.load(), current)
+
+    def test_failed_flush_keeps_changes_queued(self):
+        """Test that a failed flush is retried by the next one."""
+        current = [{"hotel_id": "H1", "v": 1}, {"hotel_id": "H2"}]
+        self.storage.write(PUT, "H2", current[1], lambda: current)
+        with patch.object(self.inner, "write_many",
+                          side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.storage.flush()
+        self.assertEqual(self.storage.pending, 1)
+        self.storage.flush()
+        self.assertIsNotNone(self.inner.get("H2"))
+
+    def test_key_is_required(self):
+        """Test that a storage without a key needs an explicit one."""
+        keyless = JsonFileStorage(os.path.join(self.tmp_dir, "c.json"))
+        with self.assertRaises(ValueError):
+            BufferedStorage(keyless)
+        manager = CustomerManager(keyless, PersistencePolicy.manual())
+        manager.create_customer("C1", "Ana", "555")
+        manager.modify_customer_information("C1", name="Eva")
+        self.assertEqual(list(manager.storage.iter_records()),
+                         [{"customer_id": "C1", "name": "Eva",
+                           "phone": "555"}])
+        manager.flush()
+        self.assertEqual(len(keyless.load()), 1)
+
+
+class TestAsyncManagers(unittest.IsolatedAsyncioTestCase):
+    """Tests for the asyncio managers."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _storage(self, name, key):
+        """Returns a JSON storage in the temporary directory."""
+        return JsonFileStorage(os.path.join(self.tmp_dir, name), key)
+
+    async def test_concurrent_creates_share_one_write(self):
+        """Test that concurrent callers are flushed by a single write."""
+        storage = self._storage("hotels.json", "hotel_id")
+        manager = await AsyncHotelManager.open(storage, flush_interval=0.05)
+        with patch.object(storage, "write_many",
+                          wraps=storage.write_many) as write_many:
+            await asyncio.gather(*(
+                manager.create_hotel(f"H{i}", "Hotel", "City", 10)
+                for i in range(50)
+            ))
+        write_many.assert_called_once()
+        self.assertEqual(len(storage.load()), 50)
+        await manager.close()
+
+    async def test_open_loads_in_worker_thread(self):
+        """Test that open() returns a manager that is already loaded."""
+        storage = self._storage("hotels.json", "hotel_id")
+        storage.save([{"hotel_id": "H1", "name": "Hotel", "location": "City",
+                       "total_rooms": 10}])
+        manager = await AsyncHotelManager.open(storage)
+        with patch.object(storage, "iter_records") as iter_records:
+            self.assertEqual(manager.manager.get_hotel_by_id("H1").name,
+                             "Hotel")
+            await manager.create_hotel("H2", "Hotel", "City", 10)
+            iter_records.assert_not_called()
+        await manager.close()
+
+    async def test_non_durable_returns_before_write(self):
+        """Test that durable=False only writes on flush."""
+        storage = self._storage("hotels.json", "hotel_id")
+        manager = AsyncHotelManager(storage, flush_interval=10,
+                                    durable=False)
+        await manager.create_hotel("H1", "Hotel", "City", 10)
+        self.assertEqual(storage.load(), [])
+        await manager.flush()
+        self.assertEqual(len(storage.load()), 1)
+        await manager.close()
+
+    async def test_failed_write_reaches_callers(self):
+        """Test that a failed group commit is raised to its callers."""
+        storage = self._storage("hotels.json", "hotel_id")
+        manager = AsyncHotelManager(storage)
+        with patch.object(storage, "write_many",
+                          side_effect=OSError("disk full")):
+            with self.assertLogs("managers.async_managers", "ERROR"):
+                with self.assertRaises(OSError):
+                    await manager.create_hotel("H1", "Hotel", "City", 10)
+        await manager.close()
+        self.assertEqual(len(storage.load()), 1)
+
+    async def test_reservation_conflicts_are_raised(self):
+        """Test that overlapping bookings fail without a write."""
+        storage = self._storage("reservations.json", "reservation_id")
+        manager = AsyncReservationManager(storage)
+        booking = {"reservation_id": "R1", "customer_id": "C1",
+                   "hotel_id": "H1", "room_number": 1,
+                   "check_in": "2025-01-01", "check_out": "2025-01-03"}
+        await manager.create_reservation(booking)
+        with self.assertRaises(ValueError):
+            await manager.create_reservation(
+                dict(booking, reservation_id="R2")
+            )
+        self.assertTrue(await manager.cancel_reservation("R1"))
+        await manager.close()
+        self.assertEqual(storage.load(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Smoke tests for the benchmark suite.
+"""
+
+import unittest
+from benchmarks import cache
+from benchmarks.managers import compare, parse_scale, run
+
+
+class TestManagerBenchmarks(unittest.TestCase):
+    """Tests for the manager benchmark runner."""
+
+    def test_parse_scale(self):
+        """Test record counts with and without suffixes."""
+        self.assertEqual(parse_scale("1k"), 1_000)
+        self.assertEqual(parse_scale("1M"), 1_000_000)
+        self.assertEqual(parse_scale("250"), 250)
+
+    def test_run_reports_every_operation(self):
+        """Test that a tiny run measures each operation of each manager."""
+        for backend in ("json", "sqlite"):
+            results = run([20], backend, ops=3, budget=None)
+            self.assertIn("revision", results["environment"])
+            self.assertEqual(
+                {(row["manager"], row["operation"])
+                 for row in results["results"]},
+                {(manager, operation)
+                 for manager in ("hotel", "customer", "reservation")
+                 for operation in ("load", "lookup", "save", "create",
+                                   "delete")}
+            )
+            for row in results["results"]:
+                self.assertGreater(row["ops"], 0)
+                self.assertEqual(row["backend"], backend)
+
+    def test_compare_flags_regressions(self):
+        """Test that only drops beyond the tolerance are reported."""
+        def results(rate):
+            return {"results": [{
+                "manager": "hotel", "operation": "load", "scale": 10,
+                "backend": "json", "ops_per_second": rate
+            }]}
+
+        self.assertEqual(compare(results(90), results(100), 0.2), [])
+        self.assertEqual(len(compare(results(70), results(100), 0.2)), 1)
+
+
+class TestCacheBenchmark(unittest.TestCase):
+    """Tests for the cache benchmark runner."""
+
+    def test_cache_saves_backend_reads(self):
+        """Test that the cached run reads the backend less often."""
+        results = cache.run(hotels=50, lookups=200, latency=0,
+                            max_entries=10)
+        self.assertEqual(results["uncached"]["backend_reads"], 200)
+        self.assertLess(results["cached"]["backend_reads"], 200)
+        self.assertGreater(results["cached"]["hit_ratio"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Unit tests for the BookingService class.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from services.booking_service import BookingService
+from storage.json_storage import JsonFileStorage
+
+
+def _booking(reservation_id, customer_id="C1", hotel_id="H1", room=1):
+    """Returns the data of a two-night reservation."""
+    return {
+        "reservation_id": reservation_id, "customer_id": customer_id,
+        "hotel_id": hotel_id, "room_number": room,
+        "check_in": "2025-05-01", "check_out": "2025-05-03"
+    }
+
+
+class TestBookingService(unittest.TestCase):
+    """Tests for BookingService functionalities."""
+
+    def setUp(self):
+        """Create managers over a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.hotels = HotelManager(JsonFileStorage(
+            os.path.join(self.tmp_dir, "hotels.json"), "hotel_id"))
+        self.customers = CustomerManager(JsonFileStorage(
+            os.path.join(self.tmp_dir, "customers.json"), "customer_id"))
+        self.reservations = ReservationManager(JsonFileStorage(
+            os.path.join(self.tmp_dir, "reservations.json"),
+            "reservation_id"))
+        self.hotels.create_hotel("H1", "Hotel", "City", 10)
+        self.customers.create_customer("C1", "Ana", "555-0100")
+        self.service = BookingService(
+            self.hotels, self.customers, self.reservations
+        )
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_book(self):
+        """Test booking a reservation with valid references."""
+        reservation = self.service.book(_booking("R1"))
+        self.assertEqual(reservation.hotel_id, "H1")
+        self.assertIs(self.reservations.get_reservation_by_id("R1"),
+                      reservation)
+
+    def test_book_rejects_invalid_references(self):
+        """Test that unknown customers, hotels and rooms are refused."""
+        for data in (_booking("R1", customer_id="NonExistent"),
+                     _booking("R2", hotel_id="NonExistent"),
+                     _booking("R3", room=11),
+                     _booking("R4", room=0)):
+            with self.assertRaises(ValueError):
+                self.service.book(data)
+        self.assertEqual(self.reservations.reservations, [])
+
+    def test_book_normalizes_room_number(self):
+        """Test that room "2" is booked as room 2, in both entry points."""
+        wrapped = self.reservations.create_reservation
+        with patch.object(self.reservations, "create_reservation",
+                          wraps=wrapped) as create:
+            self.service.book(_booking("R1", room="2"))
+        self.assertEqual(create.call_args[0][0], _booking("R1", room=2))
+        with self.assertRaises(ValueError):
+            self.service.book(_booking("R2", room=2))
+        with self.assertRaises((ValueError, TypeError)):
+            self.service.book(_booking("R3", room=1.5))
+        with patch.object(self.reservations, "create_many",
+                          wraps=self.reservations.create_many) as create:
+            result = self.service.book_many([_booking("R4", room="3"),
+                                             _booking("R5", room=3)])
+        self.assertEqual([item["room_number"]
+                          for item in create.call_args[0][0]], [3, 3])
+        self.assertEqual([res.room_number for res in result.succeeded], [3])
+        self.assertEqual([item["reservation_id"]
+                          for item, _ in result.failed], ["R5"])
+        self.assertEqual(
+            [record["room_number"]
+             for record in self.reservations.storage.load()], [2, 3]
+        )
+
+    def test_book_many(self):
+        """Test that a batch books the valid items and skips the rest."""
+        result = self.service.book_many([
+            _booking("R1"), _booking("R2", room=2),
+            _booking("R3", hotel_id="H9"), _booking("R4")
+        ])
+        self.assertEqual(
+            [res.reservation_id for res in result.succeeded], ["R1", "R2"]
+        )
+        self.assertEqual([item["reservation_id"]
+                          for item, _ in result.failed], ["R3", "R4"])
+
+    def test_delete_hotel_restricted(self):
+        """Test that a hotel with reservations is not deleted."""
+        self.service.book(_booking("R1"))
+        with self.assertRaises(ValueError):
+            self.service.delete_hotel("H1")
+        self.assertIsNotNone(self.hotels.get_hotel_by_id("H1"))
+        self.assertFalse(self.service.delete_hotel("H9"))
+
+    def test_delete_cascades(self):
+        """Test that cascading deletes cancel the dependents only."""
+        self.customers.create_customer("C2", "Luis", "555-0101")
+        self.service.book(_booking("R1"))
+        self.service.book(_booking("R2", customer_id="C2", room=2))
+        self.assertTrue(self.service.delete_customer("C1", cascade=True))
+        self.assertIsNone(self.reservations.get_reservation_by_id("R1"))
+        self.assertIsNotNone(self.reservations.get_reservation_by_id("R2"))
+        self.service.cascade = True
+        self.assertTrue(self.service.delete_hotel("H1"))
+        self.assertEqual(self.reservations.reservations, [])
+
+    def test_modify_hotel_keeps_booked_rooms(self):
+        """Test that total_rooms cannot drop below a booked room."""
+        self.service.book(_booking("R1", room=8))
+        with self.assertRaises(ValueError):
+            self.service.modify_hotel_information("H1", total_rooms=5)
+        self.assertTrue(
+            self.service.modify_hotel_information("H1", total_rooms=8)
+        )
+
+    def test_concurrent_bookings(self):
+        """Test that bookings from several threads all succeed."""
+        def book(number):
+            self.service.book(_booking(f"R{number}", room=number))
+
+        threads = [threading.Thread(target=book, args=(number,))
+                   for number in range(1, 11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.reservations.reservations), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
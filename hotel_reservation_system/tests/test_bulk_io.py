@@ -0,0 +1,122 @@
+"""
+Unit tests for the bulk import and export pipeline.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from services.bulk_io import export_records, import_records, parse_file
+from storage.json_storage import JsonFileStorage
+
+
+class TestBulkIO(unittest.TestCase):
+    """Tests for import_records and export_records."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _path(self, name, text=None):
+        """Returns a path in the directory, writing text to it if given."""
+        path = os.path.join(self.tmp_dir, name)
+        if text is not None:
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.write(text)
+        return path
+
+    def _storage(self, name, key):
+        """Returns a JSON storage in the temporary directory."""
+        return JsonFileStorage(self._path(name), key)
+
+    def test_import_csv_in_worker_processes(self):
+        """Test a chunked CSV import with coercion and quoted newlines."""
+        rows = ["hotel_id,name,location,total_rooms\r\n"]
+        rows += [f"H{number},Hotel {number},City,{number + 1}\r\n"
+                 for number in range(10)]
+        rows.append('H10,"Two\r\nLines, ""quoted""",City,5\r\n')
+        rows.append("H11,Broken,City,many\r\n")
+        rows.append("H0,Duplicate,City,3\r\n")
+        path = self._path("hotels.csv", "".join(rows))
+        manager = HotelManager(self._storage("hotels.json", "hotel_id"))
+
+        with patch("builtins.print"), patch.object(
+                manager.storage, "write_many",
+                wraps=manager.storage.write_many) as write_many:
+            result = import_records(manager, path, workers=2, chunk_size=3)
+        write_many.assert_called_once()
+
+        self.assertEqual(len(result.succeeded), 11)
+        self.assertEqual(manager.get_hotel_by_id("H3").total_rooms, 4)
+        self.assertEqual(manager.get_hotel_by_id("H10").name,
+                         'Two\r\nLines, "quoted"')
+        self.assertEqual(result.failed[0][0], f"{path}:14")
+        self.assertIn("many", str(result.failed[0][1]))
+        self.assertEqual(result.failed[1][0]["name"], "Duplicate")
+
+    def test_import_jsonl_reservations(self):
+        """Test that reservation rules are applied while parsing."""
+        lines = [
+            {"reservation_id": "R1", "customer_id": "C1", "hotel_id": "H1",
+             "room_number": "1", "check_in": "2025-05-01",
+             "check_out": "2025-05-03"},
+            {"reservation_id": "R2", "customer_id": "C1", "hotel_id": "H1",
+             "room_number": 2, "check_in": "2025-05-03",
+             "check_out": "2025-05-01"},
+            [1, 2],
+        ]
+        path = self._path("reservations.jsonl", "\n".join(
+            json.dumps(line) for line in lines) + "\n\nnot json\n")
+        manager = ReservationManager(
+            self._storage("reservations.json", "reservation_id"))
+
+        result = import_records(manager, path, workers=1)
+        self.assertEqual([r.reservation_id for r in result.succeeded],
+                         ["R1"])
+        self.assertEqual(manager.get_reservation_by_id("R1").room_number, 1)
+        self.assertEqual([item for item, _ in result.failed],
+                         [f"{path}:2", f"{path}:3", f"{path}:5"])
+
+    def test_parse_file_keeps_order(self):
+        """Test that chunks come back in file order from the pool."""
+        path = self._path("customers.jsonl", "".join(
+            json.dumps({"customer_id": f"C{number}", "name": "N",
+                        "phone": "1"}) + "\n"
+            for number in range(50)
+        ))
+        ids = [record["customer_id"]
+               for records, _ in parse_file(path, "customer", 3, 4)
+               for record in records]
+        self.assertEqual(ids, [f"C{number}" for number in range(50)])
+        with self.assertRaises(ValueError):
+            list(parse_file(self._path("customers.xml", ""), "customer"))
+
+    def test_export_round_trip(self):
+        """Test that an export imports back into an empty manager."""
+        manager = CustomerManager(
+            self._storage("customers.json", "customer_id"))
+        manager.create_many({"customer_id": f"C{number}", "name": "Ana",
+                             "phone": f"555-{number}"}
+                            for number in range(25))
+        path = self._path("customers.jsonl")
+        self.assertEqual(export_records(manager, path, buffer_records=10),
+                         25)
+
+        copy = CustomerManager(self._storage("copy.json", "customer_id"))
+        result = import_records(copy, path, workers=2, chunk_size=10)
+        self.assertTrue(result.ok)
+        self.assertEqual([c.to_dict() for c in copy.customers],
+                         [c.to_dict() for c in manager.customers])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Unit tests for the read-through CachedStorage and manager point reads.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.persistence import PersistencePolicy
+from storage.base import DELETE, PUT
+from storage.cached import CachedStorage
+from storage.json_storage import JsonFileStorage
+from storage.sqlite_storage import customer_storage, hotel_storage
+
+
+def _hotel(number, rooms=10):
+    """Returns a hotel record."""
+    return {"hotel_id": f"H{number}", "name": f"Hotel {number}",
+            "location": "Cancun", "total_rooms": rooms}
+
+
+class TestCachedStorage(unittest.TestCase):
+    """Tests for CachedStorage functionalities."""
+
+    def setUp(self):
+        """Create a SQLite backend holding three hotels."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.backend = hotel_storage(os.path.join(self.tmp_dir, "h.db"))
+        self.backend.save(_hotel(number) for number in range(3))
+        # Time seen by the cache, advanced by hand.
+        self.now = 0.0
+        self.cache = CachedStorage(self.backend, max_entries=2, ttl=10,
+                                   clock=lambda: self.now)
+
+    def tearDown(self):
+        """Close the storage and remove the temporary directory."""
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lru_eviction_and_stats(self):
+        """Test hits, misses and least-recently-used eviction."""
+        with patch.object(self.backend, "get",
+                          wraps=self.backend.get) as get:
+            self.cache.get("H0")
+            self.cache.get("H1")
+            self.cache.get("H0")
+            self.cache.get("H2")  # evicts H1, the least recently used
+            self.cache.get("H0")
+            self.cache.get("H1")
+            self.assertEqual(get.call_count, 4)
+        stats = self.cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions,
+                          stats.size), (2, 4, 2, 2))
+        self.assertAlmostEqual(stats.hit_ratio, 2 / 6)
+
+    def test_ttl_and_absent_records(self):
+        """Test that entries expire and that misses are cached too."""
+        self.assertIsNone(self.cache.get("H9"))
+        self.assertIsNone(self.cache.get("H9"))
+        self.assertEqual(self.cache.stats().hits, 1)
+        self.backend.save([_hotel(9)])
+        self.assertIsNone(self.cache.get("H9"))
+        self.now = 11
+        self.assertEqual(self.cache.get("H9")["name"], "Hotel 9")
+        self.assertEqual(self.cache.stats().expirations, 1)
+
+    def test_write_through(self):
+        """Test that writes update or invalidate the cached entries."""
+        self.cache.get("H0")
+        self.cache.get("H1")
+        self.cache.write_many([(PUT, "H0", _hotel(0, rooms=99)),
+                               (DELETE, "H1", None)], list)
+        self.assertEqual(self.cache.get("H0")["total_rooms"], 99)
+        self.assertIsNone(self.cache.get("H1"))
+        self.assertIsNone(self.backend.get("H1"))
+        self.assertEqual(self.cache.stats().misses, 2)
+
+        # Returned records are copies.
+        self.cache.get("H0")["total_rooms"] = 1
+        self.assertEqual(self.cache.get("H0")["total_rooms"], 99)
+
+        self.cache.save([_hotel(5)])
+        self.assertEqual(self.cache.stats().size, 0)
+        self.assertIsNone(self.cache.get("H0"))
+
+    def test_managers_read_through_the_cache(self):
+        """Test manager lookups without loading, then invalidation."""
+        reader = HotelManager(self.cache)
+        writer = HotelManager(self.cache)
+        with patch.object(self.backend, "iter_records") as iter_records:
+            self.assertEqual(reader.get_hotel_by_id("H1").total_rooms, 10)
+            self.assertEqual(reader.get_hotel_by_id("H1").total_rooms, 10)
+            self.assertIsNone(reader.get_hotel_by_id("H7"))
+            iter_records.assert_not_called()
+        self.assertEqual(self.cache.stats().hits, 1)
+
+        writer.modify_hotel_information("H1", total_rooms=20)
+        self.assertEqual(reader.get_hotel_by_id("H1").total_rooms, 20)
+        writer.delete_hotel("H1")
+        self.assertIsNone(reader.get_hotel_by_id("H1"))
+
+    def test_point_reads_follow_the_wrapped_storage(self):
+        """Test that a cached JSON file is loaded, not scanned per miss."""
+        self.assertTrue(self.cache.point_reads)
+        storage = JsonFileStorage(os.path.join(self.tmp_dir, "h.json"),
+                                  "hotel_id")
+        storage.save([_hotel(1)])
+        cache = CachedStorage(storage)
+        self.assertFalse(cache.point_reads)
+        manager = HotelManager(cache)
+        with patch.object(storage, "get") as get:
+            self.assertEqual(manager.get_hotel_by_id("H1").name, "Hotel 1")
+            self.assertIsNone(manager.get_hotel_by_id("H2"))
+            get.assert_not_called()
+
+    def test_customer_lookups_through_buffered_policy(self):
+        """Test point reads through a debounced manager's buffer."""
+        backend = customer_storage(os.path.join(self.tmp_dir, "c.db"))
+        backend.save([{"customer_id": "C1", "name": "Ana",
+                       "phone": "555"}])
+        manager = CustomerManager(
+            CachedStorage(backend), PersistencePolicy.manual()
+        )
+        self.assertTrue(manager.storage.point_reads)
+        self.assertEqual(manager.get_customer_by_id("C1").name, "Ana")
+        manager.storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Concurrency stress tests for the managers.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from managers.customer_manager import CustomerManager
+from managers.reservation_manager import ReservationManager
+from storage.base import PUT, Storage
+from storage.json_storage import JsonFileStorage
+
+WRITE_DELAY = 0.005
+
+
+class SlowStorage(Storage):
+    """
+    In-memory storage whose writes take WRITE_DELAY seconds and may run
+    concurrently, like a remote database. It records how many writes
+    overlapped, and with a barrier each write waits for other writers.
+    """
+
+    def __init__(self, barrier=None):
+        self.records = {}
+        self.barrier = barrier
+        self.writing = 0
+        self.max_writing = 0
+        self._lock = threading.Lock()
+
+    def iter_records(self, progress=None):
+        with self._lock:
+            return iter(list(self.records.values()))
+
+    def get(self, key):
+        with self._lock:
+            return self.records.get(key)
+
+    def save(self, records):
+        time.sleep(WRITE_DELAY)
+        with self._lock:
+            self.records = {r["reservation_id"]: r for r in records}
+
+    def write_many(self, changes, snapshot):
+        with self._lock:
+            self.writing += 1
+            self.max_writing = max(self.max_writing, self.writing)
+        if self.barrier is not None:
+            self.barrier.wait()
+        time.sleep(WRITE_DELAY)
+        with self._lock:
+            self.writing -= 1
+            for op, key, record in changes:
+                if op == PUT:
+                    self.records[key] = record
+                else:
+                    self.records.pop(key, None)
+
+
+def _reservation(reservation_id, hotel_id, room_number, day):
+    """Builds reservation data for a one-night stay in January."""
+    return {
+        "reservation_id": reservation_id,
+        "customer_id": "C1",
+        "hotel_id": hotel_id,
+        "room_number": room_number,
+        "check_in": f"2025-01-{day:02d}",
+        "check_out": f"2025-01-{day + 1:02d}",
+    }
+
+
+class TestConcurrentReservations(unittest.TestCase):
+    """Stress tests for ReservationManager under concurrent use."""
+
+    def test_no_double_booking(self):
+        """Test that only one of many racing bookings of a room wins."""
+        storage = SlowStorage()
+        manager = ReservationManager(storage=storage)
+
+        def book(index):
+            try:
+                manager.create_reservation(
+                    _reservation(f"R{index}", "H1", 1, 10))
+                return True
+            except ValueError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(book, range(32)))
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(len(storage.records), 1)
+
+    def test_concurrent_create_and_cancel(self):
+        """Test that indexes and storage agree after mixed traffic."""
+        storage = SlowStorage()
+        manager = ReservationManager(storage=storage)
+
+        def work(hotel):
+            for day in range(1, 21):
+                manager.create_reservation(
+                    _reservation(f"R{hotel}-{day}", f"H{hotel}", 1, day))
+            for day in range(1, 21, 2):
+                manager.cancel_reservation(f"R{hotel}-{day}")
+            manager.create_many([
+                _reservation(f"B{hotel}-{day}", f"H{hotel}", 2, day)
+                for day in range(1, 11)
+            ])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(8)))
+        self.assertEqual(len(manager.reservations), 8 * 20)
+        self.assertEqual(set(storage.records),
+                         {r.reservation_id for r in manager.reservations})
+        self.assertEqual(len(manager.get_reservations_by_hotel("H3")), 20)
+
+    def _book_hotels(self, storage, per_hotel_locks, hotels):
+        """Books 10 nights of room 1 in each hotel, one thread each."""
+        manager = ReservationManager(
+            storage=storage, per_hotel_locks=per_hotel_locks
+        )
+
+        def book(hotel):
+            for day in range(1, 11):
+                manager.create_reservation(
+                    _reservation(f"R{hotel}-{day}", f"H{hotel}", 1, day))
+
+        with ThreadPoolExecutor(max_workers=hotels) as pool:
+            list(pool.map(book, range(hotels)))
+        self.assertEqual(len(manager.reservations), 10 * hotels)
+
+    def test_hotels_persist_in_parallel(self):
+        """Test that writes for different hotels overlap."""
+        # Each write waits for one of the other hotel; a lock held
+        # across both writes would break the barrier.
+        storage = SlowStorage(threading.Barrier(2, timeout=5))
+        self._book_hotels(storage, per_hotel_locks=True, hotels=2)
+        self.assertEqual(storage.max_writing, 2)
+
+    def test_global_lock_serializes_writes(self):
+        """Test that per_hotel_locks=False never overlaps writes."""
+        storage = SlowStorage()
+        self._book_hotels(storage, per_hotel_locks=False, hotels=4)
+        self.assertEqual(storage.max_writing, 1)
+
+
+class TestConcurrentCustomers(unittest.TestCase):
+    """Stress tests for CustomerManager under concurrent use."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "customers.json")
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_concurrent_creates_reach_the_file(self):
+        """Test that no concurrent create is lost on disk."""
+        manager = CustomerManager(
+            storage=JsonFileStorage(self.path, "customer_id"))
+
+        def create(index):
+            manager.create_customer(f"C{index}", "Name", str(index))
+            manager.modify_customer_information(f"C{index}", name="New")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(create, range(100)))
+        reloaded = CustomerManager(
+            storage=JsonFileStorage(self.path, "customer_id"))
+        self.assertEqual(len(reloaded.customers), 100)
+        self.assertTrue(all(c.name == "New" for c in reloaded.customers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,10 @@
 Unit tests for the ReservationManager class.
 """
 
+import json
 import unittest
 import os
+from unittest.mock import patch
 from managers.customer_manager import CustomerManager, CUSTOMER_DATA_FILE
 
 TEST_CUSTOMER_FILE = "test_customers.json"
@@ -88,6 +90,57 @@ class TestCustomerManager(unittest.TestCase):
         """Test deleting a non-existent customer should return False."""
         self.assertFalse(self.manager.delete_customer("FakeID"))
 
+    def test_load_skips_duplicate_ids(self):
+        """Test that duplicate customer IDs in the data file are skipped."""
+        with open(CUSTOMER_DATA_FILE, 'w', encoding='utf-8') as f:
+            json.dump([
+                {"customer_id": "C1", "name": "A", "phone": "1"},
+                {"customer_id": "C1", "name": "B", "phone": "2"},
+            ], f)
+        self.manager.load_customers()
+        self.assertEqual(len(self.manager.customers), 1)
+        self.assertEqual(self.manager.get_customer_by_id("C1").name, "A")
+
+    def test_bulk_operations(self):
+        """Test bulk creation, modification and deletion."""
+        with patch.object(self.manager.storage, "save",
+                          wraps=self.manager.storage.save) as save:
+            result = self.manager.create_many([
+                {"customer_id": "C1", "name": "A", "phone": "1"},
+                {"customer_id": "C2", "name": "B"},
+                {"customer_id": "C3", "name": "C", "phone": "3"},
+            ])
+        save.assert_called_once()
+        self.assertEqual(len(result.succeeded), 2)
+        self.assertEqual(len(result.failed), 1)
+
+        result = self.manager.modify_many({"C1": {"phone": "9"},
+                                           "C9": {"phone": "0"}})
+        self.assertEqual(len(result.failed), 1)
+        self.assertEqual(self.manager.get_customer_by_id("C1").phone, "9")
+
+        result = self.manager.delete_many(["C3"])
+        self.assertTrue(result.ok)
+        self.assertEqual(
+            [c.to_dict() for c in CustomerManager().customers],
+            [{"customer_id": "C1", "name": "A", "phone": "9"}]
+        )
+
+    def test_failed_write_rolls_back(self):
+        """Test that a failed write leaves the customers unchanged."""
+        self.manager.create_customer("C1", "A", "1")
+        with patch.object(self.manager.storage, "write",
+                          side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager.create_customer("C2", "B", "2")
+            with self.assertRaises(OSError):
+                self.manager.modify_customer_information("C1", phone="9")
+            with self.assertRaises(OSError):
+                self.manager.delete_customer("C1")
+        self.assertIsNone(self.manager.get_customer_by_id("C2"))
+        self.assertEqual(self.manager.get_customer_by_id("C1").to_dict(),
+                         {"customer_id": "C1", "name": "A", "phone": "1"})
+
 
 if __name__ == '__main__':
     unittest.main()
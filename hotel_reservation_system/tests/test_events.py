@@ -0,0 +1,193 @@
+"""
+Unit tests for the change feed and the events the managers publish.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from managers import events
+from managers.customer_manager import CustomerManager
+from managers.events import ChangeFeed
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from storage.json_storage import JsonFileStorage
+
+
+def _reservation(number, hotel_id="H1"):
+    """Returns a reservation record for room number."""
+    return {"reservation_id": f"R{number}", "customer_id": "C1",
+            "hotel_id": hotel_id, "room_number": number,
+            "check_in": "2025-05-01", "check_out": "2025-05-03"}
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Tests for ChangeFeed and the managers publishing to it."""
+
+    def setUp(self):
+        """Create a feed with an outbox in a temporary directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.outbox = os.path.join(self.tmp_dir, "outbox.jsonl")
+        self.feed = ChangeFeed(self.outbox, fsync=False)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _manager(self, cls, name, key):
+        """Returns a manager over a JSON file, attached to the feed."""
+        manager = cls(JsonFileStorage(os.path.join(self.tmp_dir, name), key))
+        manager.change_feed = self.feed
+        return manager
+
+    def test_managers_publish_their_mutations(self):
+        """Test one numbered event per change, across managers."""
+        received = []
+        self.feed.subscribe(received.append)
+        hotels = self._manager(HotelManager, "h.json", "hotel_id")
+        customers = self._manager(CustomerManager, "c.json", "customer_id")
+        reservations = self._manager(ReservationManager, "r.json",
+                                     "reservation_id")
+
+        hotels.create_hotel("H1", "Hotel", "Cancun", 10)
+        hotels.modify_hotel_information("H1", total_rooms=20)
+        with patch("builtins.print"):
+            customers.create_many([{"customer_id": "C1", "name": "Ana",
+                                    "phone": "555"}, {"name": "Bad"}])
+        customers.modify_many({"C1": {"phone": "556"}})
+        reservations.create_many([_reservation(1), _reservation(2)])
+        reservations.cancel_reservation("R1")
+        reservations.cancel_many(["R2"])
+        hotels.delete_hotel("H1")
+        hotels.delete_hotel("H1")  # nothing changed, nothing published
+
+        self.assertEqual(
+            [(e.seq, e.entity, e.op, e.key) for e in received],
+            [(1, "hotel", "create", "H1"), (2, "hotel", "modify", "H1"),
+             (3, "customer", "create", "C1"),
+             (4, "customer", "modify", "C1"),
+             (5, "reservation", "create", "R1"),
+             (6, "reservation", "create", "R2"),
+             (7, "reservation", "cancel", "R1"),
+             (8, "reservation", "cancel", "R2"),
+             (9, "hotel", "delete", "H1")]
+        )
+        self.assertEqual(received[1].record["total_rooms"], 20)
+        self.assertEqual(received[3].record["phone"], "556")
+        self.assertIsNone(received[-1].record)
+        self.assertEqual(list(self.feed.read()), received)
+
+    def test_failed_write_publishes_nothing(self):
+        """Test that a rolled back mutation does not reach the feed."""
+        hotels = self._manager(HotelManager, "h.json", "hotel_id")
+        with patch.object(hotels.storage, "write",
+                          side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                hotels.create_hotel("H1", "Hotel", "Cancun", 10)
+        self.assertEqual(self.feed.last_seq, 0)
+        self.assertFalse(os.path.exists(self.outbox))
+
+    def test_resume_from_outbox(self):
+        """Test that a reopened feed continues and replays from a seq."""
+        for number in range(5):
+            self.feed.publish("hotel", events.CREATE,
+                              [(f"H{number}", {"n": number})])
+        reopened = ChangeFeed(self.outbox, fsync=False)
+        self.assertEqual(reopened.last_seq, 5)
+        self.assertEqual([e.key for e in reopened.read(3)], ["H3", "H4"])
+
+        received = []
+        reopened.subscribe(received.append, since=4)
+        reopened.publish("hotel", events.DELETE, [("H0", None)])
+        self.assertEqual([e.seq for e in received], [5, 6])
+
+    def test_feeds_sharing_an_outbox(self):
+        """Test that two writers of one outbox never reuse a seq."""
+        other = ChangeFeed(self.outbox, fsync=False)
+        self.feed.publish("hotel", events.CREATE, [("H1", {}), ("H2", {})])
+        other.publish("customer", events.CREATE, [("C1", {})])
+        self.feed.publish("hotel", events.DELETE, [("H1", None)])
+        self.assertEqual(
+            [(e.seq, e.key) for e in other.read()],
+            [(1, "H1"), (2, "H2"), (3, "C1"), (4, "H1")]
+        )
+
+    def test_checkpoints_and_partial_line(self):
+        """Test seeking from a checkpoint and dropping a torn append."""
+        with patch.object(events, "CHECKPOINT_EVERY", 4):
+            self.feed.publish("hotel", events.CREATE,
+                              [(f"H{number}", None) for number in range(10)])
+            for since in range(11):
+                self.assertEqual([e.seq for e in self.feed.read(since)],
+                                 list(range(since + 1, 11)))
+
+        with open(self.outbox, "a", encoding="utf-8") as file:
+            file.write('{"seq": 11, "ent')
+        with self.assertLogs("managers.events", "WARNING"):
+            reopened = ChangeFeed(self.outbox, fsync=False)
+        self.assertEqual(reopened.last_seq, 10)
+        reopened.publish("hotel", events.DELETE, [("H0", None)])
+        received = []
+        reopened.subscribe(received.append, since=8)
+        reopened.publish("hotel", events.DELETE, [("H1", None)])
+        self.assertEqual([e.seq for e in received], [9, 10, 11, 12])
+
+    def test_outbox_failure_keeps_events_pending(self):
+        """Test that events the outbox missed are published later."""
+        received = []
+        feed = ChangeFeed(self.outbox)
+        feed.subscribe(received.append)
+        hotels = self._manager(HotelManager, "h.json", "hotel_id")
+        hotels.change_feed = feed
+        feed.publish("hotel", events.CREATE, [("H0", None)])
+        with patch("managers.events.open", create=True,
+                   side_effect=OSError("disk full")), self.assertLogs(
+                       "managers.events", "ERROR"):
+            hotels.create_hotel("H1", "Hotel", "Cancun", 10)
+        self.assertIsNotNone(hotels.get_hotel_by_id("H1"))
+        # A failed fsync truncates the events it appended.
+        with patch("os.fsync", side_effect=OSError("disk full")), (
+                self.assertLogs("managers.events", "ERROR")):
+            self.assertEqual(feed.publish("hotel", events.MODIFY,
+                                          [("H0", None)]), [])
+        self.assertEqual((feed.last_seq, feed.pending), (1, 2))
+        self.assertEqual([e.seq for e in feed.read()], [1])
+
+        hotels.delete_hotel("H1")
+        self.assertEqual(feed.pending, 0)
+        self.assertEqual([(e.seq, e.op) for e in received],
+                         [(1, "create"), (2, "create"), (3, "modify"),
+                          (4, "delete")])
+        self.assertEqual(list(feed.read()), received)
+
+    def test_damaged_line_is_skipped(self):
+        """Test that a damaged outbox line does not stop the feed."""
+        self.feed.publish("hotel", events.CREATE, [("H1", None)])
+        with open(self.outbox, "a", encoding="utf-8") as file:
+            file.write('not json\n{"seq": "x"}\n')
+        self.feed.publish("hotel", events.CREATE, [("H2", None)])
+        with self.assertLogs("managers.events", "WARNING"):
+            reopened = ChangeFeed(self.outbox, fsync=False)
+        self.assertEqual(reopened.last_seq, 2)
+        with self.assertLogs("managers.events", "WARNING"):
+            self.assertEqual([e.key for e in reopened.read()],
+                             ["H1", "H2"])
+
+    def test_failing_subscriber(self):
+        """Test that one failing subscriber does not stop the rest."""
+        received = []
+        feed = ChangeFeed()
+        feed.subscribe(lambda event: 1 / 0)
+        unsubscribe = feed.subscribe(received.append)
+        with self.assertLogs("managers.events", "ERROR"):
+            feed.publish("hotel", events.CREATE, [("H1", {})])
+        unsubscribe()
+        with self.assertLogs("managers.events", "ERROR"):
+            feed.publish("hotel", events.CREATE, [("H2", {})])
+        self.assertEqual([e.key for e in received], ["H1"])
+        self.assertEqual(list(feed.read()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
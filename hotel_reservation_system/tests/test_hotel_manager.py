@@ -2,8 +2,10 @@
 Unit tests for the HotelManager class.
 """
 
+import json
 import unittest
 import os
+from unittest.mock import patch
 from managers.hotel_manager import HOTEL_DATA_FILE
 from managers.hotel_manager import HotelManager
 TEST_HOTEL_FILE = "test_hotels.json"
@@ -86,6 +88,78 @@ class TestHotelManager(unittest.TestCase):
         """Test deleting a non-existent hotel should return False."""
         self.assertFalse(self.manager.delete_hotel("FakeID"))
 
+    def test_load_skips_duplicate_ids(self):
+        """Test that duplicate hotel IDs in the data file are skipped."""
+        with open(HOTEL_DATA_FILE, 'w', encoding='utf-8') as f:
+            json.dump([
+                {"hotel_id": "H1", "name": "A", "location": "X",
+                 "total_rooms": 10},
+                {"hotel_id": "H1", "name": "B", "location": "Y",
+                 "total_rooms": 20},
+            ], f)
+        self.manager.load_hotels()
+        self.assertEqual(len(self.manager.hotels), 1)
+        self.assertEqual(self.manager.get_hotel_by_id("H1").name, "A")
+
+    def test_create_many_persists_once(self):
+        """Test bulk creation skips invalid items and saves once."""
+        with patch.object(self.manager.storage, "save",
+                          wraps=self.manager.storage.save) as save:
+            result = self.manager.create_many([
+                {"hotel_id": "H1", "name": "A", "location": "X",
+                 "total_rooms": "10"},
+                {"hotel_id": "H1", "name": "B", "location": "Y",
+                 "total_rooms": 20},
+                {"hotel_id": "H2", "name": "C", "location": "Z",
+                 "total_rooms": "many"},
+                {"hotel_id": "H3", "name": "D", "location": "Z",
+                 "total_rooms": 5},
+            ])
+        save.assert_called_once()
+        self.assertEqual([h.hotel_id for h in result.succeeded],
+                         ["H1", "H3"])
+        self.assertEqual(len(result.failed), 2)
+        self.assertEqual(self.manager.get_hotel_by_id("H1").total_rooms, 10)
+        self.assertEqual(len(HotelManager().hotels), 2)
+
+    def test_modify_and_delete_many(self):
+        """Test bulk modification and deletion."""
+        self.manager.create_hotel("H1", "A", "X", 10)
+        self.manager.create_hotel("H2", "B", "Y", 20)
+        result = self.manager.modify_many({
+            "H1": {"name": "New"},
+            "H2": {"total_rooms": "bad"},
+            "H9": {"name": "Missing"},
+        })
+        self.assertEqual(len(result.succeeded), 1)
+        self.assertEqual(len(result.failed), 2)
+        self.assertEqual(self.manager.get_hotel_by_id("H1").name, "New")
+        self.assertEqual(self.manager.get_hotel_by_id("H2").total_rooms, 20)
+
+        result = self.manager.delete_many(["H1", "H9"])
+        self.assertEqual(result.succeeded, ["H1"])
+        self.assertFalse(result.ok)
+        self.assertEqual([h.hotel_id for h in HotelManager().hotels], ["H2"])
+
+    def test_failed_write_rolls_back(self):
+        """Test that a failed write leaves the hotels unchanged."""
+        self.manager.create_hotel("H1", "A", "X", 10)
+        with patch.object(self.manager.storage, "write",
+                          side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager.create_hotel("H2", "B", "Y", 20)
+            with self.assertRaises(OSError):
+                self.manager.modify_hotel_information("H1", location="Z")
+            with self.assertRaises(OSError):
+                self.manager.delete_hotel("H1")
+        self.assertIsNone(self.manager.get_hotel_by_id("H2"))
+        self.assertEqual(self.manager.get_hotel_by_id("H1").location, "X")
+        self.assertEqual(
+            [h.hotel_id for h in self.manager.get_hotels_by_location("X")],
+            ["H1"]
+        )
+        self.assertEqual(self.manager.get_hotels_by_location("Z"), [])
+
 
 if __name__ == '__main__':
     unittest.main()
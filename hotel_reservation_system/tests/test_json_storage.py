@@ -0,0 +1,226 @@
+"""
+Unit tests for the JSON storage backends.
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from managers.hotel_manager import HotelManager
+from storage.base import DELETE, PUT
+from storage.json_storage import JournaledJsonStorage, JsonFileStorage
+
+
+def _create_hotels(path, prefix, count):
+    """Creates hotels through a manager; run in a child process."""
+    manager = HotelManager(storage=JsonFileStorage(path, "hotel_id"))
+    for number in range(count):
+        manager.create_hotel(f"{prefix}{number}", "Hotel", "City", 10)
+
+
+class TestJsonFileStorage(unittest.TestCase):
+    """Tests for JsonFileStorage persistence and change detection."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "hotels.json")
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _storage(self):
+        """Returns a storage over the temporary data file."""
+        return JsonFileStorage(self.path, "hotel_id")
+
+    def test_failed_save_keeps_previous_file(self):
+        """Test that a save that fails midway leaves the old file."""
+        storage = self._storage()
+        storage.save([{"hotel_id": "H1"}])
+        with self.assertRaises(TypeError):
+            storage.save([{"hotel_id": "H2", "bad": object()}])
+        self.assertEqual(self._storage().load(), [{"hotel_id": "H1"}])
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)),
+            ["hotels.json", "hotels.json.lock"]
+        )
+
+    def test_has_changed_only_after_other_writer(self):
+        """Test that own writes do not count as external changes."""
+        storage = self._storage()
+        storage.load()
+        storage.write(PUT, "H1", {"hotel_id": "H1"},
+                      lambda: [{"hotel_id": "H1"}])
+        self.assertFalse(storage.has_changed())
+        self._storage().save([{"hotel_id": "H2"}])
+        self.assertTrue(storage.has_changed())
+        storage.load()
+        self.assertFalse(storage.has_changed())
+
+    def test_write_merges_external_changes(self):
+        """Test that a stale writer does not overwrite other changes."""
+        first, second = self._storage(), self._storage()
+        first.load()
+        second.load()
+        first.write(PUT, "H1", {"hotel_id": "H1"},
+                    lambda: [{"hotel_id": "H1"}])
+        second.write(PUT, "H2", {"hotel_id": "H2"},
+                     lambda: [{"hotel_id": "H2"}])
+        self.assertEqual(
+            self._storage().load(), [{"hotel_id": "H1"}, {"hotel_id": "H2"}]
+        )
+        self.assertTrue(second.has_changed())
+
+    def test_manager_reload_if_changed(self):
+        """Test that a manager reloads only after an external write."""
+        manager = HotelManager(storage=self._storage(), lazy=False)
+        self.assertFalse(manager.reload_if_changed())
+        other = HotelManager(storage=self._storage())
+        other.create_hotel("H1", "Hotel", "City", 10)
+        self.assertTrue(manager.reload_if_changed())
+        self.assertIsNotNone(manager.get_hotel_by_id("H1"))
+        self.assertFalse(manager.reload_if_changed())
+
+    def test_cache_serves_unchanged_file(self):
+        """Test that the marshal cache is used until the file changes."""
+        cache_path = os.path.join(self.tmp_dir, "hotels.cache")
+        records = [{"hotel_id": "H1", "v": 1}]
+        JsonFileStorage(self.path, "hotel_id", cache_path).save(records)
+        storage = JsonFileStorage(self.path, "hotel_id", cache_path)
+        with patch("storage.json_storage.iter_json_array") as parse:
+            self.assertEqual(storage.load(), records)
+        parse.assert_not_called()
+
+        self._storage().save([{"hotel_id": "H2", "v": 1}])
+        self.assertEqual(storage.load(), [{"hotel_id": "H2", "v": 1}])
+        with patch("storage.json_storage.iter_json_array") as parse:
+            self.assertEqual(storage.load(), [{"hotel_id": "H2", "v": 1}])
+        parse.assert_not_called()
+
+    def test_corrupt_cache_is_ignored(self):
+        """Test that an unreadable cache falls back to the JSON file."""
+        cache_path = os.path.join(self.tmp_dir, "hotels.cache")
+        self._storage().save([{"hotel_id": "H1"}])
+        with open(cache_path, "wb") as f:
+            f.write(b"not marshal")
+        storage = JsonFileStorage(self.path, "hotel_id", cache_path)
+        with self.assertLogs("storage.json_storage", level="WARNING"):
+            self.assertEqual(storage.load(), [{"hotel_id": "H1"}])
+        self.assertEqual(storage.load(), [{"hotel_id": "H1"}])
+
+    def test_concurrent_processes_lose_no_writes(self):
+        """Test that several processes writing at once keep all data."""
+        processes = [
+            multiprocessing.Process(
+                target=_create_hotels, args=(self.path, f"P{number}-", 10)
+            )
+            for number in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(len(self._storage().load()), 40)
+
+
+class TestJournaledJsonStorage(unittest.TestCase):
+    """Tests for JournaledJsonStorage functionalities."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "hotels.json")
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _storage(self, threshold=1000):
+        """Returns a journaled storage over the temporary snapshot."""
+        return JournaledJsonStorage(
+            self.path, "hotel_id", compact_threshold=threshold
+        )
+
+    def test_write_appends_without_touching_snapshot(self):
+        """Test that mutations go to the log only."""
+        storage = self._storage()
+        storage.write(PUT, "H1", {"hotel_id": "H1"}, list)
+        self.assertFalse(os.path.exists(self.path))
+        with open(storage.log_path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_load_replays_snapshot_and_log(self):
+        """Test that load applies the log on top of the snapshot."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"hotel_id": "H1", "v": 1},
+                       {"hotel_id": "H2", "v": 1}], f)
+        storage = self._storage()
+        storage.write(PUT, "H1", {"hotel_id": "H1", "v": 2}, list)
+        storage.write(DELETE, "H2", None, list)
+        storage.write(PUT, "H3", {"hotel_id": "H3", "v": 1}, list)
+        records = self._storage().load()
+        self.assertEqual(
+            sorted(records, key=lambda r: r["hotel_id"]),
+            [{"hotel_id": "H1", "v": 2}, {"hotel_id": "H3", "v": 1}]
+        )
+
+    def test_torn_log_entry_is_skipped(self):
+        """Test that a partially written log line does not abort load."""
+        storage = self._storage()
+        storage.write(PUT, "H1", {"hotel_id": "H1"}, list)
+        with open(storage.log_path, "a", encoding="utf-8") as f:
+            f.write('{"op":"put","key":"H2","rec')
+        with self.assertLogs("storage.json_storage", level="WARNING"):
+            records = self._storage().load()
+        self.assertEqual(records, [{"hotel_id": "H1"}])
+
+    def test_compaction_on_threshold(self):
+        """Test that reaching the threshold folds the log into the
+        snapshot."""
+        storage = self._storage(threshold=2)
+        current = []
+        for key in ("H1", "H2"):
+            current.append({"hotel_id": key})
+            storage.write(PUT, key, current[-1], lambda: current)
+        self.assertEqual(os.path.getsize(storage.log_path), 0)
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), current)
+        self.assertEqual(self._storage().load(), current)
+
+    def test_compaction_keeps_other_writers_entries(self):
+        """Test that compacting after an external append folds the
+        files on disk instead of the stale snapshot."""
+        first, second = self._storage(threshold=2), self._storage()
+        first.load()
+        second.load()
+        second.write(PUT, "H1", {"hotel_id": "H1"},
+                     lambda: [{"hotel_id": "H1"}])
+        first.write(PUT, "H2", {"hotel_id": "H2"},
+                    lambda: [{"hotel_id": "H2"}])
+        first.write(PUT, "H3", {"hotel_id": "H3"},
+                    lambda: [{"hotel_id": "H2"}, {"hotel_id": "H3"}])
+        self.assertEqual(os.path.getsize(first.log_path), 0)
+        self.assertEqual(
+            sorted(r["hotel_id"] for r in self._storage().load()),
+            ["H1", "H2", "H3"]
+        )
+
+    def test_manager_with_journaled_storage(self):
+        """Test that a manager round-trips through the journal."""
+        manager = HotelManager(storage=self._storage())
+        manager.create_hotel("H1", "Hotel", "City", 10)
+        manager.create_hotel("H2", "Hotel", "City", 10)
+        manager.modify_hotel_information("H1", total_rooms=20)
+        manager.delete_hotel("H2")
+        reloaded = HotelManager(storage=self._storage())
+        self.assertEqual(len(reloaded.hotels), 1)
+        self.assertEqual(reloaded.get_hotel_by_id("H1").total_rooms, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
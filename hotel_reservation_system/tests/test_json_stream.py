@@ -0,0 +1,109 @@
+"""
+Unit tests for the incremental JSON array parser.
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from managers.customer_manager import CustomerManager
+from storage.json_storage import JsonFileStorage
+from storage.json_stream import iter_json_array
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Tests for iter_json_array functionalities."""
+
+    def _parse(self, text, chunk_size):
+        """Parses text with the given chunk size."""
+        return list(iter_json_array(
+            io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size
+        ))
+
+    def test_matches_json_load_for_any_chunk_size(self):
+        """Test that elements split across chunks are decoded intact."""
+        data = [{"id": str(i), "name": "Niño " * i, "n": i * 1.5}
+                for i in range(20)] + [12345, "text", None, [1, [2]]]
+        for text in (json.dumps(data), json.dumps(data, indent=4)):
+            for chunk_size in (1, 2, 7, 64, 1 << 16):
+                self.assertEqual(self._parse(text, chunk_size), data)
+
+    def test_top_level_numbers_split_across_chunks(self):
+        """Test that numbers cut by a chunk boundary are not truncated."""
+        data = [0.5, 1, -12.25e-3, 3E+2, 100, 7.0, 0]
+        for text in (json.dumps(data), json.dumps(data, indent=1)):
+            for chunk_size in range(1, len(text) + 1):
+                self.assertEqual(self._parse(text, chunk_size), data)
+        text = '["' + "x" * 65529 + '", 1.5]'
+        self.assertEqual(self._parse(text, 1 << 16), json.loads(text))
+
+    def test_empty_array(self):
+        """Test that an empty array yields nothing."""
+        self.assertEqual(self._parse(" [ \n ] ", 1), [])
+
+    def test_malformed_input_raises(self):
+        """Test that invalid documents raise JSONDecodeError."""
+        for text in ("", "{}", "[1 2]", '[{"a": 1}', "[1,]"):
+            with self.assertRaises(json.JSONDecodeError):
+                self._parse(text, 3)
+
+    def test_progress_reports_bytes_read(self):
+        """Test that progress is reported up to the total size."""
+        payload = json.dumps([{"i": i} for i in range(100)]).encode()
+        calls = []
+        list(iter_json_array(io.BytesIO(payload), len(payload), 50,
+                             lambda done, total: calls.append((done, total))))
+        self.assertEqual(calls[-1], (len(payload), len(payload)))
+        self.assertEqual([done for done, _ in calls],
+                         sorted(done for done, _ in calls))
+
+
+class TestStreamingLoad(unittest.TestCase):
+    """Tests for loading managers through the streaming parser."""
+
+    def setUp(self):
+        """Create a temporary data file."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "customers.json")
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_invalid_records_are_skipped(self):
+        """Test that per-record errors are still logged and skipped."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"customer_id": "C1", "name": "A", "phone": "1"},
+                       {"customer_id": "C2"},
+                       "garbage",
+                       {"customer_id": "C3", "name": "C", "phone": "3"}], f)
+        manager = CustomerManager(storage=JsonFileStorage(self.path))
+        self.assertEqual([c.customer_id for c in manager.customers],
+                         ["C1", "C3"])
+
+    def test_truncated_file_keeps_complete_records(self):
+        """Test that a torn file keeps the records parsed before it."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('[{"customer_id": "C1", "name": "A", "phone": "1"}, '
+                    '{"customer_id": "C2", "na')
+        manager = CustomerManager(storage=JsonFileStorage(self.path))
+        self.assertEqual([c.customer_id for c in manager.customers], ["C1"])
+
+    def test_manager_progress_callback(self):
+        """Test that load_customers forwards the progress callback."""
+        JsonFileStorage(self.path).save(
+            [{"customer_id": "C1", "name": "A", "phone": "1"}]
+        )
+        manager = CustomerManager(storage=JsonFileStorage(self.path))
+        calls = []
+        manager.load_customers(
+            progress=lambda done, total: calls.append((done, total))
+        )
+        size = os.path.getsize(self.path)
+        self.assertEqual(calls[-1], (size, size))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Unit tests for the metrics sink and the manager instrumentation.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.metrics import (
+    Histogram, InMemoryMetrics, MetricsSink, get_sink, set_sink
+)
+from managers.reservation_manager import ReservationManager
+from storage.buffered import BufferedStorage
+from storage.json_storage import JsonFileStorage
+
+
+class TestHistogram(unittest.TestCase):
+    """Tests for the Histogram class."""
+
+    def test_summary(self):
+        """Test the count, extremes and bucketed percentiles."""
+        histogram = Histogram()
+        for value in (0.001, 0.002, 0.003, 0.1):
+            histogram.observe(value)
+        summary = histogram.snapshot()
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["min"], 0.001)
+        self.assertEqual(summary["max"], 0.1)
+        self.assertAlmostEqual(summary["sum"], 0.106)
+        # Percentiles are bucket upper bounds: within 2x of the value.
+        self.assertTrue(0.002 <= summary["p50"] <= 0.004)
+        self.assertEqual(summary["p99"], 0.1)
+        self.assertEqual(Histogram().snapshot(), {"count": 0, "sum": 0.0})
+
+
+class TestManagerMetrics(unittest.TestCase):
+    """Tests for the instrumented manager operations."""
+
+    def setUp(self):
+        """Install an in-memory sink over temporary managers."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.metrics = InMemoryMetrics()
+        self.previous = set_sink(self.metrics)
+
+    def tearDown(self):
+        """Restore the previous sink and remove the data directory."""
+        set_sink(self.previous)
+        shutil.rmtree(self.tmp_dir)
+
+    def _storage(self, name, key):
+        """Returns a JSON storage in the temporary directory."""
+        return JsonFileStorage(os.path.join(self.tmp_dir, name), key)
+
+    def test_operations_are_counted_and_timed(self):
+        """Test calls, errors and latency per manager operation."""
+        hotels = HotelManager(self._storage("hotels.json", "hotel_id"))
+        hotels.create_hotel("H1", "Sol", "Cancun", 10)
+        hotels.get_hotel_by_id("H1")
+        hotels.get_hotel_by_id("H2")
+        with self.assertRaises(ValueError):
+            hotels.create_hotel("H1", "Mar", "Cancun", 5)
+
+        snapshot = self.metrics.snapshot()
+        counters = snapshot["counters"]
+        self.assertEqual(counters["hotel.create.calls"], 2)
+        self.assertEqual(counters["hotel.create.errors"], 1)
+        self.assertEqual(counters["hotel.get.calls"], 2)
+        self.assertNotIn("hotel.get.errors", counters)
+        self.assertEqual(counters["hotel.load.calls"], 1)
+        self.assertEqual(
+            snapshot["histograms"]["hotel.get.seconds"]["count"], 2
+        )
+
+    def test_bytes_written(self):
+        """Test that saves report the size of what they wrote."""
+        storage = self._storage("customers.json", "customer_id")
+        customers = CustomerManager(storage)
+        customers.create_customer("C1", "Ana", "555-0001")
+        customers.save_customers()
+        size = os.path.getsize(storage.path)
+
+        histograms = self.metrics.snapshot()["histograms"]
+        self.assertEqual(histograms["customer.save.bytes"]["max"], size)
+        self.assertEqual(histograms["customer.create.bytes"]["count"], 1)
+        self.assertEqual(storage.bytes_written, 2 * size)
+        self.assertNotIn("customer.load.bytes", histograms)
+
+    def test_bytes_written_through_buffer(self):
+        """Test that a buffered storage reports its backend's writes."""
+        storage = BufferedStorage(
+            self._storage("reservations.json", "reservation_id")
+        )
+        reservations = ReservationManager(storage)
+        reservations.create_reservation({
+            "reservation_id": "R1", "customer_id": "C1", "hotel_id": "H1",
+            "room_number": 1, "check_in": "2025-05-01",
+            "check_out": "2025-05-02"
+        })
+        self.assertEqual(storage.bytes_written, 0)
+        storage.flush()
+        self.assertEqual(storage.bytes_written,
+                         os.path.getsize(storage.storage.path))
+        storage.close()
+        self.assertEqual(
+            self.metrics.snapshot()["counters"]["reservation.create.calls"],
+            1
+        )
+
+    def test_default_sink_records_nothing(self):
+        """Test that the no-op default is installed and disabled."""
+        set_sink(None)
+        self.assertFalse(get_sink().enabled)
+        self.assertIs(type(get_sink()), MetricsSink)
+        hotels = HotelManager(self._storage("hotels.json", "hotel_id"))
+        hotels.create_hotel("H1", "Sol", "Cancun", 10)
+        self.assertEqual(self.metrics.snapshot()["counters"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
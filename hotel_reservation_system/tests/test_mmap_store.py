@@ -0,0 +1,166 @@
+"""
+Unit tests for the memory-mapped reservation store.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+from managers.reservation_manager import ReservationManager
+from models.reservation import Reservation
+from storage.base import DELETE, PUT
+from storage.mmap_store import INITIAL_CAPACITY, MmapReservationStorage
+
+
+def _record(number, day=1):
+    """Returns a reservation record for the given number."""
+    return {
+        "reservation_id": f"R{number}", "customer_id": f"C{number % 7}",
+        "hotel_id": f"H{number % 3}", "room_number": number % 50 + 1,
+        "check_in": f"2025-03-{day:02d}", "check_out": f"2025-03-{day + 2:02d}"
+    }
+
+
+class TestMmapReservationStorage(unittest.TestCase):
+    """Tests for MmapReservationStorage functionalities."""
+
+    def setUp(self):
+        """Create a temporary store."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "reservations.bin")
+        self.storage = MmapReservationStorage(self.path, fsync=False)
+
+    def tearDown(self):
+        """Close the store and remove the temporary directory."""
+        self.storage.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _reopen(self):
+        """Closes the store and maps the file again."""
+        self.storage.close()
+        self.storage = MmapReservationStorage(self.path, fsync=False)
+
+    def test_manager_round_trip(self):
+        """Test that a ReservationManager persists through the store."""
+        manager = ReservationManager(storage=self.storage)
+        manager.create_reservation(_record(1))
+        manager.create_reservation(_record(2, day=5))
+        manager.cancel_reservation("R1")
+        self._reopen()
+        reloaded = ReservationManager(storage=self.storage)
+        # Lookups are answered from the mapping without loading.
+        with patch.object(self.storage, "iter_records") as iter_records:
+            self.assertIsNone(reloaded.get_reservation_by_id("R1"))
+            reservation = reloaded.get_reservation_by_id("R2")
+            iter_records.assert_not_called()
+        self.assertEqual(reservation.check_out, date(2025, 3, 7))
+        self.assertEqual(len(reloaded.get_reservations_by_hotel("H2")), 1)
+
+    def test_lookup_materializes_reservation(self):
+        """Test that single lookups return Reservation objects."""
+        self.storage.write_many([(PUT, "R1", _record(1))], list)
+        reservation = self.storage.reservation("R1")
+        self.assertIsInstance(reservation, Reservation)
+        self.assertEqual(reservation.check_in, date(2025, 3, 1))
+        self.assertEqual(self.storage.get("R1"), _record(1))
+        self.assertIsNone(self.storage.reservation("R9"))
+
+    def test_checking_in_range(self):
+        """Test range scans over the check-in index."""
+        self.storage.write_many(
+            [(PUT, f"R{day}", _record(day, day=day)) for day in range(1, 20)],
+            list
+        )
+        found = self.storage.checking_in("2025-03-05", "2025-03-08")
+        self.assertEqual(
+            [reservation.reservation_id for reservation in found],
+            ["R5", "R6", "R7"]
+        )
+
+    def test_update_and_delete_reuse_slots(self):
+        """Test that updates move index entries and freed slots are reused."""
+        self.storage.write_many([(PUT, "R1", _record(1)),
+                                 (PUT, "R2", _record(2))], list)
+        size = os.path.getsize(self.path)
+        self.storage.write_many(
+            [(PUT, "R1", _record(1, day=10)), (DELETE, "R2", None)], list
+        )
+        self.assertEqual(list(self.storage.checking_in("2025-03-01",
+                                                       "2025-03-02")), [])
+        self.storage.write_many([(PUT, "R3", _record(3))], list)
+        self._reopen()
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(self.storage.reservation("R1").check_in,
+                         date(2025, 3, 10))
+
+    def test_grows_past_initial_capacity(self):
+        """Test that the file grows when every slot is taken."""
+        count = INITIAL_CAPACITY + 10
+        self.storage.write_many(
+            [(PUT, f"R{number}", _record(number)) for number in range(count)],
+            list
+        )
+        self._reopen()
+        self.assertEqual(self.storage.count(), count)
+        self.assertEqual(len(list(self.storage.iter_records())), count)
+
+    def test_invalid_batch_writes_nothing(self):
+        """Test that an invalid record rejects the whole batch."""
+        too_long = dict(_record(2), reservation_id="R" * 40)
+        with self.assertRaises(ValueError):
+            self.storage.write_many(
+                [(PUT, "R1", _record(1)), (PUT, "R" * 40, too_long)], list
+            )
+        self.assertEqual(self.storage.count(), 0)
+        with self.assertRaises(ValueError):
+            self.storage.write_many(
+                [(PUT, "R3", dict(_record(3), room_number=2 ** 31))], list
+            )
+
+    def test_rejected_write_leaves_manager_unchanged(self):
+        """Test that a record the store rejects is rolled back."""
+        manager = ReservationManager(storage=self.storage)
+        for record in (dict(_record(1), reservation_id="R" * 40),
+                       dict(_record(2), room_number=2 ** 31)):
+            with self.assertRaises(ValueError):
+                manager.create_reservation(record)
+            self.assertIsNone(
+                manager.get_reservation_by_id(record["reservation_id"]))
+        self.assertTrue(manager.is_room_available(
+            "H2", 2 ** 31, "2025-03-01", "2025-03-03"))
+        manager.create_reservation(_record(3))
+        with patch.object(self.storage, "write_many",
+                          side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                manager.cancel_reservation("R3")
+        self.assertIsNotNone(manager.get_reservation_by_id("R3"))
+        self.assertFalse(manager.is_room_available(
+            "H0", 4, "2025-03-01", "2025-03-03"))
+        self.assertEqual(self.storage.count(), 1)
+
+    def test_save_replaces_contents(self):
+        """Test that save rewrites the whole store."""
+        self.storage.write_many([(PUT, "R1", _record(1))], list)
+        self.storage.save([_record(2), _record(3)])
+        self.assertIsNone(self.storage.get("R1"))
+        self._reopen()
+        self.assertEqual(
+            sorted(record["reservation_id"]
+                   for record in self.storage.iter_records()),
+            ["R2", "R3"]
+        )
+
+    def test_rejects_foreign_file(self):
+        """Test that a file in another format is not mapped."""
+        path = os.path.join(self.tmp_dir, "other.bin")
+        with open(path, "wb") as file:
+            file.write(b"not a store" * 10)
+        with self.assertRaises(ValueError):
+            MmapReservationStorage(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
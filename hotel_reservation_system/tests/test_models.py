@@ -0,0 +1,65 @@
+"""
+Unit tests for the model classes.
+"""
+
+import unittest
+from datetime import date, datetime
+from models.customer import Customer
+from models.hotel import Hotel
+from models.reservation import Reservation, to_date
+
+
+class TestModels(unittest.TestCase):
+    """Tests for the Hotel, Customer and Reservation models."""
+
+    def test_models_have_no_instance_dict(self):
+        """Test that model instances are slotted."""
+        for obj in (Hotel("H1", "Hotel", "City", 10),
+                    Customer("C1", "Name", "555"),
+                    Reservation("R1", "C1", "H1", 1,
+                                "2025-01-01", "2025-01-02")):
+            self.assertFalse(hasattr(obj, "__dict__"))
+            with self.assertRaises(AttributeError):
+                obj.unknown_attribute = 1
+
+    def test_reservation_to_dict_round_trip(self):
+        """Test that to_dict returns the constructor arguments."""
+        reservation = Reservation("R1", "C1", "H1", 7,
+                                  "2025-01-01", "2025-01-02")
+        self.assertEqual(Reservation(**reservation.to_dict()), reservation)
+
+    def test_reservation_date_coercion(self):
+        """Test that ISO strings and ordinals become dates."""
+        day = date(2025, 3, 1)
+        reservation = Reservation("R1", "C1", "H1", 1,
+                                  "2025-03-01", day.toordinal() + 2)
+        self.assertEqual(reservation.check_in, day)
+        self.assertEqual(reservation.check_out, date(2025, 3, 3))
+        self.assertEqual(to_date(datetime(2025, 3, 1, 12, 30)), day)
+        with self.assertRaises(TypeError):
+            to_date(3.5)
+
+    def test_reservation_room_number_coercion(self):
+        """Test that room numbers become positive ints."""
+        reservation = Reservation("R1", "C1", "H1", "12",
+                                  "2025-03-01", "2025-03-02")
+        self.assertEqual(reservation.room_number, 12)
+        for room in (0, -3, "x", "1.5"):
+            with self.assertRaises(ValueError):
+                Reservation("R1", "C1", "H1", room, "2025-03-01",
+                            "2025-03-02")
+        for room in (1.5, None, True):
+            with self.assertRaises(TypeError):
+                Reservation("R1", "C1", "H1", room, "2025-03-01",
+                            "2025-03-02")
+
+    def test_attributes_remain_writable(self):
+        """Test that the public attribute API still works."""
+        hotel = Hotel("H1", "Hotel", "City", 10)
+        hotel.total_rooms = 20
+        self.assertEqual(hotel.to_dict()["total_rooms"], 20)
+        self.assertEqual(str(hotel), "Hotel(H1, Hotel, City, rooms=20)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for the vectorized occupancy analytics.
+"""
+
+import unittest
+from datetime import date
+from analytics.occupancy import (
+    ReservationArrays, length_of_stay_histogram, occupancy_calendar,
+    room_nights
+)
+from benchmarks.occupancy import generate, naive_occupancy
+from models.hotel import Hotel
+from models.reservation import Reservation
+
+
+class TestOccupancy(unittest.TestCase):
+    """Tests for the occupancy reports."""
+
+    def setUp(self):
+        """Create two hotels and a few stays."""
+        self.hotels = [Hotel("H1", "One", "City", 2),
+                       Hotel("H2", "Two", "Town", 4)]
+        self.arrays = ReservationArrays.from_reservations([
+            Reservation("R1", "C1", "H1", 1, "2025-01-01", "2025-01-03"),
+            Reservation("R2", "C2", "H1", 2, "2025-01-02", "2025-01-05"),
+            Reservation("R3", "C3", "H2", 1, "2024-12-30", "2025-01-02"),
+            Reservation("R4", "C4", "H9", 1, "2025-01-01", "2025-01-02"),
+        ])
+
+    def test_occupancy_calendar(self):
+        """Test rooms and rates per night, clipped to the range."""
+        calendar = occupancy_calendar(
+            self.arrays, self.hotels, "2025-01-01", "2025-01-05"
+        )
+        self.assertEqual(calendar.occupied.tolist(),
+                         [[1, 2, 1, 1], [1, 0, 0, 0]])
+        self.assertEqual(calendar.hotel_rates()["H1"].tolist(),
+                         [0.5, 1.0, 0.5, 0.5])
+        self.assertEqual(calendar.dates()[-1], date(2025, 1, 4))
+
+    def test_peak_nights(self):
+        """Test ranking nights per hotel and for the chain."""
+        calendar = occupancy_calendar(
+            self.arrays, self.hotels, "2025-01-01", "2025-01-05"
+        )
+        self.assertEqual(calendar.peak_nights(1, "H1"),
+                         [(date(2025, 1, 2), 1.0)])
+        self.assertEqual(
+            [night for night, _ in calendar.peak_nights(2)],
+            [date(2025, 1, 1), date(2025, 1, 2)]
+        )
+
+    def test_length_of_stay_and_room_nights(self):
+        """Test the stay histogram and room nights per hotel."""
+        self.assertEqual(length_of_stay_histogram(self.arrays, 3).tolist(),
+                         [0, 1, 1, 2])
+        self.assertEqual(room_nights(self.arrays),
+                         {"H1": 5, "H2": 3, "H9": 1})
+
+    def test_matches_naive_loop(self):
+        """Test that the calendar matches a plain loop on random data."""
+        hotels, reservations = generate(5, 500, 2025, seed=3)
+        start, end = date(2025, 3, 1), date(2025, 6, 1)
+        calendar = occupancy_calendar(
+            ReservationArrays.from_reservations(reservations), hotels,
+            start, end
+        )
+        expected = naive_occupancy(hotels, reservations, start, end)
+        for hotel_id, rates in calendar.hotel_rates().items():
+            self.assertEqual(rates.tolist(), expected[hotel_id])
+
+    def test_empty(self):
+        """Test reports without reservations."""
+        arrays = ReservationArrays.from_reservations([])
+        calendar = occupancy_calendar(arrays, self.hotels,
+                                      "2025-01-01", "2025-01-03")
+        self.assertEqual(calendar.occupied.sum(), 0)
+        self.assertEqual(length_of_stay_histogram(arrays, 2).tolist(),
+                         [0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Unit tests for the manager persistence policies.
+"""
+
+import gc
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import weakref
+from unittest.mock import patch
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.persistence import PersistencePolicy
+from managers.reservation_manager import ReservationManager
+from storage.json_storage import JsonFileStorage
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestPersistencePolicies(unittest.TestCase):
+    """Tests for the persistence policies of the managers."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "hotels.json")
+        self.storage = JsonFileStorage(self.path, "hotel_id")
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _on_disk(self):
+        """Returns the hotel IDs currently in the data file."""
+        return [record["hotel_id"] for record in self.storage.load()]
+
+    def test_manual_writes_only_on_flush(self):
+        """Test that a manual policy defers writes until flush()."""
+        manager = HotelManager(self.storage, PersistencePolicy.manual())
+        manager.create_hotel("H1", "Hotel", "City", 10)
+        manager.modify_hotel_information("H1", total_rooms=12)
+        self.assertEqual(self._on_disk(), [])
+        manager.flush()
+        self.assertEqual(self._on_disk(), ["H1"])
+        self.assertEqual(HotelManager(self.storage).get_hotel_by_id(
+            "H1").total_rooms, 12)
+
+    def test_debounced_flushes_on_max_pending(self):
+        """Test that reaching max_pending triggers a background flush."""
+        manager = HotelManager(
+            self.storage,
+            PersistencePolicy.debounced(flush_interval=None, max_pending=3)
+        )
+        for number in range(3):
+            manager.create_hotel(f"H{number}", "Hotel", "City", 10)
+        deadline = time.monotonic() + 5
+        while len(self._on_disk()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._on_disk(), ["H0", "H1", "H2"])
+        manager.storage.close()
+
+    def test_debounced_flushes_after_interval(self):
+        """Test that queued writes are flushed after the interval."""
+        manager = HotelManager(
+            self.storage, PersistencePolicy.debounced(flush_interval=0.05)
+        )
+        with patch.object(self.storage, "write_many",
+                          wraps=self.storage.write_many) as write_many:
+            for number in range(10):
+                manager.create_hotel(f"H{number}", "Hotel", "City", 10)
+            deadline = time.monotonic() + 5
+            while manager.storage.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            manager.storage.close()
+        self.assertLessEqual(write_many.call_count, 2)
+        self.assertEqual(len(self._on_disk()), 10)
+
+    def test_with_block_writes_once(self):
+        """Test that a with block under the immediate policy writes
+        once on exit and then writes through again."""
+        manager = HotelManager(self.storage)
+        with patch.object(self.storage, "write_many",
+                          wraps=self.storage.write_many) as write_many:
+            with manager:
+                for number in range(5):
+                    manager.create_hotel(f"H{number}", "Hotel", "City", 10)
+                with manager:
+                    manager.delete_hotel("H4")
+                self.assertEqual(self._on_disk(), [])
+            write_many.assert_called_once()
+        self.assertIs(manager.storage, self.storage)
+        self.assertEqual(len(self._on_disk()), 4)
+
+    def test_reservation_with_block(self):
+        """Test the context manager on the reservation manager."""
+        storage = JsonFileStorage(
+            os.path.join(self.tmp_dir, "reservations.json"),
+            "reservation_id"
+        )
+        manager = ReservationManager(storage)
+        with manager:
+            manager.create_reservation({
+                "reservation_id": "R1", "customer_id": "C1",
+                "hotel_id": "H1", "room_number": 1,
+                "check_in": "2025-01-01", "check_out": "2025-01-02"
+            })
+            self.assertEqual(storage.load(), [])
+        self.assertEqual(len(storage.load()), 1)
+
+    def test_loading_is_lazy(self):
+        """Test that storage is only read on first access."""
+        self.storage.save([{"hotel_id": "H1", "name": "Hotel",
+                            "location": "City", "total_rooms": 10}])
+        with patch.object(self.storage, "iter_records",
+                          wraps=self.storage.iter_records) as iter_records:
+            manager = HotelManager(self.storage)
+            iter_records.assert_not_called()
+            self.assertFalse(manager.reload_if_changed())
+            self.assertEqual(len(manager.hotels), 1)
+            manager.get_hotel_by_id("H1")
+            iter_records.assert_called_once()
+
+    def test_save_before_access_keeps_data(self):
+        """Test that saving an untouched lazy manager does not wipe the
+        stored records."""
+        self.storage.save([{"hotel_id": "H1", "name": "Hotel",
+                            "location": "City", "total_rooms": 10}])
+        HotelManager(self.storage).save_hotels()
+        self.assertEqual(self._on_disk(), ["H1"])
+
+    def test_invalid_policy(self):
+        """Test that unknown modes and unbounded debouncing fail."""
+        with self.assertRaises(ValueError):
+            PersistencePolicy("sometimes")
+        with self.assertRaises(ValueError):
+            PersistencePolicy.debounced(flush_interval=None)
+
+    def test_flush_at_interpreter_exit(self):
+        """Test that queued writes are flushed when the process exits."""
+        path = os.path.join(self.tmp_dir, "customers.json")
+        script = (
+            "from managers.customer_manager import CustomerManager\n"
+            "from managers.persistence import PersistencePolicy\n"
+            "from storage.json_storage import JsonFileStorage\n"
+            f"storage = JsonFileStorage({path!r}, 'customer_id')\n"
+            "manager = CustomerManager(storage, PersistencePolicy.manual())\n"
+            "manager.create_customer('C1', 'Ana', '5551234567')\n"
+            "def dropped():\n"
+            "    other = CustomerManager(JsonFileStorage(\n"
+            f"        {path!r} + '.2', 'customer_id'),\n"
+            "        PersistencePolicy.manual())\n"
+            "    other.create_customer('C2', 'Eva', '5551234567')\n"
+            "dropped()\n"
+            "import gc\n"
+            "gc.collect()\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR,
+                       check=True)
+        manager = CustomerManager(JsonFileStorage(path, "customer_id"))
+        self.assertIsNotNone(manager.get_customer_by_id("C1"))
+        dropped = CustomerManager(JsonFileStorage(path + ".2",
+                                                  "customer_id"))
+        self.assertIsNotNone(dropped.get_customer_by_id("C2"))
+
+    def test_manager_with_queued_writes_is_kept_alive(self):
+        """Test that dropping a manager does not lose its queued writes."""
+        manager = HotelManager(self.storage, PersistencePolicy.manual())
+        manager.create_hotel("H1", "Hotel", "City", 10)
+        alive = weakref.ref(manager)
+        del manager
+        gc.collect()
+        self.assertIsNotNone(alive())
+        self.assertEqual(self._on_disk(), [])
+        alive().flush()
+        gc.collect()
+        self.assertIsNone(alive())
+        self.assertEqual(self._on_disk(), ["H1"])
+
+        with HotelManager(self.storage) as manager:
+            manager.delete_hotel("H1")
+            alive = weakref.ref(manager)
+        del manager
+        gc.collect()
+        self.assertIsNone(alive())
+        self.assertEqual(self._on_disk(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
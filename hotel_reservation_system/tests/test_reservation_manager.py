@@ -2,8 +2,11 @@
 Unit tests for the ReservationManager class.
 """
 
+import json
+from datetime import date
 import unittest
 import os
+from unittest.mock import patch
 from managers.reservation_manager import ReservationManager
 from managers.reservation_manager import RESERVATION_DATA_FILE
 
@@ -46,8 +49,8 @@ class TestReservationManager(unittest.TestCase):
         self.assertEqual(res.customer_id, "C200")
         self.assertEqual(res.hotel_id, "H200")
         self.assertEqual(res.room_number, 101)
-        self.assertEqual(res.check_in, "2025-01-01")
-        self.assertEqual(res.check_out, "2025-01-05")
+        self.assertEqual(res.check_in, date(2025, 1, 1))
+        self.assertEqual(res.check_out, date(2025, 1, 5))
 
     def test_create_duplicate_reservation(self):
         """Test creating a duplicate reservation should raise ValueError."""
@@ -107,6 +110,20 @@ class TestReservationManager(unittest.TestCase):
         "reservation should return False."""
         self.assertFalse(self.manager.cancel_reservation("FakeID"))
 
+    def test_cancel_removes_from_lookup(self):
+        """Test that a canceled reservation can no longer be looked up."""
+        self.manager.create_reservation({
+            "reservation_id": "R103",
+            "customer_id": "C203",
+            "hotel_id": "H203",
+            "room_number": 104,
+            "check_in": "2025-04-01",
+            "check_out": "2025-04-05"
+        })
+        self.manager.cancel_reservation("R103")
+        self.assertIsNone(self.manager.get_reservation_by_id("R103"))
+        self.assertEqual(self.manager.reservations, [])
+
     def test_create_reservation_nonexistent_hotel(self):
         """Test creating a reservation for "
         "a non-existent hotel should raise ValueError."""
@@ -133,6 +150,165 @@ class TestReservationManager(unittest.TestCase):
                 "check_out": "2025-07-05"
             })
 
+    def test_dates_round_trip_through_file(self):
+        """Test that dates stay dates after save and reload."""
+        self.manager.create_reservation({
+            "reservation_id": "R104",
+            "customer_id": "C204",
+            "hotel_id": "H204",
+            "room_number": 1,
+            "check_in": date(2025, 4, 1),
+            "check_out": "2025-04-03"
+        })
+        with open(RESERVATION_DATA_FILE, 'r', encoding='utf-8') as f:
+            stored = json.load(f)[0]
+        self.assertEqual(stored["check_in"], "2025-04-01")
+        res = ReservationManager().get_reservation_by_id("R104")
+        self.assertEqual(res.check_in, date(2025, 4, 1))
+        self.assertEqual(res.check_out, date(2025, 4, 3))
+
+    def test_create_reservation_malformed_date(self):
+        """Test that an unparseable date raises ValueError."""
+        with self.assertRaises(ValueError):
+            self._book("R530", 1, "2025-13-01", "2025-12-05")
+
+    def _book(self, reservation_id, room_number, check_in, check_out):
+        """Helper creating a reservation in hotel H500."""
+        return self.manager.create_reservation({
+            "reservation_id": reservation_id,
+            "customer_id": "C500",
+            "hotel_id": "H500",
+            "room_number": room_number,
+            "check_in": check_in,
+            "check_out": check_out
+        })
+
+    def test_create_overlapping_reservation(self):
+        """Test that double-booking a room raises ValueError."""
+        self._book("R500", 1, "2025-08-05", "2025-08-10")
+        for check_in, check_out in (("2025-08-01", "2025-08-06"),
+                                    ("2025-08-09", "2025-08-12"),
+                                    ("2025-08-06", "2025-08-07"),
+                                    ("2025-08-01", "2025-08-15")):
+            with self.assertRaises(ValueError):
+                self._book("R501", 1, check_in, check_out)
+        self.assertIsNone(self.manager.get_reservation_by_id("R501"))
+
+    def test_back_to_back_reservations_allowed(self):
+        """Test that check-out day may be the next check-in day."""
+        self._book("R510", 1, "2025-08-05", "2025-08-10")
+        self._book("R511", 1, "2025-08-10", "2025-08-12")
+        self._book("R512", 1, "2025-08-01", "2025-08-05")
+        self._book("R513", 2, "2025-08-05", "2025-08-10")
+        self.assertEqual(len(self.manager.reservations), 4)
+
+    def test_room_availability(self):
+        """Test availability queries, including after cancel and reload."""
+        self._book("R520", 1, "2025-09-01", "2025-09-05")
+        self._book("R521", 3, "2025-09-03", "2025-09-04")
+        self.assertFalse(self.manager.is_room_available(
+            "H500", 1, "2025-09-04", "2025-09-06"))
+        self.assertEqual(self.manager.get_available_rooms(
+            "H500", range(1, 5), "2025-09-02", "2025-09-04"), [2, 4])
+
+        self.manager.cancel_reservation("R520")
+        self.assertTrue(self.manager.is_room_available(
+            "H500", 1, "2025-09-04", "2025-09-06"))
+
+        reloaded = ReservationManager()
+        self.assertEqual(reloaded.get_available_rooms(
+            "H500", range(1, 5), "2025-09-02", "2025-09-04"), [1, 2, 4])
+
+    def test_load_skips_overlapping_records(self):
+        """Test that conflicting records in the data file are skipped."""
+        with open(RESERVATION_DATA_FILE, 'w', encoding='utf-8') as f:
+            json.dump([
+                {"reservation_id": "R1", "customer_id": "C1",
+                 "hotel_id": "H1", "room_number": 1,
+                 "check_in": "2025-01-01", "check_out": "2025-01-05"},
+                {"reservation_id": "R2", "customer_id": "C2",
+                 "hotel_id": "H1", "room_number": 1,
+                 "check_in": "2025-01-03", "check_out": "2025-01-07"},
+            ], f)
+        self.manager.load_reservations()
+        self.assertEqual(
+            [r.reservation_id for r in self.manager.reservations], ["R1"]
+        )
+
+    def test_bulk_create_and_cancel(self):
+        """Test bulk reservations skip conflicts within the batch."""
+        with patch.object(self.manager.storage, "save",
+                          wraps=self.manager.storage.save) as save:
+            result = self.manager.create_many([
+                {"reservation_id": "R1", "customer_id": "C1",
+                 "hotel_id": "H1", "room_number": 1,
+                 "check_in": "2025-01-01", "check_out": "2025-01-05"},
+                {"reservation_id": "R2", "customer_id": "C2",
+                 "hotel_id": "H1", "room_number": 1,
+                 "check_in": "2025-01-04", "check_out": "2025-01-06"},
+                {"reservation_id": "R3", "customer_id": "C3",
+                 "hotel_id": "H1", "room_number": 2,
+                 "check_in": "2025-01-04", "check_out": "2025-01-06"},
+            ])
+        save.assert_called_once()
+        self.assertEqual([r.reservation_id for r in result.succeeded],
+                         ["R1", "R3"])
+        self.assertEqual(result.failed[0][0]["reservation_id"], "R2")
+
+        result = self.manager.cancel_many(["R1", "R9"])
+        self.assertEqual(result.succeeded, ["R1"])
+        self.assertEqual(len(result.failed), 1)
+        self.assertTrue(self.manager.is_room_available(
+            "H1", 1, "2025-01-01", "2025-01-05"))
+        self.assertEqual(
+            [r.reservation_id for r in ReservationManager().reservations],
+            ["R3"]
+        )
+
+    def test_secondary_index_queries(self):
+        """Test customer, hotel and date queries across cancel and load."""
+        self.manager.create_many([
+            {"reservation_id": rid, "customer_id": cid, "hotel_id": hid,
+             "room_number": 1, "check_in": cin, "check_out": cout}
+            for rid, cid, hid, cin, cout in (
+                ("R1", "C1", "H1", "2025-10-01", "2025-10-03"),
+                ("R2", "C1", "H2", "2025-10-02", "2025-10-04"),
+                ("R3", "C2", "H1", "2025-10-03", "2025-10-05"),
+                ("R4", "C3", "H3", "2025-10-02", "2025-10-03"),
+            )
+        ])
+
+        def ids(reservations):
+            return [r.reservation_id for r in reservations]
+
+        self.assertEqual(
+            ids(self.manager.get_reservations_by_customer("C1")),
+            ["R1", "R2"])
+        self.assertEqual(
+            ids(self.manager.get_reservations_by_hotel("H1")), ["R1", "R3"])
+        self.assertEqual(
+            ids(self.manager.get_reservations_checking_in("2025-10-02")),
+            ["R2", "R4"])
+        self.assertEqual(ids(self.manager.get_reservations_checking_in(
+            date(2025, 10, 1), "2025-10-04", hotel_id="H1")), ["R1", "R3"])
+        self.assertEqual(
+            ids(self.manager.get_reservations_checking_out("2025-10-03")),
+            ["R1", "R4"])
+
+        self.manager.cancel_reservation("R1")
+        self.assertEqual(
+            ids(self.manager.get_reservations_by_customer("C1")), ["R2"])
+        self.assertEqual(
+            ids(self.manager.get_reservations_checking_out("2025-10-03")),
+            ["R4"])
+        self.assertEqual(self.manager.get_reservations_by_customer("C9"), [])
+
+        reloaded = ReservationManager()
+        self.assertEqual(
+            ids(reloaded.get_reservations_by_hotel("H1")), ["R3"])
+        self.assertEqual(ids(reloaded.get_reservations_checking_in(
+            "2025-10-01", "2025-10-31")), ["R2", "R4", "R3"])
+
 
 if __name__ == '__main__':
     unittest.main()
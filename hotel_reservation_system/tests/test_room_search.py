@@ -0,0 +1,182 @@
+"""
+Unit tests for the RoomSearch class and the location index.
+"""
+
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from services.bulk_io import import_records
+from services.room_search import RoomSearch
+from storage.json_storage import JsonFileStorage
+
+
+class TestRoomSearch(unittest.TestCase):
+    """Tests for RoomSearch functionalities."""
+
+    def setUp(self):
+        """Create three hotels in two locations."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.hotels = HotelManager(JsonFileStorage(
+            os.path.join(self.tmp_dir, "hotels.json"), "hotel_id"))
+        self.reservations = ReservationManager(JsonFileStorage(
+            os.path.join(self.tmp_dir, "reservations.json"),
+            "reservation_id"))
+        self.hotels.create_many([
+            {"hotel_id": "H1", "name": "Sol", "location": "Cancun",
+             "total_rooms": 2},
+            {"hotel_id": "H2", "name": "Mar", "location": "cancun ",
+             "total_rooms": 3},
+            {"hotel_id": "H3", "name": "Sierra", "location": "Monterrey",
+             "total_rooms": 5},
+        ])
+        self.search = RoomSearch(self.hotels, self.reservations)
+
+    def tearDown(self):
+        """Remove the temporary data directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _book(self, reservation_id, hotel_id, room, check_in, check_out):
+        """Books a room for the given nights."""
+        return self.reservations.create_reservation({
+            "reservation_id": reservation_id, "customer_id": "C1",
+            "hotel_id": hotel_id, "room_number": room,
+            "check_in": check_in, "check_out": check_out
+        })
+
+    def _found(self, *args, **kwargs):
+        """Returns (hotel_id, free_rooms) for each result of a search."""
+        return [(result.hotel_id, result.free_rooms)
+                for result in self.search.search(*args, **kwargs)]
+
+    def test_search_ranks_by_free_rooms(self):
+        """Test that results are limited to the location and ranked."""
+        self.assertEqual(
+            self._found("CANCUN", "2025-05-01", "2025-05-03"),
+            [("H2", 3), ("H1", 2)]
+        )
+        self.assertEqual(
+            self._found(None, "2025-05-01", "2025-05-03", limit=1),
+            [("H3", 5)]
+        )
+
+    def test_search_counts_rooms_booked_on_any_night(self):
+        """Test that a room booked on any night of the stay is not free."""
+        self._book("R1", "H2", 1, "2025-05-01", "2025-05-02")
+        self._book("R2", "H2", 2, "2025-05-02", "2025-05-03")
+        self.assertEqual(self._found("Cancun", "2025-05-01", "2025-05-03"),
+                         [("H1", 2), ("H2", 1)])
+        self.assertEqual(
+            self._found("Cancun", "2025-05-01", "2025-05-03", rooms=2),
+            [("H1", 2)]
+        )
+        # Stays checking out on the check-in day do not count.
+        self.assertEqual(self._found("Cancun", "2025-05-03", "2025-05-04"),
+                         [("H2", 3), ("H1", 2)])
+
+    def test_search_follows_changes(self):
+        """Test that bookings, cancellations and moves are reflected."""
+        self.assertEqual(self._found("Cancun", "2025-05-01", "2025-05-02"),
+                         [("H2", 3), ("H1", 2)])
+        self._book("R1", "H2", 1, "2025-05-01", "2025-05-02")
+        self._book("R2", "H2", 2, "2025-05-01", "2025-05-02")
+        self.assertEqual(self._found("Cancun", "2025-05-01", "2025-05-02"),
+                         [("H1", 2), ("H2", 1)])
+        self.reservations.cancel_reservation("R1")
+        self.hotels.modify_hotel_information("H1", location="Monterrey")
+        self.assertEqual(self._found("Cancun", "2025-05-01", "2025-05-02"),
+                         [("H2", 2)])
+        self.assertEqual(
+            [hotel.hotel_id
+             for hotel in self.hotels.get_hotels_by_location("monterrey")],
+            ["H3", "H1"]
+        )
+
+    def test_search_rejects_empty_stay(self):
+        """Test that check_out must come after check_in."""
+        with self.assertRaises(ValueError):
+            self.search.search("Cancun", "2025-05-02", "2025-05-02")
+
+    def test_location_index_survives_reload_and_delete(self):
+        """Test the location index after reloading and deleting."""
+        self.hotels.delete_hotel("H1")
+        reloaded = HotelManager(self.hotels.storage)
+        self.assertEqual(
+            [hotel.hotel_id
+             for hotel in reloaded.get_hotels_by_location("Cancun")],
+            ["H2"]
+        )
+
+    def test_invalid_and_equivalent_room_numbers(self):
+        """Test that "2" is room 2 and other odd numbers are rejected."""
+        self.assertEqual(self._found("Cancun", "2025-05-01", "2025-05-02"),
+                         [("H2", 3), ("H1", 2)])
+        self._book("R2", "H1", 2, "2025-05-01", "2025-05-03")
+        for reservation_id, room in (("str", "2"), ("neg", -3),
+                                     ("zero", 0), ("float", 1.5)):
+            with self.assertRaises((ValueError, TypeError)):
+                self._book(reservation_id, "H1", room, "2025-05-01",
+                           "2025-05-03")
+            self.assertIsNone(
+                self.reservations.get_reservation_by_id(reservation_id))
+        path = os.path.join(self.tmp_dir, "more.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"reservation_id": "imp", "customer_id": "C1", '
+                       '"hotel_id": "H2", "room_number": -1, '
+                       '"check_in": "2025-05-01", '
+                       '"check_out": "2025-05-03"}\n')
+        self.assertFalse(import_records(self.reservations, path,
+                                        workers=1).ok)
+
+        self.assertEqual(self._found("Cancun", "2025-05-01", "2025-05-02"),
+                         [("H2", 3), ("H1", 1)])
+        self.assertTrue(self.reservations.is_room_available(
+            "H1", 1, "2025-05-01", "2025-05-03"))
+
+    def test_stored_room_numbers_share_one_key(self):
+        """Test that stored "1" and 1 conflict when loaded."""
+        self.reservations.storage.save([
+            {"reservation_id": rid, "customer_id": "C1", "hotel_id": "H1",
+             "room_number": room, "check_in": "2025-05-01",
+             "check_out": "2025-05-03"}
+            for rid, room in (("R1", 1), ("R2", "1"), ("R3", -3))
+        ])
+        with self.assertLogs("managers.reservation_manager", "WARNING"):
+            reloaded = ReservationManager(self.reservations.storage,
+                                          lazy=False)
+        self.assertEqual([r.reservation_id for r in reloaded.reservations],
+                         ["R1"])
+        self.assertEqual(
+            reloaded.count_free_rooms([("H1", 2)], "2025-05-01",
+                                      "2025-05-02"),
+            [1]
+        )
+
+    def test_huge_room_numbers_keep_bitmaps_small(self):
+        """Test counting with huge room numbers and total_rooms."""
+        huge = 2 ** 31
+        self._book("R1", "H1", 2, "2025-05-01", "2025-05-03")
+        self._book("R2", "H1", huge - 1, "2025-05-02", "2025-05-03")
+        self._book("R3", "H1", huge + 1, "2025-05-01", "2025-05-03")
+        tracemalloc.start()
+        try:
+            counts = self.reservations.count_free_rooms(
+                [("H1", huge), ("H2", 3)], "2025-05-01", "2025-05-03")
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(counts, [huge - 2, 3])
+        self.assertLess(peak, 1 << 20)
+        self.reservations.cancel_reservation("R2")
+        self.assertEqual(
+            self.reservations.count_free_rooms(
+                [("H1", huge)], "2025-05-01", "2025-05-03"),
+            [huge - 1]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Unit tests for the per-hotel sharded reservation storage.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from managers.reservation_manager import ReservationManager
+from storage.base import DELETE, PUT
+from storage.sharded import ShardedStorage
+
+
+def _record(number, hotel_id="H1", check_in="2025-03-01"):
+    """Returns a reservation record for the given number."""
+    return {
+        "reservation_id": f"R{number}", "customer_id": "C1",
+        "hotel_id": hotel_id, "room_number": number,
+        "check_in": check_in, "check_out": check_in[:8] + "28"
+    }
+
+
+def _write(storage, changes, records):
+    """Applies changes to records, a dict by key, then persists them."""
+    for op, key, record in changes:
+        if op == PUT:
+            records[key] = record
+        else:
+            records.pop(key, None)
+    storage.write_many(changes, lambda: list(records.values()))
+
+
+class TestShardedStorage(unittest.TestCase):
+    """Tests for ShardedStorage functionalities."""
+
+    def setUp(self):
+        """Create a temporary shard directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _files(self):
+        """Returns the shard files, relative to the directory."""
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.tmp_dir)
+            for root, _, names in os.walk(self.tmp_dir)
+            for name in names if name.endswith(".json")
+        )
+
+    def test_manager_writes_one_file_per_hotel(self):
+        """Test that each hotel's reservations go to their own file."""
+        manager = ReservationManager(ShardedStorage(self.tmp_dir))
+        manager.create_reservation(_record(1, "H1"))
+        manager.create_reservation(_record(2, "H2"))
+        manager.create_reservation(_record(3, "H/../x"))
+        self.assertEqual(self._files(), ["H%2F%2E%2E%2Fx.json", "H1.json",
+                                         "H2.json"])
+        manager.cancel_reservation("R1")
+
+        reloaded = ReservationManager(ShardedStorage(self.tmp_dir))
+        self.assertEqual(
+            sorted(r.reservation_id for r in reloaded.reservations),
+            ["R2", "R3"]
+        )
+        self.assertEqual(
+            reloaded.get_reservations_by_hotel("H/../x")[0].room_number, 3
+        )
+
+    def test_manager_writes_read_one_hotel(self):
+        """Test that a write only lists the records of its hotel."""
+        manager = ReservationManager(
+            ShardedStorage(self.tmp_dir, by_month=True))
+        manager.create_many([_record(1, "H1"), _record(2, "H2"),
+                             _record(3, "H1", "2025-04-01")])
+        with patch.object(manager, "_records",
+                          side_effect=AssertionError("whole snapshot")):
+            manager.create_reservation(_record(4, "H1"))
+            manager.cancel_reservation("R2")
+        reloaded = ReservationManager(
+            ShardedStorage(self.tmp_dir, by_month=True))
+        self.assertEqual(
+            sorted(r.reservation_id for r in reloaded.reservations),
+            ["R1", "R3", "R4"]
+        )
+
+    def test_workers_own_disjoint_hotels(self):
+        """Test that instances limited to some hotels only see those."""
+        first = ReservationManager(
+            ShardedStorage(self.tmp_dir, hotel_ids=["H1"]))
+        second = ReservationManager(
+            ShardedStorage(self.tmp_dir, hotel_ids=["H2"]))
+        first.create_reservation(_record(1, "H1"))
+        second.create_reservation(_record(2, "H2"))
+        first.create_reservation(_record(3, "H1"))
+
+        self.assertFalse(first.storage.has_changed())
+        self.assertEqual(
+            [r.reservation_id for r in ReservationManager(
+                ShardedStorage(self.tmp_dir, hotel_ids=["H2"])
+            ).reservations],
+            ["R2"]
+        )
+        self.assertEqual(len(ReservationManager(
+            ShardedStorage(self.tmp_dir)).reservations), 3)
+
+    def test_month_partitions(self):
+        """Test the per-month layout and single-hotel reads."""
+        storage = ShardedStorage(self.tmp_dir, by_month=True)
+        _write(storage, [
+            (PUT, "R1", _record(1, "H1", "2025-03-01")),
+            (PUT, "R2", _record(2, "H1", "2025-04-01")),
+            (PUT, "R3", _record(3, "H2", "2025-04-01")),
+        ], {})
+        self.assertEqual(self._files(), [
+            os.path.join("H1", "2025-03.json"),
+            os.path.join("H1", "2025-04.json"),
+            os.path.join("H2", "2025-04.json"),
+        ])
+        self.assertEqual(
+            [record["reservation_id"] for record in storage.iter_hotel("H1")],
+            ["R1", "R2"]
+        )
+        self.assertEqual(storage.shards(), [
+            ("H1", "2025-03"), ("H1", "2025-04"), ("H2", "2025-04")
+        ])
+
+    def test_moved_and_unknown_records(self):
+        """Test moving a record between shards and deleting by key."""
+        storage, records = ShardedStorage(self.tmp_dir), {}
+        _write(storage, [(PUT, "R1", _record(1, "H1"))], records)
+        _write(storage, [(PUT, "R1", _record(1, "H2"))], records)
+        self.assertEqual([record["hotel_id"] for record in storage.load()],
+                         ["H2"])
+
+        # A fresh instance has not read the shards yet.
+        fresh = ShardedStorage(self.tmp_dir)
+        self.assertEqual(fresh.get("R1")["hotel_id"], "H2")
+        other = ShardedStorage(self.tmp_dir)
+        _write(other, [(DELETE, "R1", None)], {})
+        self.assertEqual(fresh.load(), [])
+
+    def test_save_empties_dropped_shards(self):
+        """Test that save() replaces every shard it reads."""
+        storage = ShardedStorage(self.tmp_dir)
+        storage.save([_record(1, "H1"), _record(2, "H2")])
+        storage.save([_record(3, "H2")])
+        self.assertEqual([record["reservation_id"]
+                          for record in storage.iter_hotel("H1")], [])
+        self.assertEqual([record["reservation_id"]
+                          for record in storage.load()], ["R3"])
+        self.assertGreater(storage.bytes_written, 0)
+
+    def test_has_changed_sees_new_shards(self):
+        """Test that a shard created by another instance is noticed."""
+        storage = ShardedStorage(self.tmp_dir)
+        storage.load()
+        self.assertFalse(storage.has_changed())
+        _write(ShardedStorage(self.tmp_dir),
+               [(PUT, "R1", _record(1, "H9"))], {})
+        self.assertTrue(storage.has_changed())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Unit tests for the SQLite storage backend.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+from managers.customer_manager import CustomerManager
+from managers.hotel_manager import HotelManager
+from managers.reservation_manager import ReservationManager
+from storage.base import PUT
+from storage.sqlite_storage import (
+    customer_storage, hotel_storage, reservation_storage
+)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Tests for SQLiteStorage functionalities."""
+
+    def setUp(self):
+        """Create a temporary database."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "hotel.db")
+        self.opened = []
+
+    def tearDown(self):
+        """Close every storage and remove the temporary directory."""
+        for storage in self.opened:
+            storage.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _open(self, factory):
+        """Opens a storage and closes it on tear down."""
+        storage = factory(self.path)
+        self.opened.append(storage)
+        return storage
+
+    def test_wal_mode_enabled(self):
+        """Test that the database runs in WAL mode."""
+        self._open(hotel_storage)
+        with sqlite3.connect(self.path) as connection:
+            mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_reload_if_changed(self):
+        """Test that commits from another connection are detected."""
+        manager = HotelManager(storage=self._open(hotel_storage))
+        manager.create_hotel("H1", "Hotel", "City", 10)
+        self.assertFalse(manager.reload_if_changed())
+        other = HotelManager(storage=self._open(hotel_storage))
+        other.create_hotel("H2", "Other", "Town", 5)
+        self.assertTrue(manager.reload_if_changed())
+        self.assertEqual(len(manager.hotels), 2)
+        self.assertFalse(manager.reload_if_changed())
+
+    def test_hotel_manager_round_trip(self):
+        """Test that hotel mutations are written row by row."""
+        storage = self._open(hotel_storage)
+        manager = HotelManager(storage=storage)
+        with patch.object(storage, "save") as save:
+            manager.create_hotel("H1", "Hotel", "City", 10)
+            manager.create_hotel("H2", "Other", "Town", 5)
+            manager.modify_hotel_information("H1", total_rooms=12)
+            manager.delete_hotel("H2")
+        save.assert_not_called()
+
+        self.assertEqual(storage.get("H1")["total_rooms"], 12)
+        self.assertIsNone(storage.get("H2"))
+        reloaded = HotelManager(storage=self._open(hotel_storage))
+        self.assertEqual([h.to_dict() for h in reloaded.hotels],
+                         [manager.get_hotel_by_id("H1").to_dict()])
+
+    def test_customer_bulk_operations(self):
+        """Test that bulk operations run in one transaction."""
+        manager = CustomerManager(storage=self._open(customer_storage))
+        manager.create_many([
+            {"customer_id": f"C{i}", "name": "Name", "phone": str(i)}
+            for i in range(100)
+        ])
+        manager.delete_many([f"C{i}" for i in range(50)])
+        reloaded = CustomerManager(storage=self._open(customer_storage))
+        self.assertEqual(len(reloaded.customers), 50)
+        self.assertEqual(reloaded.customers[0].customer_id, "C50")
+
+    def test_reservation_manager_round_trip(self):
+        """Test that reservations and their indexes survive a reload."""
+        manager = ReservationManager(
+            storage=self._open(reservation_storage)
+        )
+        manager.create_reservation({
+            "reservation_id": "R1", "customer_id": "C1", "hotel_id": "H1",
+            "room_number": 3, "check_in": "2025-01-01",
+            "check_out": "2025-01-04"
+        })
+        reloaded = ReservationManager(
+            storage=self._open(reservation_storage)
+        )
+        reservation = reloaded.get_reservation_by_id("R1")
+        self.assertEqual(reservation.check_out, date(2025, 1, 4))
+        self.assertFalse(reloaded.is_room_available(
+            "H1", 3, "2025-01-02", "2025-01-03"))
+
+    def test_failed_batch_is_rolled_back(self):
+        """Test that a failing change aborts the whole transaction."""
+        storage = self._open(hotel_storage)
+        with self.assertRaises(ValueError):
+            storage.write_many([
+                (PUT, "H1", {"hotel_id": "H1", "name": "A",
+                             "location": "X", "total_rooms": 1}),
+                ("bogus", "H2", None),
+            ], list)
+        self.assertEqual(storage.load(), [])
+
+    def test_progress_reports_rows(self):
+        """Test that progress counts rows read."""
+        storage = self._open(customer_storage)
+        storage.save([{"customer_id": f"C{i}", "name": "N", "phone": "1"}
+                      for i in range(3)])
+        calls = []
+        list(storage.iter_records(
+            lambda done, total: calls.append((done, total))))
+        self.assertEqual(calls, [(3, 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()